@@ -1,12 +1,12 @@
 from typing import Generator, Optional
 from uuid import UUID
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.core.database import get_db
-from app.core.security import decode_token
+from app.core.security import TokenData, decode_token
 from app.models.user import User
 
 security = HTTPBearer()
@@ -18,9 +18,38 @@ async def get_current_user(
 ) -> User:
     """Get current authenticated user from JWT token."""
     token = credentials.credentials
-    token_data = decode_token(token)
+    return await _authenticate(db, decode_token(token), "access")
 
-    if token_data is None or token_data.token_type != "access":
+
+async def get_stream_user(
+    session_id: UUID,
+    token: Optional[str] = Query(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(
+        HTTPBearer(auto_error=False)
+    ),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """Authenticate an AI session's event stream.
+
+    Accepts the usual bearer token, or a stream token for this session in
+    ``?token=`` (browsers' EventSource can't set headers).
+    """
+    if credentials is not None:
+        return await get_current_user(credentials, db)
+
+    token_data = decode_token(token) if token else None
+    if token_data is not None and token_data.session_id != str(session_id):
+        token_data = None
+    return await _authenticate(db, token_data, "stream")
+
+
+async def _authenticate(
+    db: AsyncSession,
+    token_data: Optional[TokenData],
+    token_type: str
+) -> User:
+    """Load the active user a decoded token of token_type belongs to."""
+    if token_data is None or token_data.token_type != token_type:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
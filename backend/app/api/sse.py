@@ -0,0 +1,54 @@
+"""Server-Sent Events helpers."""
+import json
+from contextlib import aclosing
+from typing import AsyncIterator, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.core.database import async_session_maker
+from app.models.ai_session import AISession
+from app.services.progress import TERMINAL_STATUSES, get_progress_broker
+
+# Disable proxy buffering so events reach the browser as they are produced
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def format_sse(data: dict, event: Optional[str] = None) -> str:
+    """Format a single SSE message."""
+    message = f"event: {event}\n" if event else ""
+    message += f"data: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+    return message
+
+
+async def session_progress_events(session_id: UUID, status: str, progress: dict) -> AsyncIterator[str]:
+    """Stream an AI session's progress as SSE events.
+
+    Events: ``progress`` with the current snapshot and on every update, then
+    ``done`` with the final status. Comment lines keep idle connections open.
+    """
+    yield format_sse({"session_id": session_id, "status": status, "progress": progress}, event="progress")
+    if status in TERMINAL_STATUSES:
+        yield format_sse({"session_id": session_id, "status": status}, event="done")
+        return
+
+    async with aclosing(get_progress_broker().subscribe(str(session_id))) as events:
+        async for event in events:
+            if event is None:
+                # Quiet period: make sure the run didn't end while we weren't subscribed
+                async with async_session_maker() as db:
+                    result = await db.execute(
+                        select(AISession.status).where(AISession.id == session_id)
+                    )
+                    event = {"status": result.scalar_one_or_none() or "failed"}
+                if event["status"] not in TERMINAL_STATUSES:
+                    yield ": keep-alive\n\n"
+                    continue
+
+            if event["status"] in TERMINAL_STATUSES:
+                yield format_sse({"session_id": session_id, "status": event["status"]}, event="done")
+                return
+            yield format_sse({"session_id": session_id, **event}, event="progress")
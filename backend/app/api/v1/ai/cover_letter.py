@@ -1,20 +1,28 @@
 import uuid
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.api.deps import get_current_user
+from app.core.security import create_stream_token
+from app.api.deps import get_current_user, get_stream_user
+from app.api.sse import SSE_HEADERS, session_progress_events
 from app.models.user import User
 from app.models.ai_session import AISession
+from app.schemas.ai_session import StreamTokenResponse
 from app.models.cover_letter import CoverLetter
 from app.schemas.cover_letter import (
     CoverLetterCreate,
     CoverLetterResponse,
     CoverLetterProgress,
 )
-from app.graphs.cover_letter import run_cover_letter_graph
+from app.services.admission import admit_session
+from app.services.cancellation import cancel_session
+from app.services.job_queue import enqueue_session
+from app.services.progress import read_progress
 
 router = APIRouter()
 
@@ -22,11 +30,12 @@ router = APIRouter()
 @router.post("", status_code=status.HTTP_202_ACCEPTED)
 async def create_cover_letter(
     request: CoverLetterCreate,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Start cover letter generation."""
+    admission = await admit_session(db, current_user.id, "cover_letter")
+
     # Create AI session
     session = AISession(
         user_id=current_user.id,
@@ -38,19 +47,15 @@ async def create_cover_letter(
     await db.commit()
     await db.refresh(session)
 
-    # Start background task
-    background_tasks.add_task(
-        run_cover_letter_graph,
-        session_id=str(session.id),
-        user_id=str(current_user.id),
-        input_data=request.model_dump(mode="json"),
-    )
+    # Queue the graph run for a worker
+    await enqueue_session(session)
 
     return {
         "session_id": session.id,
         "status": "processing",
         "message": "자기소개서 생성을 시작했습니다.",
-        "estimated_time": 120
+        "estimated_time": 120 + admission.estimated_wait,
+        "queue_position": admission.queue_position,
     }
 
 
@@ -76,7 +81,7 @@ async def get_cover_letter_status(
             detail="Session not found"
         )
 
-    progress = session.output_data.get("progress", {}) if session.output_data else {}
+    progress = await read_progress(session)
 
     return CoverLetterProgress(
         session_id=session.id,
@@ -84,10 +89,67 @@ async def get_cover_letter_status(
         current_step=progress.get("current_step"),
         iteration=progress.get("iteration"),
         score=progress.get("score"),
+        branches=progress.get("branches"),
         message=progress.get("message"),
     )
 
 
+@router.post("/{session_id}/events/token", response_model=StreamTokenResponse)
+async def create_cover_letter_events_token(
+    session_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Issue a short-lived token for the session's event stream."""
+    result = await db.execute(
+        select(AISession.id).where(
+            AISession.id == session_id,
+            AISession.user_id == current_user.id,
+            AISession.ai_type == "cover_letter"
+        )
+    )
+    if result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+
+    return StreamTokenResponse(
+        token=create_stream_token(str(current_user.id), str(session_id)),
+        expires_in=settings.STREAM_TOKEN_EXPIRE_SECONDS,
+    )
+
+
+@router.get("/{session_id}/events")
+async def stream_cover_letter_progress(
+    session_id: uuid.UUID,
+    current_user: User = Depends(get_stream_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream cover letter generation progress as Server-Sent Events.
+
+    Browsers connect with ``EventSource(".../events?token=...")``, using a
+    token from ``POST .../events/token``.
+    """
+    result = await db.execute(
+        select(AISession).where(
+            AISession.id == session_id,
+            AISession.user_id == current_user.id,
+            AISession.ai_type == "cover_letter"
+        )
+    )
+    session = result.scalar_one_or_none()
+
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+
+    events = session_progress_events(session.id, session.status, await read_progress(session))
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.get("/{session_id}/result", response_model=CoverLetterResponse)
 async def get_cover_letter_result(
     session_id: uuid.UUID,
@@ -129,3 +191,38 @@ async def get_cover_letter_result(
         )
 
     return cover_letter
+
+
+@router.post("/{session_id}/cancel")
+async def cancel_cover_letter(
+    session_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Cancel a running cover letter generation."""
+    result = await db.execute(
+        select(AISession).where(
+            AISession.id == session_id,
+            AISession.user_id == current_user.id,
+            AISession.ai_type == "cover_letter"
+        )
+    )
+    session = result.scalar_one_or_none()
+
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+
+    if not await cancel_session(db, session):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Session is already finished. Current status: {session.status}"
+        )
+
+    return {
+        "session_id": session.id,
+        "status": "cancelled",
+        "message": "작업을 취소했습니다.",
+    }
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.api.deps import get_current_user
+from app.models.user import User
+from app.services.admission import count_active_sessions, get_admission_stats
+from app.services.job_queue import get_job_queue
+from app.services.llm import get_llm_metrics
+from app.services.progress import get_progress_broker
+
+router = APIRouter()
+
+
+@router.get("/llm")
+async def get_llm_layer_metrics(
+    current_user: User = Depends(get_current_user),
+):
+    """Get LLM layer metrics (cache, in-flight coalescing)."""
+    return get_llm_metrics()
+
+
+@router.get("/admission")
+async def get_admission_metrics(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get AI session admission metrics (queue depth, active sessions, limits)."""
+    return {
+        "queue_depth": await get_job_queue().depth(),
+        "active_sessions": await count_active_sessions(db),
+        "limits": {
+            "per_user": settings.ADMISSION_USER_MAX_ACTIVE,
+            "per_type": settings.ADMISSION_TYPE_MAX_ACTIVE,
+            "max_queued_per_type": settings.ADMISSION_TYPE_MAX_QUEUED,
+        },
+        "decisions": get_admission_stats(),
+        "progress": get_progress_broker().get_stats(),
+    }
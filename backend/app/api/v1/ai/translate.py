@@ -1,10 +1,15 @@
+import asyncio
 import uuid
+from datetime import datetime
+from typing import AsyncIterator
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.core.database import get_db
+from app.core.database import get_db, async_session_maker
 from app.api.deps import get_current_user
+from app.api.sse import SSE_HEADERS, format_sse
 from app.models.user import User
 from app.models.ai_session import AISession
 from app.models.translation import Translation
@@ -14,7 +19,14 @@ from app.schemas.translation import (
     SRTTranslationCreate,
     EmailWriteCreate,
 )
-from app.graphs.translate import run_translation_graph, run_srt_translation, run_email_writing
+from app.services.admission import admit_session
+from app.graphs.translate import (
+    run_translation_graph,
+    run_srt_translation,
+    run_email_writing,
+    stream_translation,
+    stream_email_writing,
+)
 
 router = APIRouter()
 
@@ -26,6 +38,8 @@ async def translate_text(
     db: AsyncSession = Depends(get_db)
 ):
     """Translate or write text."""
+    await admit_session(db, current_user.id, "translate", queueable=False)
+
     # Create AI session
     session = AISession(
         user_id=current_user.id,
@@ -97,6 +111,8 @@ async def translate_srt(
     except UnicodeDecodeError:
         srt_content = content.decode("cp949")  # Try Korean encoding
 
+    await admit_session(db, current_user.id, "translate", queueable=False)
+
     # Create AI session
     session = AISession(
         user_id=current_user.id,
@@ -156,6 +172,8 @@ async def write_email(
     db: AsyncSession = Depends(get_db)
 ):
     """Write an email in target language with appropriate tone."""
+    await admit_session(db, current_user.id, "translate", queueable=False)
+
     # Create AI session
     session = AISession(
         user_id=current_user.id,
@@ -203,3 +221,149 @@ async def write_email(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Email writing failed: {str(e)}"
         )
+
+
+async def end_session(session_id: uuid.UUID, session_status: str, error_message: str):
+    """Mark a streamed session as ended without a result."""
+    async with async_session_maker() as db:
+        session = await db.get(AISession, session_id)
+        if session and session.status == "processing":
+            session.status = session_status
+            session.error_message = error_message
+            session.completed_at = datetime.utcnow()
+            await db.commit()
+
+
+async def stream_and_save(
+    session_id: uuid.UUID,
+    chunks: AsyncIterator[str],
+    translation_fields: dict,
+    output_key: str,
+    error_label: str,
+) -> AsyncIterator[str]:
+    """Relay generated text as SSE events, then persist the finished translation.
+
+    Events: ``session`` (once), ``delta`` per chunk, then ``done`` with the
+    saved translation id or ``error``. A client that disconnects mid-stream
+    leaves its session cancelled, so it stops counting against admission.
+    """
+    parts = []
+    try:
+        yield format_sse({"session_id": session_id}, event="session")
+        async for text in chunks:
+            parts.append(text)
+            yield format_sse({"text": text}, event="delta")
+    except (asyncio.CancelledError, GeneratorExit):
+        # Shielded so the update still runs while the response task is cancelled
+        await asyncio.shield(end_session(session_id, "cancelled", "Client disconnected"))
+        raise
+    except Exception as e:
+        await end_session(session_id, "failed", str(e))
+        yield format_sse({"detail": f"{error_label}: {str(e)}"}, event="error")
+        return
+    finally:
+        # Stop the provider stream too
+        if hasattr(chunks, "aclose"):
+            await chunks.aclose()
+
+    result = "".join(parts)
+    async with async_session_maker() as db:
+        translation = Translation(
+            session_id=session_id,
+            translated_content=result,
+            **translation_fields,
+        )
+        db.add(translation)
+
+        session = await db.get(AISession, session_id)
+        if session:
+            session.status = "completed"
+            session.completed_at = datetime.utcnow()
+            session.output_data = {output_key: result}
+
+        await db.commit()
+        await db.refresh(translation)
+
+    yield format_sse(
+        {"session_id": session_id, "translation_id": translation.id},
+        event="done",
+    )
+
+
+@router.post("/text/stream")
+async def translate_text_stream(
+    request: TranslationCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Translate text, streaming the result as Server-Sent Events."""
+    await admit_session(db, current_user.id, "translate", queueable=False)
+
+    session = AISession(
+        user_id=current_user.id,
+        ai_type="translate",
+        status="processing",
+        input_data=request.model_dump(mode="json"),
+    )
+    db.add(session)
+    await db.commit()
+    await db.refresh(session)
+
+    chunks = stream_translation(
+        content=request.content,
+        source_language=request.source_language,
+        target_language=request.target_language,
+        context=request.context,
+    )
+    events = stream_and_save(
+        session.id,
+        chunks,
+        translation_fields={
+            "source_language": request.source_language,
+            "target_language": request.target_language,
+            "translation_type": request.translation_type,
+            "original_content": request.content,
+        },
+        output_key="translated_content",
+        error_label="Translation failed",
+    )
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.post("/email/stream")
+async def write_email_stream(
+    request: EmailWriteCreate,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Write an email, streaming the result as Server-Sent Events."""
+    await admit_session(db, current_user.id, "translate", queueable=False)
+
+    session = AISession(
+        user_id=current_user.id,
+        ai_type="translate",
+        status="processing",
+        input_data=request.model_dump(mode="json"),
+    )
+    db.add(session)
+    await db.commit()
+    await db.refresh(session)
+
+    chunks = stream_email_writing(
+        context=request.context,
+        key_points=request.key_points,
+        target_language=request.target_language,
+    )
+    events = stream_and_save(
+        session.id,
+        chunks,
+        translation_fields={
+            "source_language": "ko",  # Assume Korean input
+            "target_language": request.target_language,
+            "translation_type": "email",
+            "original_content": f"Context: {request.context}\nKey Points: {request.key_points}",
+        },
+        output_key="email_content",
+        error_label="Email writing failed",
+    )
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
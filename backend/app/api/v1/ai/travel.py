@@ -1,5 +1,5 @@
 import uuid
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -9,7 +9,9 @@ from app.models.user import User
 from app.models.ai_session import AISession
 from app.models.travel import TravelPlan
 from app.schemas.travel import TravelPlanCreate, TravelPlanResponse
-from app.graphs.travel import run_travel_graph
+from app.services.admission import admit_session
+from app.services.cancellation import cancel_session
+from app.services.job_queue import enqueue_session
 
 router = APIRouter()
 
@@ -17,11 +19,12 @@ router = APIRouter()
 @router.post("", status_code=status.HTTP_202_ACCEPTED)
 async def create_travel_plan(
     request: TravelPlanCreate,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Start travel/date course planning."""
+    admission = await admit_session(db, current_user.id, "travel")
+
     # Create AI session
     session = AISession(
         user_id=current_user.id,
@@ -33,13 +36,8 @@ async def create_travel_plan(
     await db.commit()
     await db.refresh(session)
 
-    # Start background task
-    background_tasks.add_task(
-        run_travel_graph,
-        session_id=str(session.id),
-        user_id=str(current_user.id),
-        input_data=request.model_dump(mode="json"),
-    )
+    # Queue the graph run for a worker
+    await enqueue_session(session)
 
     travel_type_kr = "여행" if request.travel_type == "travel" else "데이트"
 
@@ -47,7 +45,8 @@ async def create_travel_plan(
         "session_id": session.id,
         "status": "processing",
         "message": f"{travel_type_kr} 코스 생성을 시작했습니다.",
-        "estimated_time": 60
+        "estimated_time": 45 + admission.estimated_wait,
+        "queue_position": admission.queue_position,
     }
 
 
@@ -98,3 +97,38 @@ async def get_travel_plan(
         )
 
     return plan
+
+
+@router.post("/{session_id}/cancel")
+async def cancel_travel(
+    session_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Cancel a running travel plan generation."""
+    result = await db.execute(
+        select(AISession).where(
+            AISession.id == session_id,
+            AISession.user_id == current_user.id,
+            AISession.ai_type == "travel"
+        )
+    )
+    session = result.scalar_one_or_none()
+
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+
+    if not await cancel_session(db, session):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Session is already finished. Current status: {session.status}"
+        )
+
+    return {
+        "session_id": session.id,
+        "status": "cancelled",
+        "message": "작업을 취소했습니다.",
+    }
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime, date, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
@@ -10,7 +10,9 @@ from app.models.user import User
 from app.models.ai_session import AISession
 from app.models.weekly_report import WeeklyReport
 from app.schemas.weekly_report import WeeklyReportCreate, WeeklyReportResponse
-from app.graphs.weekly_report import run_weekly_report_graph
+from app.services.admission import admit_session
+from app.services.cancellation import cancel_session
+from app.services.job_queue import enqueue_session
 
 router = APIRouter()
 
@@ -18,11 +20,12 @@ router = APIRouter()
 @router.post("", status_code=status.HTTP_202_ACCEPTED)
 async def create_weekly_report(
     request: WeeklyReportCreate,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Start weekly report generation."""
+    admission = await admit_session(db, current_user.id, "weekly_report")
+
     # Create AI session
     session = AISession(
         user_id=current_user.id,
@@ -34,19 +37,15 @@ async def create_weekly_report(
     await db.commit()
     await db.refresh(session)
 
-    # Start background task
-    background_tasks.add_task(
-        run_weekly_report_graph,
-        session_id=str(session.id),
-        user_id=str(current_user.id),
-        input_data=request.model_dump(mode="json"),
-    )
+    # Queue the graph run for a worker
+    await enqueue_session(session)
 
     return {
         "session_id": session.id,
         "status": "processing",
         "message": "주간보고서 생성을 시작했습니다.",
-        "estimated_time": 30
+        "estimated_time": 30 + admission.estimated_wait,
+        "queue_position": admission.queue_position,
     }
 
 
@@ -97,3 +96,38 @@ async def get_weekly_report(
         )
 
     return report
+
+
+@router.post("/{session_id}/cancel")
+async def cancel_weekly_report(
+    session_id: uuid.UUID,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Cancel a running weekly report generation."""
+    result = await db.execute(
+        select(AISession).where(
+            AISession.id == session_id,
+            AISession.user_id == current_user.id,
+            AISession.ai_type == "weekly_report"
+        )
+    )
+    session = result.scalar_one_or_none()
+
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+
+    if not await cancel_session(db, session):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Session is already finished. Current status: {session.status}"
+        )
+
+    return {
+        "session_id": session.id,
+        "status": "cancelled",
+        "message": "작업을 취소했습니다.",
+    }
@@ -1,7 +1,7 @@
 import os
 import uuid
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File, Form, Query
 from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
@@ -17,6 +17,7 @@ from app.schemas.document import (
     DocumentResponse,
     DocumentListResponse,
 )
+from app.services.document_digest import refresh_document_digest
 from app.services.document_parser import parse_document
 
 router = APIRouter()
@@ -76,6 +77,7 @@ async def list_documents(
 
 @router.post("", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
 async def upload_document(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     category: str = Form(...),
     title: Optional[str] = Form(None),
@@ -135,6 +137,9 @@ async def upload_document(
     await db.commit()
     await db.refresh(document)
 
+    # Digest used by AI sessions instead of the full text
+    background_tasks.add_task(refresh_document_digest, document.id)
+
     return document
 
 
@@ -166,6 +171,7 @@ async def get_document(
 async def update_document(
     document_id: uuid.UUID,
     document_update: DocumentUpdate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -185,12 +191,17 @@ async def update_document(
         )
 
     update_data = document_update.model_dump(exclude_unset=True)
+    recategorized = update_data.get("category", document.category) != document.category
     for field, value in update_data.items():
         setattr(document, field, value)
 
     await db.commit()
     await db.refresh(document)
 
+    # Digests depend on the category
+    if recategorized:
+        background_tasks.add_task(refresh_document_digest, document.id)
+
     return document
 
 
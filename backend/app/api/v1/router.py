@@ -7,6 +7,7 @@ from app.api.v1.ai import (
     translate,
     economy,
     travel,
+    metrics,
 )
 
 api_router = APIRouter()
@@ -51,3 +52,8 @@ api_router.include_router(
     prefix="/ai/travel",
     tags=["ai", "travel"]
 )
+api_router.include_router(
+    metrics.router,
+    prefix="/ai/metrics",
+    tags=["ai", "metrics"]
+)
@@ -20,12 +20,98 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Lifetime of the ?token= a browser EventSource uses for a session's events
+    STREAM_TOKEN_EXPIRE_SECONDS: int = 60
 
     # LLM API Keys
     OPENAI_API_KEY: Optional[str] = None
     GOOGLE_API_KEY: Optional[str] = None
     ANTHROPIC_API_KEY: Optional[str] = None
 
+    # LLM response cache
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_TTL: int = 24 * 60 * 60  # seconds
+    LLM_CACHE_MAX_ENTRIES: int = 1024  # in-process LRU size
+    # Only calls at or below this temperature are cached; sampled output stays fresh
+    LLM_CACHE_MAX_TEMPERATURE: float = 0.0
+
+    # Coalesce concurrent identical LLM calls into one provider request
+    LLM_SINGLE_FLIGHT_ENABLED: bool = True
+
+    # LLM rate governor (per provider/model RPM, TPM and adaptive concurrency)
+    LLM_GOVERNOR_ENABLED: bool = True
+    LLM_RATE_LIMITS: dict = {}  # e.g. {"anthropic": {"rpm": 50}, "openai:gpt-5": {"tpm": 30000}}
+    LLM_GOVERNOR_OUTPUT_RESERVE: int = 1000  # tokens reserved per call for the response
+    LLM_GOVERNOR_MAX_RETRIES: int = 2
+    LLM_GOVERNOR_LATENCY_SPIKE_FACTOR: float = 3.0
+
+    # Hedged requests: race an equivalent model on another provider when slow
+    LLM_HEDGING_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 95.0  # hedge after this percentile of recent latency
+    LLM_HEDGE_MIN_DELAY: float = 2.0  # never hedge earlier than this (seconds)
+    LLM_HEDGE_MIN_SAMPLES: int = 20  # latency samples needed before hedging
+    LLM_HEDGE_MAX_RATE: float = 0.1  # max share of calls that may be hedged
+    LLM_HEDGE_EQUIVALENTS: dict = {}  # e.g. {"claude-opus-4.5": ["gpt-5.2"]}
+
+    # LLM provider mode: live, record (live + save responses), fake (offline)
+    LLM_PROVIDER_MODE: str = "live"
+    LLM_FAKE_RECORDINGS_PATH: str = "./llm_recordings.jsonl"
+    LLM_FAKE_LATENCY_MEDIAN: float = 1.0  # seconds to first token
+    LLM_FAKE_LATENCY_SIGMA: float = 0.5  # log-normal spread of time to first token
+    LLM_FAKE_TOKENS_PER_SECOND: float = 50.0
+    LLM_FAKE_OUTPUT_TOKENS: int = 300  # length of synthesized responses
+    LLM_FAKE_SEED: Optional[int] = None
+
+    # Batch API for background jobs: provider (async batch endpoints) or local
+    LLM_BATCH_MODE: str = "provider"
+    LLM_BATCH_POLL_INTERVAL: float = 30.0  # seconds between job status checks
+    LLM_BATCH_TIMEOUT: float = 4 * 60 * 60  # cancel and run locally after this (seconds)
+    LLM_BATCH_MAX_TOKENS: int = 1024  # response cap for providers that require one
+    LLM_BATCH_LOCAL_CONCURRENCY: int = 4
+
+    # LangGraph checkpointing (Postgres) and resume of interrupted sessions
+    GRAPH_CHECKPOINTING_ENABLED: bool = True
+    GRAPH_CHECKPOINT_POOL_SIZE: int = 5
+    GRAPH_RESUME_ON_STARTUP: bool = True  # local job queue only; enable on a single process
+
+    # Background job queue: local (in-process, lost on restart) or postgres
+    # (durable, run `python -m app.worker`)
+    JOB_QUEUE_BACKEND: str = "local"
+    WORKER_CONCURRENCY: int = 4  # graph runs per worker process
+    JOB_VISIBILITY_TIMEOUT: int = 300  # seconds a claimed job stays hidden without a heartbeat
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF: int = 30  # seconds, doubled for each attempt
+    JOB_POLL_INTERVAL: float = 1.0  # seconds between claims when the queue is empty
+
+    # Session progress events (Redis pub/sub, in-process without Redis)
+    PROGRESS_FLUSH_INTERVAL: float = 5.0  # seconds between coalesced progress writes to Postgres
+    PROGRESS_SNAPSHOT_TTL: int = 60 * 60  # seconds the latest progress is kept in Redis
+    PROGRESS_HEARTBEAT_INTERVAL: float = 15.0  # keep-alive for idle SSE connections
+
+    # Document digests, built on upload and used in prompts instead of full documents
+    DOCUMENT_DIGEST_MODEL: str = "gpt-5-mini"
+
+    # Cover letters: drafts generated per question, pre-ranked by writing style (1 = off, max 4)
+    COVER_LETTER_BEST_OF_N: int = 1
+    # Score clear-cut answers with the local style scorer; only borderline ones go to the LLM judge
+    COVER_LETTER_STYLE_GATE: bool = True
+
+    # Seconds between checks for sessions cancelled from another process
+    CANCEL_POLL_INTERVAL: float = 0.5
+
+    # Admission control for AI sessions
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_USER_MAX_ACTIVE: int = 3  # pending/processing sessions per user
+    ADMISSION_TYPE_MAX_ACTIVE: dict = {
+        "cover_letter": 8,
+        "proposal": 4,
+        "travel": 10,
+        "weekly_report": 10,
+        "translate": 20,
+    }  # sessions running at once per AI type
+    ADMISSION_TYPE_MAX_QUEUED: int = 20  # waiting per AI type before rejecting
+    ADMISSION_ACTIVE_WINDOW: int = 60 * 60  # older unfinished sessions are treated as abandoned
+
     # Storage
     UPLOAD_DIR: str = "./uploads"
     MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024  # 50MB
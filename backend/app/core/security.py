@@ -12,6 +12,7 @@ pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 class TokenData(BaseModel):
     user_id: Optional[str] = None
     token_type: Optional[str] = None
+    session_id: Optional[str] = None
 
 
 class Token(BaseModel):
@@ -60,6 +61,17 @@ def create_refresh_token(
     return encoded_jwt
 
 
+def create_stream_token(user_id: str, session_id: str) -> str:
+    """Create a short-lived token for one AI session's event stream.
+
+    EventSource can't send an Authorization header, so the browser passes
+    this as ``?token=`` instead of its access token.
+    """
+    expire = datetime.utcnow() + timedelta(seconds=settings.STREAM_TOKEN_EXPIRE_SECONDS)
+    to_encode = {"sub": user_id, "sid": session_id, "exp": expire, "type": "stream"}
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
 def decode_token(token: str) -> Optional[TokenData]:
     """Decode and validate a JWT token."""
     try:
@@ -68,7 +80,7 @@ def decode_token(token: str) -> Optional[TokenData]:
         token_type: str = payload.get("type")
         if user_id is None:
             return None
-        return TokenData(user_id=user_id, token_type=token_type)
+        return TokenData(user_id=user_id, token_type=token_type, session_id=payload.get("sid"))
     except JWTError:
         return None
 
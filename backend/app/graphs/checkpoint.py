@@ -0,0 +1,151 @@
+"""Durable LangGraph checkpointing in Postgres.
+
+Compiled graphs save a checkpoint after every node, keyed by the AI session
+id (``thread_id``). When the process dies mid-run, the session is left in
+``pending`` or ``processing``; on the next startup
+``resume_interrupted_sessions`` queues it again, and the run continues
+from the last completed node instead of redoing every LLM call. A session's checkpoints are
+deleted once its run has finished for good.
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.graph.state import CompiledStateGraph
+from loguru import logger
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.ai_session import AISession
+
+
+_pool = None
+_checkpointer: Optional[BaseCheckpointSaver] = None
+
+
+def _conninfo() -> str:
+    """psycopg connection string for the SQLAlchemy DATABASE_URL."""
+    return settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+async def open_checkpointer() -> Optional[BaseCheckpointSaver]:
+    """Connect the Postgres checkpointer and create its tables.
+
+    Returns None (graphs run without checkpoints) when disabled or when
+    Postgres can't be reached.
+    """
+    global _pool, _checkpointer
+    if not settings.GRAPH_CHECKPOINTING_ENABLED:
+        return None
+
+    try:
+        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+        from psycopg.rows import dict_row
+        from psycopg_pool import AsyncConnectionPool
+    except ImportError as e:
+        logger.warning(f"Graph checkpointing unavailable, install langgraph-checkpoint-postgres: {e}")
+        return None
+
+    pool = AsyncConnectionPool(
+        _conninfo(),
+        max_size=settings.GRAPH_CHECKPOINT_POOL_SIZE,
+        open=False,
+        kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+    )
+    try:
+        await pool.open(wait=True, timeout=10)
+        checkpointer = AsyncPostgresSaver(pool)
+        await checkpointer.setup()
+    except Exception as e:
+        logger.error(f"Graph checkpointing disabled, Postgres checkpointer failed: {e}")
+        await pool.close()
+        return None
+
+    _pool, _checkpointer = pool, checkpointer
+    logger.info("Graph checkpointing enabled (Postgres)")
+    return checkpointer
+
+
+async def close_checkpointer():
+    global _pool, _checkpointer
+    if _pool is not None:
+        await _pool.close()
+    _pool, _checkpointer = None, None
+
+
+def graph_config(session_id: str, **config) -> dict:
+    """Invocation config that checkpoints the run under its session id."""
+    return {**config, "configurable": {"thread_id": session_id}}
+
+
+async def has_checkpoint(graph: CompiledStateGraph, config: dict) -> bool:
+    """True if the session has an unfinished checkpointed run to continue."""
+    if graph.checkpointer is None:
+        return False
+    snapshot = await graph.aget_state(config)
+    return bool(snapshot.next)
+
+
+async def delete_checkpoint(graph: CompiledStateGraph, session_id: str):
+    """Drop the checkpoints of a session that won't be resumed again."""
+    if graph.checkpointer is None:
+        return
+    try:
+        await graph.checkpointer.adelete_thread(session_id)
+    except Exception as e:
+        logger.warning(f"Failed to delete the checkpoints of session {session_id}: {e}")
+
+
+async def resume_interrupted_sessions() -> int:
+    """Queue again the graph sessions left unfinished by a previous process.
+
+    Both ``processing`` and ``pending`` sessions are picked up: a session
+    may still be ``pending`` when the process dies before its first
+    progress update. Sessions older than ADMISSION_ACTIVE_WINDOW are
+    marked failed instead of being re-run on every deploy.
+
+    Resumed sessions go through the job queue (concurrency, admission caps
+    and retries) with the interrupted run counted as an attempt, so they
+    continue from their last checkpoint; the rest restart from their input.
+    Run this in one process only: with several workers, enable
+    GRAPH_RESUME_ON_STARTUP on a single one.
+    """
+    from app.graphs.registry import get_runners
+    from app.services.job_queue import discard_checkpoint, get_job_queue
+
+    since = datetime.utcnow() - timedelta(seconds=settings.ADMISSION_ACTIVE_WINDOW)
+    async with async_session_maker() as db:
+        result = await db.execute(
+            select(AISession).where(
+                AISession.status.in_(("pending", "processing")),
+                AISession.ai_type.in_(list(get_runners())),
+            )
+        )
+        sessions = result.scalars().all()
+        stale = [session for session in sessions if session.created_at < since]
+        if stale:
+            await db.execute(
+                update(AISession)
+                .where(
+                    AISession.id.in_([session.id for session in stale]),
+                    AISession.status.in_(("pending", "processing")),
+                )
+                .values(status="failed", error_message="작업이 중단되었습니다. 다시 시도해주세요.")
+            )
+            await db.commit()
+
+    for session in stale:
+        await discard_checkpoint(session.ai_type, str(session.id))
+
+    resumed = [session for session in sessions if session.created_at >= since]
+    queue = get_job_queue()
+    for session in resumed:
+        await queue.enqueue(session, attempts=1)
+
+    if sessions:
+        logger.info(
+            f"Resuming {len(resumed)} interrupted AI sessions, "
+            f"{len(stale)} older ones marked failed"
+        )
+    return len(resumed)
@@ -1,19 +1,71 @@
 """Cover Letter Generation LangGraph Workflow."""
+import asyncio
 import json
+import time
 from typing import TypedDict, List, Optional, Annotated
 from datetime import datetime
 from uuid import UUID
 
-from langgraph.graph import StateGraph, END
+from langgraph.graph import StateGraph, START, END
+from langgraph.types import Command
 from langchain_core.messages import HumanMessage, AIMessage
 
-from app.services.llm import get_model
+from app.services.llm import ANALYSIS_TEMPERATURE, cached_prefix, get_model
+from app.graphs.checkpoint import delete_checkpoint, graph_config, has_checkpoint
+from app.graphs.registry import get_graph
+from app.services.cancellation import cancellable, raise_if_cancelled
+from app.services.document_digest import load_digests, load_style_profile, render_digest
+from app.services.job_queue import mark_session_processing, mark_session_retrying
+from app.services.llm_telemetry import llm_session, save_session_telemetry
+from app.services.progress import current_progress, finish_progress, publish_progress
+from app.services.prompt_budget import PromptBudget
+from app.services.stylometry import rank_by_profile, relative_similarity, style_feedback
+from app.core.config import settings
 from app.core.database import async_session_maker
 from app.models.ai_session import AISession
 from app.models.cover_letter import CoverLetter
-from app.models.document import Document
 from sqlalchemy import select
 
+# Token budgets for document context sent to the LLM
+DRAFT_CONTEXT_TOKENS = 6000
+DRAFT_RESUME_TOKENS = 2500
+DRAFT_PORTFOLIO_TOKENS = 1500
+DRAFT_REFERENCE_TOKENS = 1500
+MAX_REFERENCE_LETTERS = 3
+
+# Convergence control for the draft -> judge -> revise loop
+TARGET_SCORE = 85.0
+MAX_ITERATIONS = 10
+PLATEAU_MIN_GAIN = 2.0  # score points a revision must add to count as progress
+PLATEAU_PATIENCE = 2  # judged revisions without progress before stopping
+SESSION_TOKEN_BUDGET = 60000  # tokens for drafting, judging and revising
+SESSION_TIME_BUDGET = 300  # seconds since the session started
+
+# Best-of-N drafting (COVER_LETTER_BEST_OF_N > 1): candidate models and
+# temperatures, used in order and cycled when N exceeds the list
+DRAFT_CANDIDATES = [
+    ("claude-sonnet-4.5", 0.7),
+    ("claude-sonnet-4.5", 1.0),
+    ("gemini-3-pro", 0.8),
+    ("claude-sonnet-4.5", 0.4),
+]
+
+# Style gate (COVER_LETTER_STYLE_GATE): answers whose local style similarity,
+# relative to the user's own letters, is at least STYLE_ACCEPT_RATIO pass
+# without the LLM judge; at most STYLE_REJECT_RATIO are revised right away
+STYLE_ACCEPT_RATIO = 0.95
+STYLE_REJECT_RATIO = 0.6
+
+# Asked when the job posting analysis finds no questions
+DEFAULT_QUESTIONS = ["자기소개", "지원동기", "입사 후 포부"]
+
+# Independent preparation branches, run in parallel before drafting
+PREPARATION_BRANCHES = {
+    "collect_documents": "문서 수집",
+    "research_company": "회사 조사",
+    "analyze_job_posting": "채용 공고 분석",
+}
+
 
 class CoverLetterState(TypedDict):
     """State for cover letter generation."""
@@ -29,58 +81,75 @@ class CoverLetterState(TypedDict):
     resume_content: str
     portfolio_content: str
     existing_cover_letters: List[str]
+    # Same letters whose digest has a style fingerprint, for the local style scorer
+    style_document_ids: List[str]
 
     # Research results
     company_research: str
     job_requirements: dict
 
-    # Generation
+    # Stable prompt prefix shared by draft, compare and revise calls
+    context_prefix: str
+
+    # Generation (answers keyed by question)
     current_cover_letter: dict
-    comparison_score: float
-    feedback: str
+    revised_questions: List[str]  # answers written since the last judgement
+    comparison_score: Optional[float]
+    answer_scores: dict
+    answer_feedback: dict
     iteration_count: int
 
+    # Convergence control
+    started_at: float
+    loop_tokens: int
+    score_history: List[dict]
+    best_cover_letter: dict
+    best_answer_scores: dict
+    best_score: Optional[float]
+    stop_reason: Optional[str]
+
     # Final
     final_cover_letter: dict
-    final_score: float
+    final_score: Optional[float]
     error: Optional[str]
 
 
-async def collect_documents(state: CoverLetterState) -> CoverLetterState:
+async def collect_documents(state: CoverLetterState) -> dict:
     """Collect documents from database."""
+    raise_if_cancelled(state["session_id"])
+    await update_branch_progress(state["session_id"], "collect_documents", "running")
+
+    # Digests built at upload time stand in for the full documents
     async with async_session_maker() as db:
-        # Get user's documents
-        result = await db.execute(
-            select(Document).where(
-                Document.user_id == UUID(state["user_id"]),
-                Document.is_archived == False
-            )
-        )
-        documents = result.scalars().all()
-
-        resume_content = ""
-        portfolio_content = ""
-        existing_cover_letters = []
-
-        for doc in documents:
-            if doc.category == "resume" and doc.markdown_content:
-                resume_content = doc.markdown_content
-            elif doc.category == "portfolio" and doc.markdown_content:
-                portfolio_content = doc.markdown_content
-            elif doc.category == "cover_letter" and doc.markdown_content:
-                existing_cover_letters.append(doc.markdown_content)
-
-        return {
-            **state,
-            "resume_content": resume_content,
-            "portfolio_content": portfolio_content,
-            "existing_cover_letters": existing_cover_letters[:3],  # Limit to 3
-        }
+        user_id = UUID(state["user_id"])
+        resumes = await load_digests(db, user_id, ["resume"], limit=1)
+        portfolios = await load_digests(db, user_id, ["portfolio"], limit=1)
+        letters = await load_digests(db, user_id, ["cover_letter"], limit=MAX_REFERENCE_LETTERS)
+        letters = [d for d in letters if d.digest.get("excerpt")]
+
+    resume_content = render_digest(resumes[0].digest) if resumes else ""
+    portfolio_content = render_digest(portfolios[0].digest) if portfolios else ""
+    existing_cover_letters = [d.digest["excerpt"] for d in letters]
+    # Style is scored on fingerprints of whole letters, loaded by id when
+    # needed so the letters stay out of the checkpointed state
+    style_document_ids = [str(d.document_id) for d in letters if d.digest.get("style")]
+
+    await update_branch_progress(state["session_id"], "collect_documents", "completed")
+
+    # Branches run concurrently, so each returns only its own keys
+    return {
+        "resume_content": resume_content,
+        "portfolio_content": portfolio_content,
+        "existing_cover_letters": existing_cover_letters,
+        "style_document_ids": style_document_ids,
+    }
 
 
-async def research_company(state: CoverLetterState) -> CoverLetterState:
+async def research_company(state: CoverLetterState) -> dict:
     """Research company information."""
-    model = get_model("gpt-5-mini")
+    raise_if_cancelled(state["session_id"])
+    await update_branch_progress(state["session_id"], "research_company", "running")
+    model = get_model("gpt-5-mini", temperature=ANALYSIS_TEMPERATURE)
 
     prompt = f"""
     다음 회사에 대해 조사해주세요: {state["company_name"]}
@@ -96,15 +165,18 @@ async def research_company(state: CoverLetterState) -> CoverLetterState:
 
     response = await model.ainvoke([HumanMessage(content=prompt)])
 
+    await update_branch_progress(state["session_id"], "research_company", "completed")
+
     return {
-        **state,
         "company_research": response.content,
     }
 
 
-async def analyze_job_posting(state: CoverLetterState) -> CoverLetterState:
+async def analyze_job_posting(state: CoverLetterState) -> dict:
     """Analyze job posting requirements."""
-    model = get_model("gpt-5-mini")
+    raise_if_cancelled(state["session_id"])
+    await update_branch_progress(state["session_id"], "analyze_job_posting", "running")
+    model = get_model("gpt-5-mini", temperature=ANALYSIS_TEMPERATURE)
 
     prompt = f"""
     다음 채용 공고를 분석하여 JSON 형식으로 정리해주세요:
@@ -137,34 +209,45 @@ async def analyze_job_posting(state: CoverLetterState) -> CoverLetterState:
             "position": "지원 직무",
             "requirements": [],
             "preferred": [],
-            "questions": ["자기소개", "지원동기", "입사 후 포부"],
+            "questions": DEFAULT_QUESTIONS,
             "keywords": []
         }
 
+    await update_branch_progress(state["session_id"], "analyze_job_posting", "completed")
+
     return {
-        **state,
         "job_requirements": requirements,
     }
 
 
-async def generate_draft(state: CoverLetterState) -> CoverLetterState:
-    """Generate cover letter draft."""
-    model = get_model("claude-sonnet-4.5")
+def build_context_prefix(state: CoverLetterState, model_id: str) -> str:
+    """Candidate and company context shared by every writing prompt.
 
+    It is sent first and unchanged by generate_draft, compare_identity and
+    revise_cover_letter, so provider prompt caching serves it from cache on
+    every revise-loop iteration after the first.
+    """
     existing_letters = "\n\n---\n\n".join(state["existing_cover_letters"][:2])
 
-    prompt = f"""
+    context = PromptBudget(model_id, total_tokens=DRAFT_CONTEXT_TOKENS)
+    context.add("resume", state["resume_content"], priority=3, max_tokens=DRAFT_RESUME_TOKENS)
+    context.add("portfolio", state["portfolio_content"], priority=2, max_tokens=DRAFT_PORTFOLIO_TOKENS)
+    context.add("existing_letters", existing_letters, priority=1, max_tokens=DRAFT_REFERENCE_TOKENS)
+    sections = context.allocate()
+
+    return f"""
     당신은 전문 이력서 작성 컨설턴트입니다.
+    아래 지원자 및 회사 자료를 바탕으로 요청된 작업을 수행하세요.
 
     ## 지원자 정보
     ### 이력서
-    {state["resume_content"][:3000]}
+    {sections["resume"]}
 
     ### 포트폴리오
-    {state["portfolio_content"][:2000]}
+    {sections["portfolio"]}
 
     ## 기존 자기소개서 (톤앤매너 참고)
-    {existing_letters[:2000]}
+    {sections["existing_letters"] or "없음"}
 
     ## 회사 정보
     {state["company_research"]}
@@ -174,53 +257,149 @@ async def generate_draft(state: CoverLetterState) -> CoverLetterState:
 
     ## 추가 지시사항
     {state.get("additional_instructions") or "없음"}
+    """
+
+
+def response_tokens(response) -> int:
+    usage = getattr(response, "usage_metadata", None) or {}
+    return usage.get("total_tokens", 0)
+
+
+def mean_score(scores: dict) -> float:
+    return round(sum(scores.values()) / len(scores), 1)
+
+
+def convergence_stop_reason(state: CoverLetterState, history: List[dict]) -> Optional[str]:
+    """Why the revise loop should stop after the latest judged version, if it should.
+
+    Stops when every answer reaches the target, when scores plateau, when
+    the run is already over its token or time budget, or when another
+    revise + judge round would not fit it. The estimate is the last revise
+    round's cost, so budgets are only projected once a revision has been
+    judged; the first entry also pays for preparing and drafting, which a
+    revision doesn't repeat.
+    """
+    scores = [entry["score"] for entry in history]
+    if min(history[-1]["answer_scores"].values()) >= TARGET_SCORE:
+        return "target_reached"
+    if state["iteration_count"] >= MAX_ITERATIONS:
+        return "max_iterations"
+    if len(scores) > PLATEAU_PATIENCE:
+        recent_best = max(scores[-PLATEAU_PATIENCE:])
+        if recent_best < max(scores[:-PLATEAU_PATIENCE]) + PLATEAU_MIN_GAIN:
+            return "plateau"
+
+    last = history[-1]
+    if last["tokens"] > SESSION_TOKEN_BUDGET:
+        return "token_budget"
+    if last["elapsed"] > SESSION_TIME_BUDGET:
+        return "time_budget"
+
+    if len(history) < 2:
+        return None
+    previous = history[-2]
+    if last["tokens"] + (last["tokens"] - previous["tokens"]) > SESSION_TOKEN_BUDGET:
+        return "token_budget"
+    if last["elapsed"] + (last["elapsed"] - previous["elapsed"]) > SESSION_TIME_BUDGET:
+        return "time_budget"
+    return None
+
+
+async def draft_answer(model, context_prefix: str, question: str, questions: List[str]):
+    """Draft the answer to one question."""
+    others = "\n".join(f"- {q}" for q in questions if q != question) or "없음"
 
+    prompt = f"""
     ## 작성 요청
-    위 정보를 바탕으로 각 자소서 문항에 대한 답변을 작성해주세요.
+    위 정보를 바탕으로 아래 자소서 문항에 대한 답변을 작성해주세요.
     기존 자소서의 톤앤매너를 유지하면서, 회사와 직무에 맞게 작성해주세요.
 
-    출력 형식 (JSON만 출력):
-    {{
-        "문항1 제목": "답변 내용...",
-        "문항2 제목": "답변 내용..."
-    }}
+    ## 문항
+    {question}
+
+    ## 다른 문항 (내용이 겹치지 않도록 참고)
+    {others}
+
+    답변 내용만 출력해주세요.
     """
 
-    response = await model.ainvoke([HumanMessage(content=prompt)])
+    return await model.ainvoke([cached_prefix(context_prefix), HumanMessage(content=prompt)])
 
-    try:
-        content = response.content
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0]
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0]
 
-        draft = json.loads(content.strip())
-    except (json.JSONDecodeError, IndexError):
-        # Fallback: treat entire response as content
-        draft = {"자기소개서": response.content}
+async def draft_best_answer(models: list, context_prefix: str, question: str, questions: List[str], profile):
+    """Draft one question with every candidate model concurrently and keep
+    the answer closest in style to the user's existing letters.
+
+    Returns the chosen answer and the responses (for token accounting).
+    """
+    responses = await asyncio.gather(*[
+        draft_answer(model, context_prefix, question, questions)
+        for model in models
+    ])
+    candidates = [response.content.strip() for response in responses]
+    best, _ = rank_by_profile(candidates, profile)[0]
+    return candidates[best], responses
+
+
+async def generate_draft(state: CoverLetterState) -> CoverLetterState:
+    """Generate cover letter draft, one concurrent call per question.
+
+    In best-of-N mode each question gets N candidates from different models
+    and temperatures, pre-ranked locally by writing style so only the top
+    one goes to the judge.
+    """
+    raise_if_cancelled(state["session_id"])
+    model = get_model("claude-sonnet-4.5")
+
+    context_prefix = build_context_prefix(state, model.model_id)
+    questions = [str(q) for q in state["job_requirements"].get("questions") or DEFAULT_QUESTIONS]
+
+    profile = await load_style_profile(state["user_id"], state["style_document_ids"])
+    # Repeating a candidate would share its cache and single-flight key and
+    # return the same answer, so N is capped at the distinct candidates
+    n = min(settings.COVER_LETTER_BEST_OF_N, len(DRAFT_CANDIDATES))
+    if n > 1 and profile is not None:
+        models = [get_model(alias, temperature=temperature) for alias, temperature in DRAFT_CANDIDATES[:n]]
+        results = await asyncio.gather(*[
+            draft_best_answer(models, context_prefix, question, questions, profile)
+            for question in questions
+        ])
+        draft = {question: answer for question, (answer, _) in zip(questions, results)}
+        responses = [response for _, question_responses in results for response in question_responses]
+    else:
+        responses = await asyncio.gather(*[
+            draft_answer(model, context_prefix, question, questions)
+            for question in questions
+        ])
+        draft = {question: response.content.strip() for question, response in zip(questions, responses)}
 
     return {
         **state,
+        "context_prefix": context_prefix,
         "current_cover_letter": draft,
+        "revised_questions": list(draft),
         "iteration_count": state.get("iteration_count", 0) + 1,
+        "loop_tokens": state["loop_tokens"] + sum(response_tokens(r) for r in responses),
+        "best_cover_letter": draft,
     }
 
 
-async def compare_identity(state: CoverLetterState) -> CoverLetterState:
-    """Compare with existing cover letters for identity consistency."""
-    model = get_model("claude-haiku-4.5")
+def after_draft(state: CoverLetterState) -> str:
+    """Only judge identity when there are existing letters to compare with."""
+    if not state.get("existing_cover_letters"):
+        return "finalize"
+    return "compare"
 
-    existing_letters = "\n\n---\n\n".join(state["existing_cover_letters"][:2])
 
-    prompt = f"""
-    두 자기소개서가 동일인물이 작성했는지 분석해주세요.
+async def judge_identity(context_prefix: str, answers: dict):
+    """Ask the LLM judge whether the answers read like the user's own letters."""
+    model = get_model("claude-haiku-4.5", temperature=ANALYSIS_TEMPERATURE)
 
-    ## 기존 자기소개서
-    {existing_letters[:2000]}
+    prompt = f"""
+    위 기존 자기소개서와 아래 새로 작성된 자기소개서 답변들이 동일인물이 작성했는지 문항별로 분석해주세요.
 
-    ## 새로 생성된 자기소개서
-    {json.dumps(state["current_cover_letter"], ensure_ascii=False)}
+    ## 새로 작성된 답변
+    {json.dumps(answers, ensure_ascii=False)}
 
     ## 분석 기준
     1. 문체 일관성 (어투, 문장 구조)
@@ -229,16 +408,22 @@ async def compare_identity(state: CoverLetterState) -> CoverLetterState:
     4. 어휘 사용 패턴
     5. 스토리텔링 방식
 
-    출력 형식 (JSON만 출력):
+    출력 형식 (JSON만 출력, 문항 제목은 그대로):
     {{
-        "similarity_score": 0-100 사이 숫자,
-        "is_same_person": true 또는 false,
-        "feedback": "구체적인 피드백 및 개선 제안"
+        "문항 제목": {{
+            "similarity_score": 0-100 사이 숫자,
+            "feedback": "이 답변에 대한 구체적인 피드백 및 개선 제안"
+        }}
     }}
     """
 
-    response = await model.ainvoke([HumanMessage(content=prompt)])
+    return await model.ainvoke([cached_prefix(context_prefix), HumanMessage(content=prompt)])
+
 
+def parse_judgement(response) -> dict:
+    """Per-question results from the judge's JSON reply."""
+    if response is None:
+        return {}
     try:
         content = response.content
         if "```json" in content:
@@ -246,12 +431,73 @@ async def compare_identity(state: CoverLetterState) -> CoverLetterState:
         elif "```" in content:
             content = content.split("```")[1].split("```")[0]
 
-        analysis = json.loads(content.strip())
-        score = float(analysis.get("similarity_score", 80))
-        feedback = analysis.get("feedback", "")
-    except (json.JSONDecodeError, IndexError, ValueError):
-        score = 80.0
-        feedback = "분석을 완료했습니다."
+        return json.loads(content.strip())
+    except (json.JSONDecodeError, IndexError):
+        return {}
+
+
+async def compare_identity(state: CoverLetterState) -> CoverLetterState:
+    """Score each newly written answer for identity consistency.
+
+    Only answers drafted or revised since the last judgement are scored;
+    the others keep their scores. With the style gate on, answers that are
+    clearly close to or far from the user's own letters are scored locally
+    and only the borderline ones go to the LLM judge.
+    """
+    raise_if_cancelled(state["session_id"])
+
+    judged = {q: state["current_cover_letter"][q] for q in state["revised_questions"]}
+
+    answer_scores = dict(state["answer_scores"])
+    answer_feedback = dict(state["answer_feedback"])
+    local = {}
+    profile = (
+        await load_style_profile(state["user_id"], state["style_document_ids"])
+        if settings.COVER_LETTER_STYLE_GATE else None
+    )
+    if profile is not None:
+        for question, answer in judged.items():
+            ratio = relative_similarity(answer, profile)
+            if ratio >= STYLE_ACCEPT_RATIO:
+                local[question] = round(100 * min(ratio, 1.0), 1)
+                answer_feedback[question] = ""
+            elif ratio <= STYLE_REJECT_RATIO:
+                local[question] = round(100 * ratio, 1)
+                answer_feedback[question] = style_feedback(answer, profile)
+    answer_scores.update(local)
+
+    borderline = {q: answer for q, answer in judged.items() if q not in local}
+    response = await judge_identity(state["context_prefix"], borderline) if borderline else None
+    analysis = parse_judgement(response)
+
+    for question in borderline:
+        result = analysis.get(question) if isinstance(analysis, dict) else None
+        try:
+            answer_scores[question] = float(result["similarity_score"])
+            answer_feedback[question] = result.get("feedback", "")
+        except (TypeError, KeyError, ValueError):
+            answer_scores[question] = 80.0
+            answer_feedback[question] = "분석을 완료했습니다."
+    score = mean_score(answer_scores)
+
+    loop_tokens = state["loop_tokens"] + (response_tokens(response) if response is not None else 0)
+    history = state["score_history"] + [{
+        "iteration": state["iteration_count"],
+        "score": score,
+        "answer_scores": answer_scores,
+        "locally_scored": sorted(local),
+        "tokens": loop_tokens,
+        "elapsed": round(time.time() - state["started_at"], 1),
+    }]
+    stop_reason = convergence_stop_reason(state, history)
+
+    # Keep the best-scoring version of every answer
+    best_cover_letter = dict(state["best_cover_letter"])
+    best_answer_scores = dict(state["best_answer_scores"])
+    for question in judged:
+        if answer_scores[question] > best_answer_scores.get(question, -1.0):
+            best_cover_letter[question] = state["current_cover_letter"][question]
+            best_answer_scores[question] = answer_scores[question]
 
     # Update session progress
     await update_session_progress(
@@ -267,62 +513,80 @@ async def compare_identity(state: CoverLetterState) -> CoverLetterState:
     return {
         **state,
         "comparison_score": score,
-        "feedback": feedback,
+        "answer_scores": answer_scores,
+        "answer_feedback": answer_feedback,
+        "loop_tokens": loop_tokens,
+        "score_history": history,
+        "best_cover_letter": best_cover_letter,
+        "best_answer_scores": best_answer_scores,
+        "best_score": mean_score(best_answer_scores),
+        "stop_reason": stop_reason,
     }
 
 
 def should_continue(state: CoverLetterState) -> str:
     """Decide whether to continue revising or finalize."""
-    if state["comparison_score"] >= 85:
-        return "finalize"
-    if state["iteration_count"] >= 10:
+    if state["stop_reason"]:
         return "finalize"
-    if not state.get("existing_cover_letters"):
-        return "finalize"  # No reference to compare
     return "revise"
 
 
-async def revise_cover_letter(state: CoverLetterState) -> CoverLetterState:
-    """Revise cover letter based on feedback."""
-    model = get_model("claude-sonnet-4.5")
-
+async def revise_answer(model, context_prefix: str, question: str, answer: str, feedback: str):
+    """Revise the answer to one question based on its feedback."""
     prompt = f"""
-    다음 피드백을 반영하여 자기소개서를 수정해주세요.
+    다음 피드백을 반영하여 자기소개서 문항의 답변을 수정해주세요.
+    위 기존 자기소개서의 톤앤매너를 참고하세요.
 
-    ## 현재 자기소개서
-    {json.dumps(state["current_cover_letter"], ensure_ascii=False)}
+    ## 문항
+    {question}
 
-    ## 피드백
-    {state["feedback"]}
+    ## 현재 답변
+    {answer}
 
-    ## 기존 자기소개서 (참고)
-    {state["existing_cover_letters"][0] if state["existing_cover_letters"] else "없음"}
+    ## 피드백
+    {feedback}
 
-    피드백을 반영하여 수정된 자기소개서를 JSON 형식으로 출력해주세요.
+    수정된 답변 내용만 출력해주세요.
     """
 
-    response = await model.ainvoke([HumanMessage(content=prompt)])
+    return await model.ainvoke([cached_prefix(context_prefix), HumanMessage(content=prompt)])
 
-    try:
-        content = response.content
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0]
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0]
 
-        revised = json.loads(content.strip())
-    except (json.JSONDecodeError, IndexError):
-        revised = state["current_cover_letter"]
+async def revise_cover_letter(state: CoverLetterState) -> CoverLetterState:
+    """Revise, concurrently, only the answers scored below the target."""
+    raise_if_cancelled(state["session_id"])
+    model = get_model("claude-sonnet-4.5")
+
+    questions = [q for q, score in state["answer_scores"].items() if score < TARGET_SCORE]
+
+    responses = await asyncio.gather(*[
+        revise_answer(
+            model,
+            state["context_prefix"],
+            question,
+            state["current_cover_letter"][question],
+            state["answer_feedback"][question],
+        )
+        for question in questions
+    ])
+
+    revised = dict(state["current_cover_letter"])
+    for question, response in zip(questions, responses):
+        revised[question] = response.content.strip() or revised[question]
 
     return {
         **state,
         "current_cover_letter": revised,
+        "revised_questions": questions,
         "iteration_count": state["iteration_count"] + 1,
+        "loop_tokens": state["loop_tokens"] + sum(response_tokens(r) for r in responses),
     }
 
 
 async def finalize(state: CoverLetterState) -> CoverLetterState:
-    """Finalize and save the cover letter."""
+    """Finalize and save the best-scoring version of the cover letter."""
+    raise_if_cancelled(state["session_id"])
+    stop_reason = state["stop_reason"] or "no_reference"
     async with async_session_maker() as db:
         # Update session
         result = await db.execute(
@@ -334,8 +598,9 @@ async def finalize(state: CoverLetterState) -> CoverLetterState:
             session.status = "completed"
             session.completed_at = datetime.utcnow()
             session.output_data = {
-                "final_score": state["comparison_score"],
+                "final_score": state["best_score"],
                 "iterations": state["iteration_count"],
+                "stop_reason": stop_reason,
             }
 
             # Create cover letter record
@@ -343,38 +608,42 @@ async def finalize(state: CoverLetterState) -> CoverLetterState:
                 session_id=session.id,
                 company_name=state["company_name"],
                 job_posting=state["job_posting"],
-                content=state["current_cover_letter"],
-                final_score=state["comparison_score"],
+                content=state["best_cover_letter"],
+                final_score=state["best_score"],
                 iteration_count=state["iteration_count"],
-                revision_history=[],
+                revision_history=state["score_history"],
             )
             db.add(cover_letter)
             await db.commit()
 
     return {
         **state,
-        "final_cover_letter": state["current_cover_letter"],
-        "final_score": state["comparison_score"],
+        "final_cover_letter": state["best_cover_letter"],
+        "final_score": state["best_score"],
+        "stop_reason": stop_reason,
     }
 
 
 async def update_session_progress(session_id: str, progress: dict):
-    """Update session progress in database."""
-    async with async_session_maker() as db:
-        result = await db.execute(
-            select(AISession).where(AISession.id == UUID(session_id))
-        )
-        session = result.scalar_one_or_none()
+    """Publish session progress."""
+    await publish_progress(session_id, progress)
 
-        if session:
-            session.status = "processing"
-            current_output = session.output_data or {}
-            current_output["progress"] = progress
-            session.output_data = current_output
-            await db.commit()
+
+async def update_branch_progress(session_id: str, branch: str, status: str):
+    """Update one preparation branch's status without clobbering the others."""
+    progress = current_progress(session_id)
+    branches = {**progress.get("branches", {}), branch: status}
+    running = [PREPARATION_BRANCHES[b] for b, s in branches.items() if s == "running"]
+    message = f"{', '.join(running)} 진행 중..." if running else "초안 작성 준비 완료"
+    await publish_progress(session_id, {
+        **progress,
+        "current_step": "preparing",
+        "branches": branches,
+        "message": message,
+    })
 
 
-def create_cover_letter_graph():
+def create_cover_letter_graph(checkpointer=None):
     """Create the cover letter generation graph."""
     workflow = StateGraph(CoverLetterState)
 
@@ -387,16 +656,20 @@ def create_cover_letter_graph():
     workflow.add_node("revise_cover_letter", revise_cover_letter)
     workflow.add_node("finalize", finalize)
 
-    # Set entry point
-    workflow.set_entry_point("collect_documents")
-
-    # Add edges
-    workflow.add_edge("collect_documents", "research_company")
-    workflow.add_edge("research_company", "analyze_job_posting")
-    workflow.add_edge("analyze_job_posting", "generate_draft")
-    workflow.add_edge("generate_draft", "compare_identity")
+    # Preparation branches are independent: fan out, then join at drafting
+    for node in PREPARATION_BRANCHES:
+        workflow.add_edge(START, node)
+    workflow.add_edge(list(PREPARATION_BRANCHES), "generate_draft")
 
     # Conditional edges
+    workflow.add_conditional_edges(
+        "generate_draft",
+        after_draft,
+        {
+            "compare": "compare_identity",
+            "finalize": "finalize"
+        }
+    )
     workflow.add_conditional_edges(
         "compare_identity",
         should_continue,
@@ -408,20 +681,32 @@ def create_cover_letter_graph():
     workflow.add_edge("revise_cover_letter", "compare_identity")
     workflow.add_edge("finalize", END)
 
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
 
 async def run_cover_letter_graph(
     session_id: str,
     user_id: str,
-    input_data: dict
-):
-    """Run the cover letter generation graph."""
+    input_data: dict,
+    resume: bool = False,
+    retry: bool = False,
+) -> Optional[str]:
+    """Run the cover letter generation graph.
+
+    With resume=True an interrupted run continues from its last checkpoint.
+    With retry=True the job queue will run it again if it fails, so a
+    failure leaves the session pending instead of failed. Returns the
+    error of a failed run.
+    """
+    # A cancel may have landed since the job was claimed: don't undo it
+    if not await mark_session_processing(session_id):
+        return None
+
+    error = None
     try:
-        # Update session status
         await update_session_progress(session_id, {"current_step": "starting", "message": "시작 중..."})
 
-        graph = create_cover_letter_graph()
+        graph = get_graph("cover_letter")
 
         initial_state = CoverLetterState(
             session_id=session_id,
@@ -433,27 +718,56 @@ async def run_cover_letter_graph(
             resume_content="",
             portfolio_content="",
             existing_cover_letters=[],
+            style_document_ids=[],
             company_research="",
             job_requirements={},
+            context_prefix="",
             current_cover_letter={},
-            comparison_score=0.0,
-            feedback="",
+            revised_questions=[],
+            comparison_score=None,
+            answer_scores={},
+            answer_feedback={},
             iteration_count=0,
+            started_at=time.time(),
+            loop_tokens=0,
+            score_history=[],
+            best_cover_letter={},
+            best_answer_scores={},
+            best_score=None,
+            stop_reason=None,
             final_cover_letter={},
-            final_score=0.0,
+            final_score=None,
             error=None,
         )
 
-        await graph.ainvoke(initial_state)
+        config = graph_config(session_id)
+        resuming = resume and await has_checkpoint(graph, config)
+        # The time budget restarts on resume, so downtime isn't counted against it
+        resume_input = Command(update={"started_at": time.time()})
+
+        with llm_session(session_id), cancellable(session_id):
+            await graph.ainvoke(resume_input if resuming else initial_state, config)
+
+        # Completed or cancelled: nothing left to resume
+        await delete_checkpoint(graph, session_id)
 
     except Exception as e:
-        # Update session with error
-        async with async_session_maker() as db:
-            result = await db.execute(
-                select(AISession).where(AISession.id == UUID(session_id))
-            )
-            session = result.scalar_one_or_none()
-            if session:
-                session.status = "failed"
-                session.error_message = str(e)
-                await db.commit()
+        error = str(e)
+        if retry:
+            # Not a final failure: the job queue runs it again
+            await mark_session_retrying(session_id)
+        else:
+            # Update session with error
+            async with async_session_maker() as db:
+                result = await db.execute(
+                    select(AISession).where(AISession.id == UUID(session_id))
+                )
+                session = result.scalar_one_or_none()
+                if session:
+                    session.status = "failed"
+                    session.error_message = error
+                    await db.commit()
+
+    await save_session_telemetry(session_id)
+    await finish_progress(session_id, retrying=retry and error is not None)
+    return error
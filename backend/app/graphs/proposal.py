@@ -1,21 +1,57 @@
 """Proposal (Deep Research) Generation LangGraph Workflow."""
 import json
-from typing import TypedDict, List, Optional
+import operator
+from typing import Annotated, TypedDict, List, Optional
 from datetime import datetime
 from uuid import UUID
 
 from langgraph.graph import StateGraph, END
+from langgraph.types import Send
 from langchain_core.messages import HumanMessage
-
-from app.services.llm import get_model
+from loguru import logger
+
+from app.services.llm import ANALYSIS_TEMPERATURE, get_model
+from app.graphs.checkpoint import delete_checkpoint, graph_config, has_checkpoint
+from app.graphs.registry import get_graph
+from app.services.cancellation import cancellable, raise_if_cancelled
+from app.services.job_queue import mark_session_processing, mark_session_retrying
+from app.services.llm_telemetry import llm_session, save_session_telemetry
+from app.services.progress import current_progress, finish_progress, publish_progress
 from app.core.database import async_session_maker
 from app.models.ai_session import AISession
 from app.models.proposal import Proposal
 from sqlalchemy import select
 
+# Research branches run in parallel between planning and writing
+RESEARCH_BRANCHES = {
+    "market": "시장 조사",
+    "legal": "법률/규제 조사",
+    "tech": "기술 조사",
+}
+
+# Each planned question is answered by its own call to a cheap model
+QUESTION_MODEL = "gpt-5-mini"
+RESEARCH_CONCURRENCY = 5  # max parallel graph tasks (question answers)
+
+DEFAULT_RESEARCH_PLAN = [
+    {"category": "market", "question": "시장 규모"},
+    {"category": "market", "question": "경쟁사 분석"},
+    {"category": "legal", "question": "관련 법률"},
+    {"category": "tech", "question": "기술 트렌드"},
+]
+
+
+def merge_errors(left: dict, right: dict) -> dict:
+    """Reducer for errors reported by parallel research branches."""
+    return {**left, **right}
+
 
 class ProposalState(TypedDict):
-    """State for proposal generation."""
+    """State for proposal generation.
+
+    Nodes return only the keys they change: returning the whole state would
+    re-append research_answers through its list reducer.
+    """
     session_id: str
     user_id: str
     idea: str
@@ -24,10 +60,12 @@ class ProposalState(TypedDict):
     special_requirements: Optional[str]
 
     # Research results
-    research_plan: List[str]
+    research_plan: List[dict]  # {"category", "question"}
+    research_answers: Annotated[List[dict], operator.add]  # mapped question answers
     market_research: str
     legal_research: str
     tech_research: str
+    research_errors: Annotated[dict, merge_errors]  # branch -> error message
 
     # Generated content
     proposal_title: str
@@ -36,9 +74,19 @@ class ProposalState(TypedDict):
     error: Optional[str]
 
 
-async def create_research_plan(state: ProposalState) -> ProposalState:
+class ResearchQuestion(TypedDict):
+    """Input for answering a single planned research question."""
+    session_id: str
+    idea: str
+    category: str
+    question: str
+    total: int
+
+
+async def create_research_plan(state: ProposalState) -> dict:
     """Create a research plan for the proposal."""
-    model = get_model("gpt-5-mini")
+    raise_if_cancelled(state["session_id"])
+    model = get_model("gpt-5-mini", temperature=ANALYSIS_TEMPERATURE)
 
     prompt = f"""
     다음 아이디어에 대한 상세 기획서를 작성하기 위한 리서치 계획을 수립해주세요.
@@ -76,46 +124,124 @@ async def create_research_plan(state: ProposalState) -> ProposalState:
             content = content.split("```")[1].split("```")[0]
 
         plan = json.loads(content.strip())
-        questions = [q["question"] for q in plan.get("questions", [])]
+        questions = [
+            {"category": q.get("category", "market"), "question": q["question"]}
+            for q in plan.get("questions", [])
+            if q.get("question")
+        ]
         title = plan.get("title", state["idea"][:50])
-    except (json.JSONDecodeError, IndexError):
-        questions = ["시장 규모", "경쟁사 분석", "관련 법률", "기술 트렌드"]
+    except (json.JSONDecodeError, IndexError, KeyError, AttributeError):
+        questions = []
         title = state["idea"][:50]
 
+    for question in questions:
+        if question["category"] not in RESEARCH_BRANCHES:
+            question["category"] = "market"
+    questions = questions or DEFAULT_RESEARCH_PLAN
+
     await update_progress(state["session_id"], {
         "current_phase": "planning",
-        "research_topics": questions[:5],
+        "research_topics": [q["question"] for q in questions[:5]],
         "message": "리서치 계획 수립 완료"
     })
 
     return {
-        **state,
         "research_plan": questions,
         "proposal_title": title,
     }
 
 
-async def conduct_market_research(state: ProposalState) -> ProposalState:
-    """Conduct market research."""
-    model = get_model("gpt-5")
+def dispatch_questions(state: ProposalState) -> list[Send]:
+    """Map step: answer every planned question as its own task."""
+    return [
+        Send("answer_question", ResearchQuestion(
+            session_id=state["session_id"],
+            idea=state["idea"],
+            category=q["category"],
+            question=q["question"],
+            total=len(state["research_plan"]),
+        ))
+        for q in state["research_plan"]
+    ]
 
-    await update_progress(state["session_id"], {
-        "current_phase": "market_research",
-        "message": "시장 조사 진행 중..."
-    })
 
-    market_questions = [q for q in state["research_plan"] if "시장" in q or "경쟁" in q or "고객" in q]
+async def answer_question(task: ResearchQuestion) -> dict:
+    """Answer one research question with the cheap model."""
+    raise_if_cancelled(task["session_id"])
+    model = get_model(QUESTION_MODEL, temperature=ANALYSIS_TEMPERATURE)
 
     prompt = f"""
-    다음 아이디어에 대한 시장 조사를 수행해주세요.
+    다음 아이디어의 기획서 작성을 위한 리서치 질문에 답해주세요.
+
+    ## 아이디어
+    {task["idea"]}
+
+    ## 질문
+    {task["question"]}
+
+    구체적인 수치, 사례, 근거를 포함하여 핵심만 5-10문장으로 답변해주세요.
+    """
+
+    answer = {"category": task["category"], "question": task["question"]}
+    try:
+        response = await model.ainvoke([HumanMessage(content=prompt)])
+        answer["answer"] = response.content
+    except Exception as e:
+        logger.warning(f"Research question failed ({task['question']}): {e}")
+        answer["error"] = str(e)
+
+    await update_question_progress(task["session_id"], task["total"])
+    return {"research_answers": [answer]}
+
+
+def format_findings(state: ProposalState, branch: str) -> str:
+    """Reduce input: the answered questions of one category."""
+    findings = [
+        f"### {a['question']}\n{a['answer']}"
+        for a in state.get("research_answers", [])
+        if a["category"] == branch and a.get("answer")
+    ]
+    return "\n\n".join(findings) or "없음"
+
+
+async def run_research_branch(
+    state: ProposalState,
+    branch: str,
+    prompt: str,
+) -> dict:
+    """Run one research branch, reporting its progress separately.
+
+    Branches run concurrently, so only the branch's own keys are returned.
+    A failed branch records its error instead of failing the whole graph.
+    """
+    label = RESEARCH_BRANCHES[branch]
+    await update_branch_progress(state["session_id"], branch, "running", f"{label} 진행 중...")
+
+    try:
+        model = get_model("gpt-5", temperature=ANALYSIS_TEMPERATURE)
+        response = await model.ainvoke([HumanMessage(content=prompt)])
+    except Exception as e:
+        logger.error(f"Proposal {branch} research failed: {e}")
+        await update_branch_progress(state["session_id"], branch, "failed", f"{label} 실패")
+        return {f"{branch}_research": "", "research_errors": {branch: str(e)}}
+
+    await update_branch_progress(state["session_id"], branch, "completed", f"{label} 완료")
+    return {f"{branch}_research": response.content}
+
+
+async def conduct_market_research(state: ProposalState) -> dict:
+    """Reduce step: synthesize the market research answers."""
+    raise_if_cancelled(state["session_id"])
+    prompt = f"""
+    다음 아이디어에 대한 시장 조사 결과를 정리해주세요.
 
     ## 아이디어
     {state["idea"]}
 
-    ## 조사 항목
-    {json.dumps(market_questions, ensure_ascii=False)}
+    ## 질문별 조사 결과
+    {format_findings(state, "market")}
 
-    다음 내용을 포함해주세요:
+    조사 결과를 종합하여 다음 내용을 포함해주세요:
     1. 시장 규모 및 성장성
     2. 타겟 고객 정의
     3. 경쟁사 분석 (3-5개)
@@ -124,30 +250,22 @@ async def conduct_market_research(state: ProposalState) -> ProposalState:
     상세하게 마크다운 형식으로 작성해주세요.
     """
 
-    response = await model.ainvoke([HumanMessage(content=prompt)])
+    return await run_research_branch(state, "market", prompt)
 
-    return {
-        **state,
-        "market_research": response.content,
-    }
-
-
-async def conduct_legal_research(state: ProposalState) -> ProposalState:
-    """Conduct legal/regulatory research."""
-    model = get_model("gpt-5")
-
-    await update_progress(state["session_id"], {
-        "current_phase": "legal_research",
-        "message": "법률/규제 조사 진행 중..."
-    })
 
+async def conduct_legal_research(state: ProposalState) -> dict:
+    """Reduce step: synthesize the legal/regulatory research answers."""
+    raise_if_cancelled(state["session_id"])
     prompt = f"""
-    다음 아이디어와 관련된 법률 및 규제를 조사해주세요.
+    다음 아이디어와 관련된 법률 및 규제 조사 결과를 정리해주세요.
 
     ## 아이디어
     {state["idea"]}
 
-    다음 내용을 포함해주세요:
+    ## 질문별 조사 결과
+    {format_findings(state, "legal")}
+
+    조사 결과를 종합하여 다음 내용을 포함해주세요:
     1. 관련 법령 (한국 기준)
     2. 인허가 요건
     3. 개인정보보호 관련 사항
@@ -156,30 +274,22 @@ async def conduct_legal_research(state: ProposalState) -> ProposalState:
     상세하게 마크다운 형식으로 작성해주세요.
     """
 
-    response = await model.ainvoke([HumanMessage(content=prompt)])
+    return await run_research_branch(state, "legal", prompt)
 
-    return {
-        **state,
-        "legal_research": response.content,
-    }
-
-
-async def conduct_tech_research(state: ProposalState) -> ProposalState:
-    """Conduct technology research."""
-    model = get_model("gpt-5")
-
-    await update_progress(state["session_id"], {
-        "current_phase": "tech_research",
-        "message": "기술 조사 진행 중..."
-    })
 
+async def conduct_tech_research(state: ProposalState) -> dict:
+    """Reduce step: synthesize the technology research answers."""
+    raise_if_cancelled(state["session_id"])
     prompt = f"""
-    다음 아이디어를 구현하기 위한 기술 조사를 수행해주세요.
+    다음 아이디어를 구현하기 위한 기술 조사 결과를 정리해주세요.
 
     ## 아이디어
     {state["idea"]}
 
-    다음 내용을 포함해주세요:
+    ## 질문별 조사 결과
+    {format_findings(state, "tech")}
+
+    조사 결과를 종합하여 다음 내용을 포함해주세요:
     1. 최신 기술 트렌드
     2. 추천 기술 스택
     3. 오픈소스 활용 방안
@@ -188,16 +298,16 @@ async def conduct_tech_research(state: ProposalState) -> ProposalState:
     상세하게 마크다운 형식으로 작성해주세요.
     """
 
-    response = await model.ainvoke([HumanMessage(content=prompt)])
-
-    return {
-        **state,
-        "tech_research": response.content,
-    }
+    return await run_research_branch(state, "tech", prompt)
 
 
-async def write_proposal(state: ProposalState) -> ProposalState:
+async def write_proposal(state: ProposalState) -> dict:
     """Write the final proposal."""
+    raise_if_cancelled(state["session_id"])
+    errors = state.get("research_errors") or {}
+    if len(errors) == len(RESEARCH_BRANCHES):
+        raise RuntimeError(f"All research branches failed: {errors}")
+
     model = get_model("claude-opus-4.5")
 
     await update_progress(state["session_id"], {
@@ -205,6 +315,11 @@ async def write_proposal(state: ProposalState) -> ProposalState:
         "message": "기획서 작성 중..."
     })
 
+    def research_result(branch: str) -> str:
+        if branch in errors:
+            return "(조사 실패: 이 항목은 일반적인 지식을 바탕으로 작성하고 추가 조사가 필요함을 명시해주세요)"
+        return state[f"{branch}_research"]
+
     prompt = f"""
     다음 리서치 결과를 바탕으로 완전한 기획서를 작성해주세요.
 
@@ -212,13 +327,13 @@ async def write_proposal(state: ProposalState) -> ProposalState:
     {state["idea"]}
 
     ## 시장 조사 결과
-    {state["market_research"]}
+    {research_result("market")}
 
     ## 법률/규제 조사 결과
-    {state["legal_research"]}
+    {research_result("legal")}
 
     ## 기술 조사 결과
-    {state["tech_research"]}
+    {research_result("tech")}
 
     ## 추가 요구사항
     {state.get("special_requirements") or "없음"}
@@ -259,18 +374,23 @@ async def write_proposal(state: ProposalState) -> ProposalState:
     response = await model.ainvoke([HumanMessage(content=prompt)])
 
     return {
-        **state,
         "proposal_content": response.content,
         "research_data": {
             "market": state["market_research"][:1000],
             "legal": state["legal_research"][:1000],
             "tech": state["tech_research"][:1000],
+            "errors": errors,
+            "questions": [
+                {"category": a["category"], "question": a["question"], "answered": "answer" in a}
+                for a in state.get("research_answers", [])
+            ],
         }
     }
 
 
-async def save_proposal(state: ProposalState) -> ProposalState:
+async def save_proposal(state: ProposalState) -> dict:
     """Save the proposal."""
+    raise_if_cancelled(state["session_id"])
     async with async_session_maker() as db:
         result = await db.execute(
             select(AISession).where(AISession.id == UUID(state["session_id"]))
@@ -291,29 +411,46 @@ async def save_proposal(state: ProposalState) -> ProposalState:
             db.add(proposal)
             await db.commit()
 
-    return state
+    return {}
 
 
 async def update_progress(session_id: str, progress: dict):
-    """Update session progress."""
-    async with async_session_maker() as db:
-        result = await db.execute(
-            select(AISession).where(AISession.id == UUID(session_id))
-        )
-        session = result.scalar_one_or_none()
-        if session:
-            session.status = "processing"
-            current = session.output_data or {}
-            current["progress"] = progress
-            session.output_data = current
-            await db.commit()
+    """Publish session progress."""
+    await publish_progress(session_id, progress)
+
+
+async def update_question_progress(session_id: str, total: int):
+    """Count one more answered research question."""
+    progress = current_progress(session_id)
+    answered = progress.get("answered_questions", 0) + 1
+    await publish_progress(session_id, {
+        **progress,
+        "current_phase": "research",
+        "answered_questions": answered,
+        "total_questions": total,
+        "message": f"리서치 질문 분석 중... ({answered}/{total})",
+    })
+
 
+async def update_branch_progress(session_id: str, branch: str, status: str, message: str):
+    """Update one research branch's status without clobbering the others."""
+    progress = current_progress(session_id)
+    branches = {**progress.get("branches", {}), branch: status}
+    running = [RESEARCH_BRANCHES[b] for b, s in branches.items() if s == "running"]
+    await publish_progress(session_id, {
+        **progress,
+        "current_phase": "research",
+        "branches": branches,
+        "message": f"{', '.join(running)} 진행 중..." if running else message,
+    })
 
-def create_proposal_graph():
+
+def create_proposal_graph(checkpointer=None):
     """Create the proposal generation graph."""
     workflow = StateGraph(ProposalState)
 
     workflow.add_node("create_research_plan", create_research_plan)
+    workflow.add_node("answer_question", answer_question)
     workflow.add_node("conduct_market_research", conduct_market_research)
     workflow.add_node("conduct_legal_research", conduct_legal_research)
     workflow.add_node("conduct_tech_research", conduct_tech_research)
@@ -321,24 +458,40 @@ def create_proposal_graph():
     workflow.add_node("save_proposal", save_proposal)
 
     workflow.set_entry_point("create_research_plan")
-    workflow.add_edge("create_research_plan", "conduct_market_research")
-    workflow.add_edge("conduct_market_research", "conduct_legal_research")
-    workflow.add_edge("conduct_legal_research", "conduct_tech_research")
-    workflow.add_edge("conduct_tech_research", "write_proposal")
+    # Map: one task per planned question. Reduce: one synthesis per
+    # category, run in parallel, joined before writing.
+    research_nodes = ["conduct_market_research", "conduct_legal_research", "conduct_tech_research"]
+    workflow.add_conditional_edges("create_research_plan", dispatch_questions, ["answer_question"])
+    for node in research_nodes:
+        workflow.add_edge("answer_question", node)
+    workflow.add_edge(research_nodes, "write_proposal")
     workflow.add_edge("write_proposal", "save_proposal")
     workflow.add_edge("save_proposal", END)
 
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
 
 async def run_proposal_graph(
     session_id: str,
     user_id: str,
-    input_data: dict
-):
-    """Run the proposal generation graph."""
+    input_data: dict,
+    resume: bool = False,
+    retry: bool = False,
+) -> Optional[str]:
+    """Run the proposal generation graph.
+
+    With resume=True an interrupted run continues from its last checkpoint.
+    With retry=True the job queue will run it again if it fails, so a
+    failure leaves the session pending instead of failed. Returns the
+    error of a failed run.
+    """
+    # A cancel may have landed since the job was claimed: don't undo it
+    if not await mark_session_processing(session_id):
+        return None
+
+    error = None
     try:
-        graph = create_proposal_graph()
+        graph = get_graph("proposal")
 
         initial_state = ProposalState(
             session_id=session_id,
@@ -348,24 +501,42 @@ async def run_proposal_graph(
             budget_range=input_data.get("budget_range"),
             special_requirements=input_data.get("special_requirements"),
             research_plan=[],
+            research_answers=[],
             market_research="",
             legal_research="",
             tech_research="",
+            research_errors={},
             proposal_title="",
             proposal_content="",
             research_data={},
             error=None,
         )
 
-        await graph.ainvoke(initial_state)
+        config = graph_config(session_id, max_concurrency=RESEARCH_CONCURRENCY)
+        resuming = resume and await has_checkpoint(graph, config)
+
+        with llm_session(session_id), cancellable(session_id):
+            await graph.ainvoke(None if resuming else initial_state, config)
+
+        # Completed or cancelled: nothing left to resume
+        await delete_checkpoint(graph, session_id)
 
     except Exception as e:
-        async with async_session_maker() as db:
-            result = await db.execute(
-                select(AISession).where(AISession.id == UUID(session_id))
-            )
-            session = result.scalar_one_or_none()
-            if session:
-                session.status = "failed"
-                session.error_message = str(e)
-                await db.commit()
+        error = str(e)
+        if retry:
+            # Not a final failure: the job queue runs it again
+            await mark_session_retrying(session_id)
+        else:
+            async with async_session_maker() as db:
+                result = await db.execute(
+                    select(AISession).where(AISession.id == UUID(session_id))
+                )
+                session = result.scalar_one_or_none()
+                if session:
+                    session.status = "failed"
+                    session.error_message = error
+                    await db.commit()
+
+    await save_session_telemetry(session_id)
+    await finish_progress(session_id, retrying=retry and error is not None)
+    return error
@@ -0,0 +1,80 @@
+"""Compile-once registry for the LangGraph workflows.
+
+Graphs are compiled at application startup (see ``lifespan`` in
+``app/main.py``) so construction errors surface at boot, and background
+tasks reuse the compiled graph instead of rebuilding it per request.
+"""
+import time
+from typing import Callable, Optional
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.graph.state import CompiledStateGraph
+from loguru import logger
+
+
+_compiled: dict[str, CompiledStateGraph] = {}
+_checkpointer: Optional[BaseCheckpointSaver] = None
+
+
+def _factories() -> dict[str, Callable[..., CompiledStateGraph]]:
+    # Imported lazily: the graph modules import get_graph from here
+    from app.graphs.cover_letter import create_cover_letter_graph
+    from app.graphs.proposal import create_proposal_graph
+    from app.graphs.travel import create_travel_graph
+    from app.graphs.weekly_report import create_weekly_report_graph
+
+    return {
+        "cover_letter": create_cover_letter_graph,
+        "proposal": create_proposal_graph,
+        "travel": create_travel_graph,
+        "weekly_report": create_weekly_report_graph,
+    }
+
+
+def get_runners() -> dict[str, Callable]:
+    """run_*_graph entry points by AI session type."""
+    from app.graphs.cover_letter import run_cover_letter_graph
+    from app.graphs.proposal import run_proposal_graph
+    from app.graphs.travel import run_travel_graph
+    from app.graphs.weekly_report import run_weekly_report_graph
+
+    return {
+        "cover_letter": run_cover_letter_graph,
+        "proposal": run_proposal_graph,
+        "travel": run_travel_graph,
+        "weekly_report": run_weekly_report_graph,
+    }
+
+
+def _compile(name: str, factory: Callable[..., CompiledStateGraph]) -> float:
+    started = time.perf_counter()
+    _compiled[name] = factory(checkpointer=_checkpointer)
+    return time.perf_counter() - started
+
+
+def compile_graphs(checkpointer: Optional[BaseCheckpointSaver] = None) -> dict[str, float]:
+    """Compile every registered graph. Returns compile time (seconds) per graph.
+
+    Args:
+        checkpointer: Saves a checkpoint after every node so interrupted
+            runs can resume (see app.graphs.checkpoint).
+    """
+    global _checkpointer
+    _checkpointer = checkpointer
+    timings = {name: _compile(name, factory) for name, factory in _factories().items()}
+    logger.info(
+        "Compiled graphs: "
+        + ", ".join(f"{name} ({seconds * 1000:.1f}ms)" for name, seconds in timings.items())
+    )
+    return timings
+
+
+def get_graph(name: str) -> CompiledStateGraph:
+    """Get a compiled graph by name, compiling it on first use if needed."""
+    if name not in _compiled:
+        factories = _factories()
+        if name not in factories:
+            raise KeyError(f"Unknown graph: {name}")
+        seconds = _compile(name, factories[name])
+        logger.info(f"Compiled graph {name} on first use ({seconds * 1000:.1f}ms)")
+    return _compiled[name]
@@ -1,20 +1,17 @@
 """Translation LangGraph Workflows."""
 import re
-from typing import List
+from typing import AsyncIterator, List
 from langchain_core.messages import HumanMessage
 
 from app.services.llm import get_model
 
 
-async def run_translation_graph(
+def build_translation_prompt(
     content: str,
-    source_language: str,
     target_language: str,
     context: str = None,
 ) -> str:
-    """Run text translation."""
-    model = get_model("gpt-5-mini")
-
+    """Build the text translation prompt."""
     context_info = f"\n상황: {context}" if context else ""
 
     prompt = f"""
@@ -31,11 +28,38 @@ async def run_translation_graph(
 
     번역문만 출력해주세요.
     """
+    return prompt
+
+
+async def run_translation_graph(
+    content: str,
+    source_language: str,
+    target_language: str,
+    context: str = None,
+) -> str:
+    """Run text translation."""
+    model = get_model("gpt-5-mini")
+    prompt = build_translation_prompt(content, target_language, context)
 
     response = await model.ainvoke([HumanMessage(content=prompt)])
     return response.content
 
 
+async def stream_translation(
+    content: str,
+    source_language: str,
+    target_language: str,
+    context: str = None,
+) -> AsyncIterator[str]:
+    """Run text translation, yielding text as it is generated."""
+    model = get_model("gpt-5-mini")
+    prompt = build_translation_prompt(content, target_language, context)
+
+    async for chunk in model.astream([HumanMessage(content=prompt)]):
+        if chunk.text:
+            yield chunk.text
+
+
 async def run_srt_translation(
     srt_content: str,
     target_language: str,
@@ -95,14 +119,12 @@ async def run_srt_translation(
     return "\n\n".join(translated_blocks)
 
 
-async def run_email_writing(
+def build_email_prompt(
     context: str,
     key_points: str,
     target_language: str,
 ) -> str:
-    """Write an email in target language with appropriate tone."""
-    model = get_model("claude-haiku-4.5")
-
+    """Build the email writing prompt."""
     prompt = f"""
     다음 상황과 핵심 내용을 바탕으로 {target_language}로 이메일을 작성해주세요.
 
@@ -120,6 +142,31 @@ async def run_email_writing(
 
     이메일 전문을 출력해주세요.
     """
+    return prompt
+
+
+async def run_email_writing(
+    context: str,
+    key_points: str,
+    target_language: str,
+) -> str:
+    """Write an email in target language with appropriate tone."""
+    model = get_model("claude-haiku-4.5")
+    prompt = build_email_prompt(context, key_points, target_language)
 
     response = await model.ainvoke([HumanMessage(content=prompt)])
     return response.content
+
+
+async def stream_email_writing(
+    context: str,
+    key_points: str,
+    target_language: str,
+) -> AsyncIterator[str]:
+    """Write an email, yielding text as it is generated."""
+    model = get_model("claude-haiku-4.5")
+    prompt = build_email_prompt(context, key_points, target_language)
+
+    async for chunk in model.astream([HumanMessage(content=prompt)]):
+        if chunk.text:
+            yield chunk.text
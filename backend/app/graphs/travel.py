@@ -4,10 +4,16 @@ from typing import TypedDict, List, Optional
 from datetime import datetime, date
 from uuid import UUID
 
-from langgraph.graph import StateGraph, END
+from langgraph.graph import StateGraph, START, END
 from langchain_core.messages import HumanMessage
 
-from app.services.llm import get_model
+from app.services.llm import ANALYSIS_TEMPERATURE, get_model
+from app.graphs.checkpoint import delete_checkpoint, graph_config, has_checkpoint
+from app.graphs.registry import get_graph
+from app.services.cancellation import cancellable, raise_if_cancelled
+from app.services.job_queue import mark_session_processing, mark_session_retrying
+from app.services.llm_telemetry import llm_session, save_session_telemetry
+from app.services.progress import finish_progress
 from app.core.database import async_session_maker
 from app.models.ai_session import AISession
 from app.models.travel import TravelPlan
@@ -15,7 +21,10 @@ from sqlalchemy import select
 
 
 class TravelState(TypedDict):
-    """State for travel planning."""
+    """State for travel planning.
+
+    Planning nodes may run concurrently, so each returns only the keys it sets.
+    """
     session_id: str
     user_id: str
     travel_type: str
@@ -37,9 +46,10 @@ class TravelState(TypedDict):
     error: Optional[str]
 
 
-async def search_places(state: TravelState) -> TravelState:
+async def search_places(state: TravelState) -> dict:
     """Search for recommended places."""
-    model = get_model("gpt-5-mini")
+    raise_if_cancelled(state["session_id"])
+    model = get_model("gpt-5-mini", temperature=ANALYSIS_TEMPERATURE)
 
     travel_type_kr = "여행" if state["travel_type"] == "travel" else "데이트"
     interests_str = ", ".join(state["interests"]) if state["interests"] else "일반"
@@ -84,13 +94,13 @@ async def search_places(state: TravelState) -> TravelState:
         places = {"restaurants": [], "cafes": [], "attractions": [], "accommodations": []}
 
     return {
-        **state,
         "places": [places],
     }
 
 
-async def create_timeline(state: TravelState) -> TravelState:
+async def create_timeline(state: TravelState) -> dict:
     """Create optimized timeline."""
+    raise_if_cancelled(state["session_id"])
     model = get_model("gpt-5-mini")
 
     places_json = json.dumps(state["places"][0] if state["places"] else {}, ensure_ascii=False)
@@ -142,14 +152,14 @@ async def create_timeline(state: TravelState) -> TravelState:
         timeline = {"days": []}
 
     return {
-        **state,
         "timeline": timeline.get("days", []),
     }
 
 
-async def calculate_budget(state: TravelState) -> TravelState:
+async def calculate_budget(state: TravelState) -> dict:
     """Calculate estimated budget."""
-    model = get_model("gpt-5-nano")
+    raise_if_cancelled(state["session_id"])
+    model = get_model("gpt-5-nano", temperature=ANALYSIS_TEMPERATURE)
 
     prompt = f"""
     다음 여행 일정의 예상 비용을 계산해주세요.
@@ -192,13 +202,13 @@ async def calculate_budget(state: TravelState) -> TravelState:
         budget = {"total": 0, "note": "비용 계산 실패"}
 
     return {
-        **state,
         "budget": budget,
     }
 
 
-async def create_checklist(state: TravelState) -> TravelState:
+async def create_checklist(state: TravelState) -> dict:
     """Create packing checklist."""
+    raise_if_cancelled(state["session_id"])
     model = get_model("gpt-5-nano")
 
     prompt = f"""
@@ -236,13 +246,13 @@ async def create_checklist(state: TravelState) -> TravelState:
         checklist = ["신분증", "충전기", "보조배터리", "여벌 옷", "세면도구", "상비약", "현금"]
 
     return {
-        **state,
         "checklist": checklist,
     }
 
 
 async def save_plan(state: TravelState) -> TravelState:
     """Save the travel plan."""
+    raise_if_cancelled(state["session_id"])
     travel_type_kr = "여행" if state["travel_type"] == "travel" else "데이트"
     title = f"{state['destination']} {travel_type_kr} ({state['start_date']} ~ {state['end_date']})"
 
@@ -284,7 +294,7 @@ async def save_plan(state: TravelState) -> TravelState:
     }
 
 
-def create_travel_graph():
+def create_travel_graph(checkpointer=None):
     """Create the travel planning graph."""
     workflow = StateGraph(TravelState)
 
@@ -294,33 +304,39 @@ def create_travel_graph():
     workflow.add_node("create_checklist", create_checklist)
     workflow.add_node("save_plan", save_plan)
 
-    workflow.set_entry_point("search_places")
+    # The checklist only needs the request, so it runs alongside the
+    # places -> timeline -> budget chain; both join before saving.
+    workflow.add_edge(START, "search_places")
+    workflow.add_edge(START, "create_checklist")
     workflow.add_edge("search_places", "create_timeline")
     workflow.add_edge("create_timeline", "calculate_budget")
-    workflow.add_edge("calculate_budget", "create_checklist")
-    workflow.add_edge("create_checklist", "save_plan")
+    workflow.add_edge(["calculate_budget", "create_checklist"], "save_plan")
     workflow.add_edge("save_plan", END)
 
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
 
 async def run_travel_graph(
     session_id: str,
     user_id: str,
-    input_data: dict
-):
-    """Run the travel planning graph."""
-    try:
-        async with async_session_maker() as db:
-            result = await db.execute(
-                select(AISession).where(AISession.id == UUID(session_id))
-            )
-            session = result.scalar_one_or_none()
-            if session:
-                session.status = "processing"
-                await db.commit()
+    input_data: dict,
+    resume: bool = False,
+    retry: bool = False,
+) -> Optional[str]:
+    """Run the travel planning graph.
+
+    With resume=True an interrupted run continues from its last checkpoint.
+    With retry=True the job queue will run it again if it fails, so a
+    failure leaves the session pending instead of failed. Returns the
+    error of a failed run.
+    """
+    # A cancel may have landed since the job was claimed: don't undo it
+    if not await mark_session_processing(session_id):
+        return None
 
-        graph = create_travel_graph()
+    error = None
+    try:
+        graph = get_graph("travel")
 
         initial_state = TravelState(
             session_id=session_id,
@@ -342,15 +358,31 @@ async def run_travel_graph(
             error=None,
         )
 
-        await graph.ainvoke(initial_state)
+        config = graph_config(session_id)
+        resuming = resume and await has_checkpoint(graph, config)
+
+        with llm_session(session_id), cancellable(session_id):
+            await graph.ainvoke(None if resuming else initial_state, config)
+
+        # Completed or cancelled: nothing left to resume
+        await delete_checkpoint(graph, session_id)
 
     except Exception as e:
-        async with async_session_maker() as db:
-            result = await db.execute(
-                select(AISession).where(AISession.id == UUID(session_id))
-            )
-            session = result.scalar_one_or_none()
-            if session:
-                session.status = "failed"
-                session.error_message = str(e)
-                await db.commit()
+        error = str(e)
+        if retry:
+            # Not a final failure: the job queue runs it again
+            await mark_session_retrying(session_id)
+        else:
+            async with async_session_maker() as db:
+                result = await db.execute(
+                    select(AISession).where(AISession.id == UUID(session_id))
+                )
+                session = result.scalar_one_or_none()
+                if session:
+                    session.status = "failed"
+                    session.error_message = error
+                    await db.commit()
+
+    await save_session_telemetry(session_id)
+    await finish_progress(session_id, retrying=retry and error is not None)
+    return error
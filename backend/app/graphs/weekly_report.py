@@ -8,12 +8,20 @@ from langgraph.graph import StateGraph, END
 from langchain_core.messages import HumanMessage
 
 from app.services.llm import get_model
+from app.graphs.checkpoint import delete_checkpoint, graph_config, has_checkpoint
+from app.graphs.registry import get_graph
+from app.services.cancellation import cancellable, raise_if_cancelled
+from app.services.document_digest import load_digests, render_digest
+from app.services.job_queue import mark_session_processing, mark_session_retrying
+from app.services.llm_telemetry import llm_session, save_session_telemetry
+from app.services.progress import finish_progress
 from app.core.database import async_session_maker
 from app.models.ai_session import AISession
 from app.models.weekly_report import WeeklyReport
-from app.models.document import Document
 from sqlalchemy import select
 
+REPORT_MODEL = "gpt-5-mini"
+
 
 class WeeklyReportState(TypedDict):
     """State for weekly report generation."""
@@ -34,31 +42,30 @@ class WeeklyReportState(TypedDict):
 
 async def analyze_style(state: WeeklyReportState) -> WeeklyReportState:
     """Analyze existing report style."""
+    raise_if_cancelled(state["session_id"])
+    # The latest report's digest: outline, formatting, tone and a short excerpt
     async with async_session_maker() as db:
-        # Get user's weekly reports
-        result = await db.execute(
-            select(Document).where(
-                Document.user_id == UUID(state["user_id"]),
-                Document.category == "weekly_report",
-                Document.is_archived == False
-            ).order_by(Document.created_at.desc()).limit(3)
-        )
-        documents = result.scalars().all()
+        digests = await load_digests(db, UUID(state["user_id"]), ["weekly_report"], limit=1)
 
-        if documents and documents[0].markdown_content:
-            reference_style = documents[0].markdown_content[:2000]
-        else:
-            reference_style = ""
+    if digests:
+        digest = digests[0].digest
+        reference_style = f"""{render_digest(digest)}
 
-        return {
-            **state,
-            "reference_style": reference_style,
-        }
+    ### 발췌
+    {digest.get("excerpt", "")}"""
+    else:
+        reference_style = ""
+
+    return {
+        **state,
+        "reference_style": reference_style,
+    }
 
 
 async def generate_report(state: WeeklyReportState) -> WeeklyReportState:
     """Generate the weekly report."""
-    model = get_model("gpt-5-mini")
+    raise_if_cancelled(state["session_id"])
+    model = get_model(REPORT_MODEL)
 
     # Calculate week dates
     today = date.today()
@@ -111,6 +118,7 @@ async def generate_report(state: WeeklyReportState) -> WeeklyReportState:
 
 async def save_report(state: WeeklyReportState) -> WeeklyReportState:
     """Save the weekly report."""
+    raise_if_cancelled(state["session_id"])
     today = date.today()
     week_start = today - timedelta(days=today.weekday())
     week_end = week_start + timedelta(days=4)
@@ -138,7 +146,7 @@ async def save_report(state: WeeklyReportState) -> WeeklyReportState:
     return state
 
 
-def create_weekly_report_graph():
+def create_weekly_report_graph(checkpointer=None):
     """Create the weekly report generation graph."""
     workflow = StateGraph(WeeklyReportState)
 
@@ -151,26 +159,30 @@ def create_weekly_report_graph():
     workflow.add_edge("generate_report", "save_report")
     workflow.add_edge("save_report", END)
 
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
 
 async def run_weekly_report_graph(
     session_id: str,
     user_id: str,
-    input_data: dict
-):
-    """Run the weekly report generation graph."""
-    try:
-        async with async_session_maker() as db:
-            result = await db.execute(
-                select(AISession).where(AISession.id == UUID(session_id))
-            )
-            session = result.scalar_one_or_none()
-            if session:
-                session.status = "processing"
-                await db.commit()
+    input_data: dict,
+    resume: bool = False,
+    retry: bool = False,
+) -> Optional[str]:
+    """Run the weekly report generation graph.
+
+    With resume=True an interrupted run continues from its last checkpoint.
+    With retry=True the job queue will run it again if it fails, so a
+    failure leaves the session pending instead of failed. Returns the
+    error of a failed run.
+    """
+    # A cancel may have landed since the job was claimed: don't undo it
+    if not await mark_session_processing(session_id):
+        return None
 
-        graph = create_weekly_report_graph()
+    error = None
+    try:
+        graph = get_graph("weekly_report")
 
         initial_state = WeeklyReportState(
             session_id=session_id,
@@ -184,15 +196,31 @@ async def run_weekly_report_graph(
             error=None,
         )
 
-        await graph.ainvoke(initial_state)
+        config = graph_config(session_id)
+        resuming = resume and await has_checkpoint(graph, config)
+
+        with llm_session(session_id), cancellable(session_id):
+            await graph.ainvoke(None if resuming else initial_state, config)
+
+        # Completed or cancelled: nothing left to resume
+        await delete_checkpoint(graph, session_id)
 
     except Exception as e:
-        async with async_session_maker() as db:
-            result = await db.execute(
-                select(AISession).where(AISession.id == UUID(session_id))
-            )
-            session = result.scalar_one_or_none()
-            if session:
-                session.status = "failed"
-                session.error_message = str(e)
-                await db.commit()
+        error = str(e)
+        if retry:
+            # Not a final failure: the job queue runs it again
+            await mark_session_retrying(session_id)
+        else:
+            async with async_session_maker() as db:
+                result = await db.execute(
+                    select(AISession).where(AISession.id == UUID(session_id))
+                )
+                session = result.scalar_one_or_none()
+                if session:
+                    session.status = "failed"
+                    session.error_message = error
+                    await db.commit()
+
+    await save_session_telemetry(session_id)
+    await finish_progress(session_id, retrying=retry and error is not None)
+    return error
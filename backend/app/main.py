@@ -10,6 +10,13 @@ from loguru import logger
 from app.core.config import settings
 from app.core.database import init_db
 from app.api.v1.router import api_router
+from app.graphs.checkpoint import (
+    close_checkpointer,
+    open_checkpointer,
+    resume_interrupted_sessions,
+)
+from app.graphs.registry import compile_graphs
+from app.services.llm_fake import close_replay_store
 from app.tasks.scheduler import start_scheduler, shutdown_scheduler
 
 
@@ -23,6 +30,15 @@ async def lifespan(app: FastAPI):
     # Initialize database (create tables if not exist)
     await init_db()
 
+    # Compile LangGraph workflows once; construction errors fail startup
+    checkpointer = await open_checkpointer()
+    compile_graphs(checkpointer)
+
+    # Continue sessions interrupted by a restart from their last checkpoint.
+    # With the postgres job queue, workers retry abandoned jobs instead.
+    if settings.GRAPH_RESUME_ON_STARTUP and settings.JOB_QUEUE_BACKEND == "local":
+        await resume_interrupted_sessions()
+
     # Start background scheduler
     start_scheduler()
     logger.info("Background scheduler started")
@@ -33,6 +49,9 @@ async def lifespan(app: FastAPI):
     shutdown_scheduler()
     logger.info("Background scheduler stopped")
 
+    await close_checkpointer()
+    await close_replay_store()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -1,6 +1,8 @@
 from app.models.user import User
 from app.models.document import Document
+from app.models.document_digest import DocumentDigest
 from app.models.ai_session import AISession
+from app.models.ai_job import AIJob
 from app.models.cover_letter import CoverLetter
 from app.models.weekly_report import WeeklyReport
 from app.models.proposal import Proposal
@@ -12,7 +14,9 @@ from app.models.email_log import EmailLog
 __all__ = [
     "User",
     "Document",
+    "DocumentDigest",
     "AISession",
+    "AIJob",
     "CoverLetter",
     "WeeklyReport",
     "Proposal",
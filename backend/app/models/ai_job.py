@@ -0,0 +1,45 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import String, Text, Integer, DateTime, ForeignKey, JSON, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+
+class AIJob(Base):
+    """Queued graph run for an AI session, claimed by workers with SKIP LOCKED."""
+
+    __tablename__ = "ai_jobs"
+    __table_args__ = (
+        Index("ix_ai_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4
+    )
+    session_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("ai_sessions.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    ai_type: Mapped[str] = mapped_column(String(50), nullable=False)
+    input_data: Mapped[dict] = mapped_column(JSON, nullable=False)
+    status: Mapped[str] = mapped_column(
+        String(20),
+        default="queued"
+    )  # queued, running, completed, failed, cancelled
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3)
+    run_after: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    locked_by: Mapped[str] = mapped_column(String(100), nullable=True)
+    locked_until: Mapped[datetime] = mapped_column(DateTime, nullable=True)  # visibility timeout
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    completed_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<AIJob {self.ai_type} - {self.status} ({self.attempts}/{self.max_attempts})>"
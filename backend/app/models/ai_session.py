@@ -1,8 +1,8 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, Text, DateTime, ForeignKey, JSON
+from sqlalchemy import String, Text, DateTime, ForeignKey, JSON, cast, func, literal
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from app.core.database import Base
 
 
@@ -28,7 +28,7 @@ class AISession(Base):
     status: Mapped[str] = mapped_column(
         String(20),
         default="pending"
-    )  # pending, processing, completed, failed
+    )  # pending, processing, completed, failed, cancelled
     input_data: Mapped[dict] = mapped_column(JSON, nullable=False)
     output_data: Mapped[dict] = mapped_column(JSON, nullable=True)
     error_message: Mapped[str] = mapped_column(Text, nullable=True)
@@ -43,5 +43,15 @@ class AISession(Base):
     translation = relationship("Translation", back_populates="session", uselist=False)
     travel_plan = relationship("TravelPlan", back_populates="session", uselist=False)
 
+    @classmethod
+    def merged_output_data(cls, values: dict):
+        """SQL expression merging values into output_data in a single UPDATE.
+
+        Keys written this way (progress, telemetry) don't overwrite each other
+        the way a read-modify-write of the whole document can.
+        """
+        current = func.coalesce(cast(cls.output_data, JSONB), literal({}, JSONB))
+        return cast(current.op("||")(literal(values, JSONB)), JSON)
+
     def __repr__(self):
         return f"<AISession {self.ai_type} - {self.status}>"
@@ -0,0 +1,45 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import String, Integer, DateTime, ForeignKey, JSON
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+
+class DocumentDigest(Base):
+    """Compact structured summary of a document, used in prompts instead of its full text."""
+
+    __tablename__ = "document_digests"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4
+    )
+    document_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("documents.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True
+    )
+    category: Mapped[str] = mapped_column(String(50), nullable=False)  # category it was built for
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    digest: Mapped[dict] = mapped_column(JSON, nullable=False)
+    token_count: Mapped[int] = mapped_column(Integer, default=0)  # rendered digest
+    source_token_count: Mapped[int] = mapped_column(Integer, default=0)  # full document
+    model: Mapped[str] = mapped_column(String(100), nullable=True)  # None = built locally
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow
+    )
+
+    def __repr__(self):
+        return f"<DocumentDigest {self.document_id} ({self.category})>"
@@ -29,3 +29,8 @@ class AISessionProgress(BaseModel):
     status: str
     progress: Optional[dict] = None
     message: Optional[str] = None
+
+
+class StreamTokenResponse(BaseModel):
+    token: str
+    expires_in: int
@@ -32,4 +32,5 @@ class CoverLetterProgress(BaseModel):
     current_step: Optional[str] = None
     iteration: Optional[int] = None
     score: Optional[float] = None
+    branches: Optional[dict] = None
     message: Optional[str] = None
@@ -28,4 +28,7 @@ class ProposalProgress(BaseModel):
     status: str
     current_phase: Optional[str] = None
     research_topics: Optional[list] = None
+    branches: Optional[dict] = None
+    answered_questions: Optional[int] = None
+    total_questions: Optional[int] = None
     message: Optional[str] = None
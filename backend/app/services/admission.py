@@ -0,0 +1,150 @@
+"""Admission control for AI sessions.
+
+Session-creating endpoints call ``admit_session`` before creating the
+session. Two limits apply:
+
+- per user: at most ADMISSION_USER_MAX_ACTIVE pending/processing sessions,
+  so one user can't flood the workers;
+- per AI type: at most ADMISSION_TYPE_MAX_ACTIVE[ai_type] sessions run at
+  once (the job queues hold further jobs back), plus up to
+  ADMISSION_TYPE_MAX_QUEUED waiting behind them.
+
+Requests over a limit get 429 with a ``Retry-After`` estimate. Synchronous
+endpoints (translate) can't wait in the queue, so they are rejected as soon
+as their type is at capacity. Counts come from ai_sessions, so the limits
+hold across web processes; they are best-effort under simultaneous requests.
+"""
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.ai_session import AISession
+
+
+ACTIVE_STATUSES = ("pending", "processing")
+
+# Typical session duration (seconds), used for Retry-After and wait estimates
+SESSION_DURATION_ESTIMATES = {
+    "cover_letter": 120,
+    "proposal": 180,
+    "travel": 45,
+    "weekly_report": 30,
+    "translate": 15,
+}
+DEFAULT_SESSION_DURATION = 60
+
+_stats: dict[str, dict[str, int]] = {}
+
+
+@dataclass
+class Admission:
+    queue_position: int  # 0 = starts right away
+    estimated_wait: int  # seconds before the session starts
+
+
+def type_limit(ai_type: str) -> Optional[int]:
+    """Global concurrent-session cap for an AI type (None = unlimited)."""
+    return settings.ADMISSION_TYPE_MAX_ACTIVE.get(ai_type)
+
+
+def _record(ai_type: str, outcome: str):
+    counts = _stats.setdefault(ai_type, {"admitted": 0, "queued": 0, "rejected_user": 0, "rejected_type": 0})
+    counts[outcome] += 1
+
+
+def _reject(ai_type: str, outcome: str, retry_after: int, detail: str):
+    _record(ai_type, outcome)
+    logger.info(f"Admission rejected {ai_type} ({outcome}), retry after {retry_after}s")
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+async def count_active_sessions(db: AsyncSession) -> dict[str, dict[str, int]]:
+    """Pending/processing sessions per AI type and status."""
+    since = datetime.utcnow() - timedelta(seconds=settings.ADMISSION_ACTIVE_WINDOW)
+    result = await db.execute(
+        select(AISession.ai_type, AISession.status, func.count())
+        .where(AISession.status.in_(ACTIVE_STATUSES), AISession.created_at >= since)
+        .group_by(AISession.ai_type, AISession.status)
+    )
+    counts: dict[str, dict[str, int]] = {}
+    for ai_type, session_status, count in result.all():
+        counts.setdefault(ai_type, {})[session_status] = count
+    return counts
+
+
+async def admit_session(
+    db: AsyncSession,
+    user_id: UUID,
+    ai_type: str,
+    queueable: bool = True,
+) -> Admission:
+    """Check the admission limits for a new session.
+
+    Args:
+        queueable: False for endpoints that run the session inline; they
+            are rejected instead of queued when the type is at capacity.
+
+    Raises:
+        HTTPException: 429 with Retry-After when a limit is reached.
+    """
+    if not settings.ADMISSION_CONTROL_ENABLED:
+        return Admission(queue_position=0, estimated_wait=0)
+
+    duration = SESSION_DURATION_ESTIMATES.get(ai_type, DEFAULT_SESSION_DURATION)
+    since = datetime.utcnow() - timedelta(seconds=settings.ADMISSION_ACTIVE_WINDOW)
+
+    result = await db.execute(
+        select(func.count()).where(
+            AISession.user_id == user_id,
+            AISession.status.in_(ACTIVE_STATUSES),
+            AISession.created_at >= since,
+        )
+    )
+    if result.scalar_one() >= settings.ADMISSION_USER_MAX_ACTIVE:
+        _reject(
+            ai_type, "rejected_user", duration,
+            f"동시에 진행할 수 있는 AI 작업은 최대 {settings.ADMISSION_USER_MAX_ACTIVE}개입니다. "
+            "진행 중인 작업이 끝난 뒤 다시 시도해주세요.",
+        )
+
+    limit = type_limit(ai_type)
+    if limit is None:
+        _record(ai_type, "admitted")
+        return Admission(queue_position=0, estimated_wait=0)
+
+    counts = (await count_active_sessions(db)).get(ai_type, {})
+    active = counts.get("pending", 0) + counts.get("processing", 0)
+    waiting = max(active - limit, 0)
+
+    if active < limit:
+        _record(ai_type, "admitted")
+        return Admission(queue_position=0, estimated_wait=0)
+
+    if not queueable or waiting >= settings.ADMISSION_TYPE_MAX_QUEUED:
+        _reject(
+            ai_type, "rejected_type", duration * math.ceil((waiting + 1) / limit),
+            "요청이 많아 잠시 후 다시 시도해주세요.",
+        )
+
+    _record(ai_type, "queued")
+    return Admission(
+        queue_position=waiting + 1,
+        estimated_wait=duration * math.ceil((waiting + 1) / limit),
+    )
+
+
+def get_admission_stats() -> dict:
+    """Admission decisions per AI type since startup."""
+    return {ai_type: dict(counts) for ai_type, counts in _stats.items()}
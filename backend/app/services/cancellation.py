@@ -0,0 +1,131 @@
+"""Cancellation of running AI sessions.
+
+Graph runs register their task with ``cancellable(session_id)``. Cancelling
+a session marks it ``cancelled`` in the database and cancels its task,
+which aborts the running nodes and their in-flight provider calls.
+
+The session may be running in another process (a job queue worker), so
+every process with registered runs also polls the database for sessions
+cancelled elsewhere, every CANCEL_POLL_INTERVAL seconds. Nodes and LLM
+calls check ``raise_if_cancelled`` between steps as well.
+"""
+import asyncio
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from loguru import logger
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.ai_job import AIJob
+from app.models.ai_session import AISession
+from app.services.progress import get_progress_broker
+
+
+ACTIVE_STATUSES = ("pending", "processing")
+
+_running: dict[str, asyncio.Task] = {}
+_cancelled: set[str] = set()
+_watcher: Optional[asyncio.Task] = None
+
+
+class SessionCancelled(asyncio.CancelledError):
+    """Raised inside a graph run whose session was cancelled."""
+
+
+def is_cancelled(session_id: Optional[str]) -> bool:
+    return session_id is not None and session_id in _cancelled
+
+
+def raise_if_cancelled(session_id: Optional[str]):
+    """Stop the current step if its session has been cancelled."""
+    if is_cancelled(session_id):
+        raise SessionCancelled(f"Session {session_id} cancelled")
+
+
+def _cancel_local(session_id: str) -> bool:
+    """Cancel the session's task if it runs in this process."""
+    task = _running.get(session_id)
+    if task is None or task.done():
+        return False
+    _cancelled.add(session_id)
+    task.cancel()
+    return True
+
+
+async def _watch_cancellations():
+    """Pick up sessions cancelled from other processes."""
+    while _running:
+        await asyncio.sleep(settings.CANCEL_POLL_INTERVAL)
+        session_ids = [UUID(session_id) for session_id in _running if session_id not in _cancelled]
+        if not session_ids:
+            continue
+        try:
+            async with async_session_maker() as db:
+                result = await db.execute(
+                    select(AISession.id).where(
+                        AISession.id.in_(session_ids),
+                        AISession.status == "cancelled",
+                    )
+                )
+                cancelled = [str(session_id) for session_id in result.scalars().all()]
+        except Exception as e:
+            logger.warning(f"Cancellation check failed: {e}")
+            continue
+        for session_id in cancelled:
+            logger.info(f"Session {session_id} cancelled, stopping its run")
+            _cancel_local(session_id)
+
+
+@contextmanager
+def cancellable(session_id: str):
+    """Register the current task as the run of this session.
+
+    A cancellation of the session ends the block quietly; any other
+    cancellation (e.g. shutdown) propagates.
+    """
+    global _watcher
+    task = asyncio.current_task()
+    _running[session_id] = task
+    if _watcher is None or _watcher.done():
+        _watcher = asyncio.create_task(_watch_cancellations())
+    try:
+        yield
+    except asyncio.CancelledError:
+        if session_id not in _cancelled:
+            raise
+        if task.cancelling():
+            task.uncancel()
+        logger.info(f"Session {session_id} run stopped after cancellation")
+    finally:
+        if _running.get(session_id) is task:
+            del _running[session_id]
+        _cancelled.discard(session_id)
+
+
+async def cancel_session(db: AsyncSession, session: AISession) -> bool:
+    """Mark the session cancelled and stop its run.
+
+    Returns False if the session had already finished.
+    """
+    if session.status not in ACTIVE_STATUSES:
+        return False
+
+    session.status = "cancelled"
+    session.completed_at = datetime.utcnow()
+    # Jobs still waiting in the queue are never picked up
+    await db.execute(
+        update(AIJob)
+        .where(AIJob.session_id == session.id, AIJob.status == "queued")
+        .values(status="cancelled", completed_at=datetime.utcnow())
+    )
+    await db.commit()
+
+    if _cancel_local(str(session.id)):
+        logger.info(f"Session {session.id} cancelled")
+    await get_progress_broker().announce(str(session.id), "cancelled")
+    return True
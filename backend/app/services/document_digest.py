@@ -0,0 +1,355 @@
+"""Precomputed document digests.
+
+Graphs used to load the full text of a user's resume, portfolio and past
+letters or reports for every session and send thousands of tokens of it.
+Instead, each document gets a compact digest, built once when it is
+uploaded (or its category changes) and stored in document_digests:
+
+- resume, portfolio: summary, skills, experience, projects and achievements,
+  extracted by DOCUMENT_DIGEST_MODEL;
+- cover_letter, weekly_report: tone features and a short style excerpt
+  (plus the section outline and formatting of reports, and the style
+  fingerprint of letters), computed locally;
+- other categories: keywords and summary from the parser.
+
+Graphs read digests with ``load_digests`` and put ``render_digest`` output
+in their prompts. Documents without a current digest (uploaded before
+digests existed, or whose background build failed) are digested on the spot.
+The style excerpt only shapes prompts: local style scoring combines the
+fingerprints, built from the full text, with ``load_style_profile``.
+"""
+import hashlib
+import json
+import re
+from typing import List, Optional, Sequence
+from uuid import UUID
+
+from langchain_core.messages import HumanMessage
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.document import Document
+from app.models.document_digest import DocumentDigest
+from app.services.document_parser import extract_keywords, generate_simple_summary
+from app.services.llm import get_model
+from app.services.prompt_budget import count_tokens, trim_to_tokens
+from app.services.stylometry import (
+    StyleProfile,
+    cache_profile,
+    cached_profile,
+    profile_from_fingerprints,
+    style_fingerprint,
+    tone_features,
+)
+
+# Categories whose digest is extracted by an LLM
+EXTRACTED_CATEGORIES = ("resume", "portfolio")
+
+# Tokens of the original kept as a style reference
+STYLE_EXCERPT_TOKENS = {
+    "cover_letter": 800,
+    "weekly_report": 400,
+}
+
+# Categories whose digest stores a style fingerprint for local style scoring
+STYLE_PROFILE_CATEGORIES = ("cover_letter",)
+
+# Tokens of the document sent for extraction
+EXTRACTION_SOURCE_TOKENS = 12000
+# Tokens of the original kept when extraction fails
+FALLBACK_CONTENT_TOKENS = 2000
+
+MAX_OUTLINE_HEADINGS = 20
+
+_HEADING = re.compile(r"^\s{0,3}#{1,6}\s+(.+?)\s*#*\s*$", re.MULTILINE)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _outline(text: str) -> List[str]:
+    """Markdown headings, in order."""
+    return [heading.strip() for heading in _HEADING.findall(text)][:MAX_OUTLINE_HEADINGS]
+
+
+def _format_features(text: str) -> dict:
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    total = max(len(lines), 1)
+    return {
+        "tables": any(line.startswith("|") for line in lines),
+        "bullet_ratio": round(sum(line.startswith(("-", "*", "•")) for line in lines) / total, 2),
+        "numbered_ratio": round(sum(bool(re.match(r"\d+[.)]", line)) for line in lines) / total, 2),
+        "percentages": "%" in text,
+    }
+
+
+async def _extract_profile(category: str, text: str) -> Optional[dict]:
+    """Extract skills, experience and projects from a resume or portfolio."""
+    model = get_model(settings.DOCUMENT_DIGEST_MODEL, temperature=0.0)
+    document_type = "이력서" if category == "resume" else "포트폴리오"
+
+    prompt = f"""
+    다음 {document_type}에서 자기소개서 작성에 필요한 정보를 추출해 JSON으로 정리해주세요.
+    원문에 있는 사실만 간결하게 적고, 수치 성과는 그대로 유지하세요.
+
+    {trim_to_tokens(text, EXTRACTION_SOURCE_TOKENS, settings.DOCUMENT_DIGEST_MODEL)}
+
+    출력 형식 (JSON만 출력):
+    {{
+        "summary": "2-3문장 요약",
+        "skills": ["기술/역량1", "기술/역량2"],
+        "experience": [
+            {{"organization": "회사/기관", "role": "역할", "period": "기간", "highlights": ["주요 업무/성과"]}}
+        ],
+        "projects": [
+            {{"name": "프로젝트명", "period": "기간", "role": "역할", "tech": ["기술"], "description": "한 문장 설명", "results": "성과"}}
+        ],
+        "achievements": ["수상/자격증/성과"],
+        "education": ["학력"]
+    }}
+    """
+
+    response = await model.ainvoke([HumanMessage(content=prompt)])
+
+    try:
+        content = response.content
+        if "```json" in content:
+            content = content.split("```json")[1].split("```")[0]
+        elif "```" in content:
+            content = content.split("```")[1].split("```")[0]
+
+        extracted = json.loads(content.strip())
+    except (json.JSONDecodeError, IndexError):
+        return None
+    return extracted if isinstance(extracted, dict) else None
+
+
+async def build_digest(category: str, text: str) -> tuple[dict, Optional[str]]:
+    """Digest of a document's text and the model used to build it (None = local)."""
+    digest = {}
+    model = None
+    if category not in STYLE_EXCERPT_TOKENS:
+        digest["summary"] = generate_simple_summary(text, max_length=300)
+        digest["keywords"] = extract_keywords(text)
+
+    if category in EXTRACTED_CATEGORIES:
+        try:
+            extracted = await _extract_profile(category, text)
+        except Exception as e:
+            logger.warning(f"Digest extraction failed, keeping the local digest: {e}")
+            extracted = None
+        if extracted:
+            digest.update(extracted)
+            model = settings.DOCUMENT_DIGEST_MODEL
+        else:
+            digest["content"] = trim_to_tokens(text, FALLBACK_CONTENT_TOKENS)
+
+    if category in STYLE_EXCERPT_TOKENS:
+        digest["tone"] = tone_features(text)
+        digest["excerpt"] = trim_to_tokens(text, STYLE_EXCERPT_TOKENS[category])
+    if category in STYLE_PROFILE_CATEGORIES:
+        digest["style"] = style_fingerprint(text)
+    if category == "weekly_report":
+        digest["outline"] = _outline(text)
+        digest["format"] = _format_features(text)
+
+    return digest, model
+
+
+def _join(values) -> str:
+    if not isinstance(values, list):
+        return str(values or "")
+    return ", ".join(str(value) for value in values if value)
+
+
+def _is_current(row: DocumentDigest, category: str) -> bool:
+    """Whether a stored digest was built for the category and has all its fields."""
+    return row.category == category and (
+        category not in STYLE_PROFILE_CATEGORIES or "style" in row.digest
+    )
+
+
+def render_digest(digest: dict) -> str:
+    """Compact prompt text for a digest (the style excerpt is left out)."""
+    lines = []
+    if digest.get("summary"):
+        lines.append(f"요약: {digest['summary']}")
+    if digest.get("skills"):
+        lines.append(f"기술/역량: {_join(digest['skills'])}")
+
+    experience = [e for e in digest.get("experience") or [] if isinstance(e, dict)]
+    if experience:
+        lines.append("경력:")
+        for item in experience:
+            header = " / ".join(filter(None, [item.get("organization"), item.get("role")]))
+            period = f" ({item['period']})" if item.get("period") else ""
+            highlights = "; ".join(str(h) for h in item.get("highlights") or [])
+            lines.append(f"- {header}{period}" + (f": {highlights}" if highlights else ""))
+
+    projects = [p for p in digest.get("projects") or [] if isinstance(p, dict)]
+    if projects:
+        lines.append("프로젝트:")
+        for item in projects:
+            details = ", ".join(filter(None, [item.get("period"), item.get("role")]))
+            tech = f" [{_join(item['tech'])}]" if item.get("tech") else ""
+            text = " → ".join(filter(None, [item.get("description"), item.get("results")]))
+            lines.append(
+                f"- {item.get('name', '')}" + (f" ({details})" if details else "") + tech
+                + (f": {text}" if text else "")
+            )
+
+    for key, label in (("achievements", "성과"), ("education", "학력")):
+        if digest.get(key):
+            lines.append(f"{label}: {_join(digest[key])}")
+
+    if digest.get("content"):
+        lines.append(digest["content"])
+    elif "skills" not in digest and digest.get("keywords"):
+        lines.append(f"키워드: {_join(digest['keywords'])}")
+    if digest.get("outline"):
+        lines.append(f"구성: {' > '.join(digest['outline'])}")
+    if digest.get("format"):
+        fmt = digest["format"]
+        lines.append(
+            f"형식: 표 {'사용' if fmt.get('tables') else '미사용'}, "
+            f"불릿 비율 {fmt.get('bullet_ratio', 0)}, 번호 목록 비율 {fmt.get('numbered_ratio', 0)}"
+            + (", 진행률(%) 표기" if fmt.get("percentages") else "")
+        )
+    if digest.get("tone"):
+        tone = digest["tone"]
+        lines.append(
+            f"문체: 평균 문장 길이 {tone.get('sentence_length')}자, 종결어미 {tone.get('ending')}"
+        )
+    return "\n".join(lines)
+
+
+async def refresh_digest(db: AsyncSession, document: Document) -> Optional[DocumentDigest]:
+    """Build (or rebuild) and store the digest of a document.
+
+    A stored digest built from the same text for the same category is kept.
+    """
+    text = document.markdown_content or ""
+    if not text.strip():
+        return None
+
+    result = await db.execute(
+        select(DocumentDigest).where(DocumentDigest.document_id == document.id)
+    )
+    row = result.scalar_one_or_none()
+    text_hash = content_hash(text)
+    if row is not None and row.content_hash == text_hash and _is_current(row, document.category):
+        return row
+
+    digest, model = await build_digest(document.category, text)
+    values = {
+        "category": document.category,
+        "content_hash": text_hash,
+        "digest": digest,
+        "token_count": count_tokens(render_digest(digest) + digest.get("excerpt", "")),
+        "source_token_count": count_tokens(text),
+        "model": model,
+    }
+
+    if row is None:
+        row = DocumentDigest(document_id=document.id, user_id=document.user_id, **values)
+        db.add(row)
+    else:
+        for field, value in values.items():
+            setattr(row, field, value)
+
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Built concurrently (upload task and a session): keep the stored one
+        await db.rollback()
+        result = await db.execute(
+            select(DocumentDigest).where(DocumentDigest.document_id == document.id)
+        )
+        return result.scalar_one_or_none()
+
+    logger.info(
+        f"Digest of document {document.id} ({document.category}): "
+        f"{values['source_token_count']} -> {values['token_count']} tokens"
+    )
+    return row
+
+
+async def refresh_document_digest(document_id: UUID):
+    """Background task run after a document is uploaded or recategorized."""
+    try:
+        async with async_session_maker() as db:
+            result = await db.execute(select(Document).where(Document.id == document_id))
+            document = result.scalar_one_or_none()
+            if document:
+                await refresh_digest(db, document)
+    except Exception as e:
+        logger.warning(f"Failed to build the digest of document {document_id}: {e}")
+
+
+async def load_digests(
+    db: AsyncSession,
+    user_id: UUID,
+    categories: Sequence[str],
+    limit: Optional[int] = None,
+) -> List[DocumentDigest]:
+    """Digests of a user's active documents in the given categories, newest first.
+
+    Full documents are only read for those without a current digest.
+    """
+    query = (
+        select(Document.id, Document.category, DocumentDigest)
+        .outerjoin(DocumentDigest, DocumentDigest.document_id == Document.id)
+        .where(
+            Document.user_id == user_id,
+            Document.category.in_(categories),
+            Document.is_archived == False,
+        )
+        .order_by(Document.created_at.desc())
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    rows = (await db.execute(query)).all()
+
+    digests = []
+    for document_id, category, digest in rows:
+        if digest is None or not _is_current(digest, category):
+            result = await db.execute(select(Document).where(Document.id == document_id))
+            document = result.scalar_one_or_none()
+            digest = await refresh_digest(db, document) if document else None
+        if digest is not None:
+            digests.append(digest)
+    return digests
+
+
+async def load_style_profile(user_id: str, document_ids: Sequence[str]) -> Optional[StyleProfile]:
+    """Style profile of a user's reference documents, from their stored fingerprints.
+
+    Cached per process: a document's content never changes, so the same
+    documents always give the same profile.
+    """
+    if not document_ids:
+        return None
+    key = f"{user_id}:{','.join(document_ids)}"
+    profile = cached_profile(key)
+    if profile is not None:
+        return profile
+
+    async with async_session_maker() as db:
+        result = await db.execute(
+            select(DocumentDigest.document_id, DocumentDigest.digest).where(
+                DocumentDigest.document_id.in_([UUID(document_id) for document_id in document_ids])
+            )
+        )
+        fingerprints = {str(document_id): digest.get("style") for document_id, digest in result.all()}
+
+    profile = profile_from_fingerprints(
+        [fingerprints[document_id] for document_id in document_ids if fingerprints.get(document_id)]
+    )
+    if profile is not None:
+        cache_profile(key, profile)
+    return profile
@@ -0,0 +1,369 @@
+"""Background job queue for AI session graph runs.
+
+Session-creating endpoints enqueue a job instead of running the graph in
+the web process. Two backends:
+
+- ``postgres``: jobs are rows in ``ai_jobs``, claimed by separate worker
+  processes (``python -m app.worker``) with ``FOR UPDATE SKIP LOCKED``.
+  A claimed job stays invisible to other workers until its visibility
+  timeout, which the worker extends with heartbeats while the graph runs.
+  A job whose worker died becomes visible again and is retried; with graph
+  checkpointing the retry resumes from the last completed node.
+- ``local``: jobs run as tasks in the current process with the same
+  concurrency and retry policy (development and tests, or single-process
+  deployments). Nothing is persisted: queued jobs and pending retries are
+  lost when the process exits, and only GRAPH_RESUME_ON_STARTUP picks
+  their sessions up again. Durable queueing needs ``postgres``.
+"""
+import asyncio
+import os
+import socket
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
+
+from loguru import logger
+from sqlalchemy import and_, func, or_, select, update
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.ai_job import AIJob
+from app.models.ai_session import AISession
+from app.services.admission import type_limit
+
+
+@dataclass
+class Job:
+    id: str
+    session_id: str
+    user_id: str
+    ai_type: str
+    input_data: dict
+    attempts: int
+    max_attempts: int
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential back-off before the next attempt."""
+    return settings.JOB_RETRY_BACKOFF * (2 ** max(attempts - 1, 0))
+
+
+async def execute_job(job: Job) -> Optional[str]:
+    """Run the job's graph. Returns the session's error if it failed.
+
+    Cancelled sessions are skipped and count as done. Unless this is the
+    last attempt, the graph leaves a failed session pending for the retry
+    rather than marking it failed.
+    """
+    from app.graphs.registry import get_runners
+
+    async with async_session_maker() as db:
+        result = await db.execute(
+            select(AISession.status).where(AISession.id == UUID(job.session_id))
+        )
+        if result.scalar_one_or_none() == "cancelled":
+            return None
+
+    run = get_runners()[job.ai_type]
+    # A retry continues from the graph's last checkpoint, if there is one
+    return await run(
+        session_id=job.session_id,
+        user_id=job.user_id,
+        input_data=job.input_data,
+        resume=job.attempts > 1,
+        retry=job.attempts < job.max_attempts,
+    )
+
+
+async def mark_session_processing(session_id: str) -> bool:
+    """Mark a session as running. False if it was cancelled in the meantime."""
+    async with async_session_maker() as db:
+        result = await db.execute(
+            update(AISession)
+            .where(AISession.id == UUID(session_id), AISession.status != "cancelled")
+            .values(status="processing")
+        )
+        await db.commit()
+    return result.rowcount > 0
+
+
+async def mark_session_retrying(session_id: str):
+    async with async_session_maker() as db:
+        await db.execute(
+            update(AISession)
+            .where(AISession.id == UUID(session_id), AISession.status != "cancelled")
+            .values(status="pending", error_message=None)
+        )
+        await db.commit()
+
+
+async def mark_session_failed(session_id: str, error: str):
+    async with async_session_maker() as db:
+        await db.execute(
+            update(AISession)
+            .where(AISession.id == UUID(session_id), AISession.status != "cancelled")
+            .values(status="failed", error_message=error)
+        )
+        await db.commit()
+
+
+async def discard_checkpoint(ai_type: str, session_id: str):
+    """Drop the graph checkpoints of a session that won't be retried."""
+    from app.graphs.checkpoint import delete_checkpoint
+    from app.graphs.registry import get_graph
+
+    await delete_checkpoint(get_graph(ai_type), session_id)
+
+
+class JobQueue(ABC):
+    """Interface shared by the queue backends."""
+
+    @abstractmethod
+    async def enqueue(self, session: AISession, attempts: int = 0):
+        """Queue a session's graph run.
+
+        Args:
+            attempts: Attempts already used. A run interrupted by a restart
+                counts as one, so the next attempt resumes from its checkpoint.
+        """
+
+    @abstractmethod
+    async def depth(self) -> dict[str, int]:
+        """Jobs waiting to run, per AI type."""
+
+
+class PostgresJobQueue(JobQueue):
+    """Jobs stored in ai_jobs and claimed by worker processes."""
+
+    async def enqueue(self, session: AISession, attempts: int = 0):
+        async with async_session_maker() as db:
+            db.add(AIJob(
+                session_id=session.id,
+                user_id=session.user_id,
+                ai_type=session.ai_type,
+                input_data=session.input_data,
+                attempts=attempts,
+                max_attempts=settings.JOB_MAX_ATTEMPTS,
+            ))
+            await db.commit()
+
+    async def claim(self, worker_id: str, limit: int) -> list[Job]:
+        """Claim up to limit runnable jobs, including ones whose worker died.
+
+        Jobs of an AI type already running at its admission cap are left
+        queued (approximate across concurrently claiming workers).
+        """
+        now = datetime.utcnow()
+        claimed: list[Job] = []
+        abandoned: list[AIJob] = []
+
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(AIJob.ai_type, func.count())
+                .where(AIJob.status == "running", AIJob.locked_until >= now)
+                .group_by(AIJob.ai_type)
+            )
+            capacity = {
+                ai_type: type_limit(ai_type) - running
+                for ai_type, running in result.all()
+                if type_limit(ai_type) is not None
+            }
+            full = [ai_type for ai_type, free in capacity.items() if free <= 0]
+
+            result = await db.execute(
+                select(AIJob)
+                .where(
+                    or_(
+                        and_(AIJob.status == "queued", AIJob.run_after <= now),
+                        and_(AIJob.status == "running", AIJob.locked_until < now),
+                    ),
+                    AIJob.ai_type.not_in(full),
+                )
+                .order_by(AIJob.run_after)
+                .limit(limit)
+                .with_for_update(skip_locked=True)
+            )
+            for job in result.scalars().all():
+                if job.attempts >= job.max_attempts:
+                    # Its last attempt's worker died
+                    job.status = "failed"
+                    job.last_error = job.last_error or "worker lost"
+                    job.locked_by = None
+                    job.locked_until = None
+                    await db.execute(
+                        update(AISession)
+                        .where(AISession.id == job.session_id, AISession.status != "cancelled")
+                        .values(status="failed", error_message="작업 처리 중 오류가 발생했습니다.")
+                    )
+                    abandoned.append(job)
+                    continue
+
+                free = capacity.get(job.ai_type, type_limit(job.ai_type))
+                if free is not None:
+                    if free <= 0:
+                        continue
+                    capacity[job.ai_type] = free - 1
+
+                job.status = "running"
+                job.attempts += 1
+                job.locked_by = worker_id
+                job.locked_until = now + timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT)
+                claimed.append(Job(
+                    id=str(job.id),
+                    session_id=str(job.session_id),
+                    user_id=str(job.user_id),
+                    ai_type=job.ai_type,
+                    input_data=job.input_data,
+                    attempts=job.attempts,
+                    max_attempts=job.max_attempts,
+                ))
+            await db.commit()
+
+        for job in abandoned:
+            await discard_checkpoint(job.ai_type, str(job.session_id))
+        return claimed
+
+    async def heartbeat(self, job: Job, worker_id: str):
+        """Extend the job's visibility timeout while it is still running."""
+        async with async_session_maker() as db:
+            await db.execute(
+                update(AIJob)
+                .where(AIJob.id == UUID(job.id), AIJob.locked_by == worker_id)
+                .values(locked_until=datetime.utcnow() + timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT))
+            )
+            await db.commit()
+
+    async def finish(self, job: Job, error: Optional[str]):
+        """Record the outcome of an attempt, re-queueing it if retries remain."""
+        values = {"locked_by": None, "locked_until": None}
+        if error is None:
+            values.update(status="completed", completed_at=datetime.utcnow())
+        elif job.attempts < job.max_attempts:
+            values.update(
+                status="queued",
+                last_error=error,
+                run_after=datetime.utcnow() + timedelta(seconds=retry_delay(job.attempts)),
+            )
+            # The graph already did this unless the attempt failed outside it
+            await mark_session_retrying(job.session_id)
+        else:
+            values.update(status="failed", last_error=error, completed_at=datetime.utcnow())
+            await discard_checkpoint(job.ai_type, job.session_id)
+
+        async with async_session_maker() as db:
+            await db.execute(update(AIJob).where(AIJob.id == UUID(job.id)).values(**values))
+            await db.commit()
+
+    async def depth(self) -> dict[str, int]:
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(AIJob.ai_type, func.count())
+                .where(AIJob.status == "queued")
+                .group_by(AIJob.ai_type)
+            )
+            return {ai_type: count for ai_type, count in result.all()}
+
+
+class LocalJobQueue(JobQueue):
+    """Runs jobs as tasks in this process, with bounded concurrency and retries."""
+
+    def __init__(self, concurrency: int):
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._type_semaphores: dict[str, asyncio.Semaphore] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._waiting: dict[str, int] = {}
+
+    def _type_semaphore(self, ai_type: str) -> Optional[asyncio.Semaphore]:
+        """Enforces the AI type's admission cap on running jobs."""
+        limit = type_limit(ai_type)
+        if limit is None:
+            return None
+        if ai_type not in self._type_semaphores:
+            self._type_semaphores[ai_type] = asyncio.Semaphore(limit)
+        return self._type_semaphores[ai_type]
+
+    async def enqueue(self, session: AISession, attempts: int = 0):
+        job = Job(
+            id=str(uuid.uuid4()),
+            session_id=str(session.id),
+            user_id=str(session.user_id),
+            ai_type=session.ai_type,
+            input_data=session.input_data,
+            attempts=attempts,
+            max_attempts=settings.JOB_MAX_ATTEMPTS,
+        )
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job: Job):
+        while True:
+            type_semaphore = self._type_semaphore(job.ai_type)
+            self._waiting[job.ai_type] = self._waiting.get(job.ai_type, 0) + 1
+            try:
+                if type_semaphore is not None:
+                    await type_semaphore.acquire()
+                try:
+                    await self._semaphore.acquire()
+                except BaseException:
+                    if type_semaphore is not None:
+                        type_semaphore.release()
+                    raise
+            finally:
+                self._waiting[job.ai_type] -= 1
+
+            try:
+                job.attempts += 1
+                error = await execute_job(job)
+            except Exception as e:
+                error = str(e)
+            finally:
+                self._semaphore.release()
+                if type_semaphore is not None:
+                    type_semaphore.release()
+
+            if error is None:
+                return
+            if job.attempts >= job.max_attempts:
+                logger.error(f"Job {job.ai_type}/{job.session_id} failed: {error}")
+                await mark_session_failed(job.session_id, error)
+                await discard_checkpoint(job.ai_type, job.session_id)
+                return
+
+            delay = retry_delay(job.attempts)
+            logger.warning(
+                f"Job {job.ai_type}/{job.session_id} attempt {job.attempts} failed, "
+                f"retrying in {delay:.0f}s: {error}"
+            )
+            # The graph already did this unless the attempt failed outside it
+            await mark_session_retrying(job.session_id)
+            await asyncio.sleep(delay)
+
+    async def depth(self) -> dict[str, int]:
+        return {ai_type: count for ai_type, count in self._waiting.items() if count}
+
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Get the configured job queue backend."""
+    global _job_queue
+    if _job_queue is None:
+        if settings.JOB_QUEUE_BACKEND == "postgres":
+            _job_queue = PostgresJobQueue()
+        else:
+            _job_queue = LocalJobQueue(settings.WORKER_CONCURRENCY)
+    return _job_queue
+
+
+async def enqueue_session(session: AISession):
+    """Queue the graph run for a newly created AI session."""
+    await get_job_queue().enqueue(session)
+
+
+def make_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
@@ -1,12 +1,38 @@
 """LLM client configuration and utilities."""
-from typing import Optional
+import asyncio
+import hashlib
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Optional
 from functools import lru_cache
 
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    convert_to_messages,
+)
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_anthropic import ChatAnthropic
 
+from loguru import logger
+
 from app.core.config import settings
+from app.services.llm_cache import get_response_cache, make_cache_key
+from app.services.llm_fake import get_fake_model, record_response
+from app.services.cancellation import raise_if_cancelled
+from app.services.llm_telemetry import (
+    current_session_id,
+    get_telemetry,
+    note_retry,
+    record_cache_hit,
+    track_llm_call,
+)
+from app.services.prompt_budget import count_tokens
 
 
 class LLMClients:
@@ -91,18 +117,744 @@ MODEL_ALIASES = {
     "claude-haiku-4.5": "claude-haiku-4-5-20251001",
 }
 
+# Equivalent-tier backups on other providers, used for hedged requests.
+# Override per alias with the LLM_HEDGE_EQUIVALENTS setting.
+HEDGE_EQUIVALENTS = {
+    "gpt-5.2": ["claude-opus-4.5", "gemini-3-pro"],
+    "gpt-5": ["claude-sonnet-4.5", "gemini-3-pro"],
+    "gpt-5-mini": ["gemini-3-flash", "claude-haiku-4.5"],
+    "gpt-5-nano": ["gemini-3-flash", "claude-haiku-4.5"],
+    "gemini-3-pro": ["gpt-5", "claude-sonnet-4.5"],
+    "gemini-3-flash": ["gpt-5-mini", "claude-haiku-4.5"],
+    "claude-opus-4.5": ["gpt-5.2", "gemini-3-pro"],
+    "claude-sonnet-4.5": ["gpt-5", "gemini-3-pro"],
+    "claude-haiku-4.5": ["gpt-5-mini", "gemini-3-flash"],
+}
+
+# Temperature for analysis, planning and judge calls. They are deterministic,
+# so repeats (the same posting or destination) are served from the cache.
+ANALYSIS_TEMPERATURE = 0.0
+
+
+class ManagedChatModel:
+    """Chat model wrapper that serves repeated prompts from the response cache.
+
+    Attributes not defined here (astream, bind_tools, ...) are forwarded to
+    the underlying LangChain model, so callers can use it as a drop-in.
+    """
+
+    def __init__(
+        self,
+        model,
+        model_id: str,
+        temperature: float,
+        alias: Optional[str] = None,
+        hedge: bool = False,
+    ):
+        self.model = model
+        self.model_id = model_id
+        self.temperature = temperature
+        self.provider = get_provider(model_id)
+        self.alias = alias or model_id
+        self.hedge = hedge
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def cacheable(self, use_cache: bool = True) -> bool:
+        """Whether responses of this model may be served from the cache.
+
+        Only (near-)deterministic calls are cached by default; see
+        LLM_CACHE_MAX_TEMPERATURE. Fake responses are never cached, so they
+        can't be served to live callers sharing the cache.
+        """
+        return (
+            settings.LLM_CACHE_ENABLED
+            and settings.LLM_PROVIDER_MODE != "fake"
+            and use_cache
+            and self.temperature <= settings.LLM_CACHE_MAX_TEMPERATURE
+        )
+
+    async def ainvoke(
+        self,
+        input,
+        config=None,
+        *,
+        use_cache: bool = True,
+        cache_ttl: Optional[int] = None,
+        **kwargs,
+    ) -> BaseMessage:
+        """Invoke the model, returning a cached response for identical calls.
+
+        Args:
+            use_cache: Set to False to always call the provider.
+            cache_ttl: Override the cache TTL (seconds) for this response.
+        """
+        # Don't start or join a provider call for a session that has been
+        # cancelled. Checked here in the caller: the call below may be shared
+        # with other sessions through single-flight and must not fail for them.
+        raise_if_cancelled(current_session_id())
+        messages = to_messages(input)
+        cache = get_response_cache()
+        key = make_cache_key(self.model_id, self.temperature, messages, **kwargs)
+        cacheable = self.cacheable(use_cache)
+
+        if cacheable:
+            cached = await cache.get(key)
+            if cached is not None:
+                record_cache_hit(self.provider, self.model_id)
+                return cached
+        else:
+            cache.record_bypass()
+
+        async def call() -> BaseMessage:
+            with track_llm_call(self.provider, self.model_id) as record:
+                if self.hedge:
+                    response = await self._hedged_call(messages, config, **kwargs)
+                else:
+                    response = await self._governed_call(messages, config, **kwargs)
+                record.set_response(response)
+            if settings.LLM_PROVIDER_MODE == "record":
+                record_response(self.model_id, self.temperature, messages, response)
+            if cacheable:
+                await cache.set(key, response, cache_ttl)
+            return response
+
+        if not settings.LLM_SINGLE_FLIGHT_ENABLED:
+            return await call()
+        return await get_single_flight().do(key, call)
+
+    async def astream(
+        self,
+        input,
+        config=None,
+        *,
+        use_cache: bool = True,
+        cache_ttl: Optional[int] = None,
+        **kwargs,
+    ) -> AsyncIterator[AIMessageChunk]:
+        """Stream the response token by token.
+
+        A cached response is replayed as a single chunk. Otherwise the
+        stream holds a rate governor slot for its whole duration and the
+        assembled message is cached once the stream completes.
+        """
+        raise_if_cancelled(current_session_id())
+        messages = to_messages(input)
+        cache = get_response_cache()
+        key = make_cache_key(self.model_id, self.temperature, messages, **kwargs)
+        cacheable = self.cacheable(use_cache)
+
+        if cacheable:
+            cached = await cache.get(key)
+            if cached is not None:
+                record_cache_hit(self.provider, self.model_id)
+                yield AIMessageChunk(
+                    content=cached.content,
+                    usage_metadata=getattr(cached, "usage_metadata", None),
+                )
+                return
+        else:
+            cache.record_bypass()
+
+        with track_llm_call(self.provider, self.model_id) as record:
+            async with self._stream_slot(messages) as slot:
+                final: Optional[AIMessageChunk] = None
+                provider_messages, cache_options = apply_prompt_cache(messages, self.provider)
+                async for chunk in self.model.astream(
+                    provider_messages, config, **cache_options, **kwargs
+                ):
+                    final = chunk if final is None else final + chunk
+                    yield chunk
+
+                if final is None:
+                    return
+                response = AIMessage(
+                    content=final.content,
+                    usage_metadata=final.usage_metadata,
+                    response_metadata=final.response_metadata,
+                )
+                record.set_response(response)
+                if slot is not None:
+                    slot.completed(response)
+        if settings.LLM_PROVIDER_MODE == "record":
+            record_response(self.model_id, self.temperature, messages, response)
+        if cacheable:
+            await cache.set(key, response, cache_ttl)
+
+    @asynccontextmanager
+    async def _stream_slot(self, messages: list[BaseMessage]):
+        if not settings.LLM_GOVERNOR_ENABLED:
+            yield None
+            return
+        governor = get_governor(self.provider, self.model_id)
+        estimated = estimate_tokens(messages, self.model_id) + settings.LLM_GOVERNOR_OUTPUT_RESERVE
+        async with governor.slot(estimated) as slot:
+            yield slot
+
+    async def _timed_call(self, messages: list[BaseMessage], config=None, **kwargs) -> BaseMessage:
+        """Call the provider and record its latency for hedging decisions."""
+        messages, cache_options = apply_prompt_cache(messages, self.provider)
+        started_at = time.monotonic()
+        response = await self.model.ainvoke(messages, config, **cache_options, **kwargs)
+        get_latency_tracker(self.model_id).record(time.monotonic() - started_at)
+        return response
+
+    async def _governed_call(self, messages: list[BaseMessage], config=None, **kwargs) -> BaseMessage:
+        """Call the provider through the rate governor, backing off on 429s."""
+        if not settings.LLM_GOVERNOR_ENABLED:
+            return await self._timed_call(messages, config, **kwargs)
+
+        governor = get_governor(self.provider, self.model_id)
+        estimated = estimate_tokens(messages, self.model_id) + settings.LLM_GOVERNOR_OUTPUT_RESERVE
+        attempt = 0
+        while True:
+            async with governor.slot(estimated) as slot:
+                try:
+                    response = await self._timed_call(messages, config, **kwargs)
+                except Exception as e:
+                    if not is_rate_limit_error(e) or attempt >= settings.LLM_GOVERNOR_MAX_RETRIES:
+                        raise
+                    slot.throttled()
+                else:
+                    slot.completed(response)
+                    return response
+            attempt += 1
+            note_retry()
+            logger.warning(
+                f"LLM governor: {self.provider}/{self.model_id} rate limited, "
+                f"retry {attempt}/{settings.LLM_GOVERNOR_MAX_RETRIES}"
+            )
+
+    async def _hedged_call(self, messages: list[BaseMessage], config=None, **kwargs) -> BaseMessage:
+        """Race a backup model against a slow primary call.
+
+        If the primary has not answered within the configured percentile of
+        its recent latency, the same prompt is sent to an equivalent-tier
+        model on another provider. The first successful response wins and
+        the other request is cancelled.
+        """
+        stats = get_hedge_stats(self.alias)
+        stats["calls"] += 1
+        primary = asyncio.ensure_future(self._governed_call(messages, config, **kwargs))
+        pending = {primary}
+        try:
+            delay = get_latency_tracker(self.model_id).hedge_delay()
+            backup_model = get_hedge_backup(self.alias, self.temperature)
+            if delay is None or backup_model is None or not hedge_budget_available(stats):
+                return await primary
+
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+
+            stats["hedged"] += 1
+            logger.info(
+                f"LLM hedge: {self.alias} slower than {delay:.1f}s, "
+                f"racing {backup_model.alias}"
+            )
+            backup = asyncio.ensure_future(backup_model._governed_call(messages, config, **kwargs))
+            pending.add(backup)
+
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        stats["backup_wins" if task is backup else "primary_wins"] += 1
+                        return task.result()
+                    if task is primary or error is None:
+                        error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+
+class _Flight:
+    """A shared in-flight call and the number of callers awaiting it."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls onto one in-flight task.
+
+    The first caller for a key starts the task; later callers with the same
+    key await the same result. The task is cancelled only when every waiter
+    has gone away.
+    """
+
+    def __init__(self):
+        self._flights: dict[str, _Flight] = {}
+        self.stats = {"calls": 0, "coalesced": 0, "max_waiters": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[BaseMessage]]) -> BaseMessage:
+        self.stats["calls"] += 1
+        flight = self._flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _, f=flight: self._forget(key, f))
+        else:
+            self.stats["coalesced"] += 1
+
+        flight.waiters += 1
+        self.stats["max_waiters"] = max(self.stats["max_waiters"], flight.waiters)
+        try:
+            result = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+        # Followers get their own copy so callers can't mutate each other's result
+        return result if leader else result.model_copy(deep=True)
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "in_flight": len(self._flights),
+            "waiters": {key[:12]: f.waiters for key, f in self._flights.items()},
+        }
+
+
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Get the process-wide single-flight group for LLM calls."""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
+
+
+# Default per-model budgets. Override with the LLM_RATE_LIMITS setting, keyed
+# by "provider" or "provider:model_id".
+DEFAULT_RATE_LIMITS = {
+    "openai": {"rpm": 500, "tpm": 500_000, "concurrency": 16},
+    "google": {"rpm": 300, "tpm": 1_000_000, "concurrency": 16},
+    "anthropic": {"rpm": 50, "tpm": 80_000, "concurrency": 8},
+}
+
+
+def get_provider(model_id: str) -> str:
+    """Provider name for a resolved model id."""
+    if model_id.startswith("gemini"):
+        return "google"
+    if model_id.startswith("claude"):
+        return "anthropic"
+    return "openai"
+
+
+def estimate_tokens(messages: list[BaseMessage], model_id: str) -> int:
+    """Token estimate for the prompt, used to reserve TPM budget before a call."""
+    total = 0
+    for message in messages:
+        content = message.content
+        total += count_tokens(content if isinstance(content, str) else str(content), model_id)
+    return total
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Whether a provider error is a 429 / rate limit response."""
+    status = getattr(error, "status_code", None) or getattr(
+        getattr(error, "response", None), "status_code", None
+    )
+    if status == 429:
+        return True
+    text = f"{type(error).__name__} {error}".lower()
+    return "ratelimit" in text or "rate limit" in text or "resource_exhausted" in text or "429" in text
+
+
+def get_token_usage(response: BaseMessage) -> Optional[int]:
+    """Total tokens reported by the provider, if any."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        return usage.get("total_tokens")
+    return None
+
+
+class TokenBucket:
+    """Per-minute budget that refills continuously.
+
+    Callers are served in FIFO order: whoever holds the lock waits for the
+    refill, everyone behind them queues on the lock.
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, amount: float) -> float:
+        """Take amount from the bucket, waiting if needed. Returns seconds waited."""
+        # A single request larger than the whole budget waits for a full bucket
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+    def adjust(self, delta: float):
+        """Give back (positive) or charge extra (negative) after the fact."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + delta)
+
+    def drain(self):
+        """Empty the bucket so the next caller waits for a refill."""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+    def available(self) -> int:
+        self._refill()
+        return int(self.tokens)
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency window.
+
+    The window grows by 1/window per successful call and is cut
+    multiplicatively on 429s or latency spikes.
+    """
+
+    def __init__(self, max_limit: int, min_limit: int = 1):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.queued = 0
+        self.latency_ewma: Optional[float] = None
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._cond:
+            self.queued += 1
+            try:
+                await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            finally:
+                self.queued -= 1
+            self.in_flight += 1
+
+    async def release(self):
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self, latency: float):
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        elif latency > self.latency_ewma * settings.LLM_GOVERNOR_LATENCY_SPIKE_FACTOR:
+            self._decrease()
+        else:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+        self.latency_ewma = 0.8 * self.latency_ewma + 0.2 * latency
+
+    def on_throttle(self):
+        self._decrease()
+
+    def _decrease(self):
+        # A burst of failures from one overloaded window counts as one signal
+        now = time.monotonic()
+        if now - self._last_decrease < 1.0:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * 0.5)
+
+
+class _GovernorSlot:
+    """Outcome reporting for a single governed call."""
+
+    def __init__(self, governor: "RateGovernor", reserved: int):
+        self.governor = governor
+        self.reserved = reserved
+        self.started_at = time.monotonic()
+
+    def completed(self, response: BaseMessage):
+        governor = self.governor
+        governor.stats["requests"] += 1
+        governor.limiter.on_success(time.monotonic() - self.started_at)
+        used = get_token_usage(response)
+        if used is not None:
+            governor.stats["tokens"] += used
+            governor.tpm.adjust(self.reserved - used)
+
+    def throttled(self):
+        self.governor.stats["throttled"] += 1
+        self.governor.limiter.on_throttle()
+        # The provider told us we're over budget; drain the request bucket
+        # so queued callers back off instead of piling on.
+        self.governor.rpm.drain()
+
+
+class RateGovernor:
+    """Requests-per-minute, tokens-per-minute and concurrency budget for one model."""
+
+    def __init__(self, rpm: int, tpm: int, concurrency: int):
+        self.rpm = TokenBucket(rpm)
+        self.tpm = TokenBucket(tpm)
+        self.limiter = AdaptiveLimiter(concurrency)
+        self.stats = {"requests": 0, "tokens": 0, "throttled": 0, "queued_seconds": 0.0}
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int):
+        await self.limiter.acquire()
+        try:
+            waited = await self.rpm.acquire(1)
+            waited += await self.tpm.acquire(estimated_tokens)
+            self.stats["queued_seconds"] += waited
+            yield _GovernorSlot(self, estimated_tokens)
+        finally:
+            await self.limiter.release()
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "queued_seconds": round(self.stats["queued_seconds"], 3),
+            "concurrency_limit": round(self.limiter.limit, 2),
+            "in_flight": self.limiter.in_flight,
+            "queued": self.limiter.queued,
+            "rpm_available": self.rpm.available(),
+            "tpm_available": self.tpm.available(),
+        }
+
+
+_governors: dict[tuple[str, str], RateGovernor] = {}
+
+
+def get_governor(provider: str, model_id: str) -> RateGovernor:
+    """Get the rate governor for a provider/model pair."""
+    key = (provider, model_id)
+    if key not in _governors:
+        limits = {
+            **DEFAULT_RATE_LIMITS.get(provider, DEFAULT_RATE_LIMITS["openai"]),
+            **settings.LLM_RATE_LIMITS.get(provider, {}),
+            **settings.LLM_RATE_LIMITS.get(f"{provider}:{model_id}", {}),
+        }
+        _governors[key] = RateGovernor(
+            rpm=limits["rpm"],
+            tpm=limits["tpm"],
+            concurrency=limits["concurrency"],
+        )
+    return _governors[key]
+
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies for one model."""
+
+    def __init__(self, size: int = 200):
+        self.samples: deque[float] = deque(maxlen=size)
+
+    def record(self, latency: float):
+        self.samples.append(latency)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+        return ordered[index]
+
+    def hedge_delay(self) -> Optional[float]:
+        """How long to wait before hedging, or None while still warming up."""
+        if len(self.samples) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return max(
+            settings.LLM_HEDGE_MIN_DELAY,
+            self.percentile(settings.LLM_HEDGE_PERCENTILE),
+        )
+
+
+_latency_trackers: dict[str, LatencyTracker] = {}
+_hedge_stats: dict[str, dict] = {}
+
+PROVIDER_API_KEYS = {
+    "openai": "OPENAI_API_KEY",
+    "google": "GOOGLE_API_KEY",
+    "anthropic": "ANTHROPIC_API_KEY",
+}
+
+
+def get_latency_tracker(model_id: str) -> LatencyTracker:
+    if model_id not in _latency_trackers:
+        _latency_trackers[model_id] = LatencyTracker()
+    return _latency_trackers[model_id]
+
+
+def get_hedge_stats(alias: str) -> dict:
+    if alias not in _hedge_stats:
+        _hedge_stats[alias] = {"calls": 0, "hedged": 0, "primary_wins": 0, "backup_wins": 0}
+    return _hedge_stats[alias]
+
+
+def hedge_budget_available(stats: dict) -> bool:
+    """Cap the share of calls that may be hedged so backups can't double load."""
+    return stats["hedged"] < stats["calls"] * settings.LLM_HEDGE_MAX_RATE
+
+
+def get_hedge_backup(model_alias: str, temperature: float) -> Optional["ManagedChatModel"]:
+    """First configured equivalent on a different provider with an API key."""
+    primary_provider = get_provider(MODEL_ALIASES.get(model_alias, model_alias))
+    equivalents = settings.LLM_HEDGE_EQUIVALENTS.get(
+        model_alias, HEDGE_EQUIVALENTS.get(model_alias, [])
+    )
+    for backup_alias in equivalents:
+        provider = get_provider(MODEL_ALIASES.get(backup_alias, backup_alias))
+        if provider != primary_provider and getattr(settings, PROVIDER_API_KEYS[provider]):
+            return get_model(backup_alias, temperature, hedge=False)
+    return None
+
+
+def to_messages(input) -> list[BaseMessage]:
+    """Normalize a prompt string or message sequence into a message list."""
+    if isinstance(input, str):
+        return [HumanMessage(content=input)]
+    return convert_to_messages(input)
+
+
+# additional_kwargs flag set by cached_prefix()
+PROMPT_CACHE_MARK = "prompt_cache_prefix"
+
+
+def cached_prefix(content: str) -> SystemMessage:
+    """System message holding the stable part of a prompt.
+
+    Put it first and keep it byte-identical across calls, with the varying
+    part in a following HumanMessage. Anthropic gets an explicit
+    cache_control breakpoint on it, OpenAI a prompt_cache_key so calls
+    sharing the prefix are routed to the same cache, and Gemini caches
+    shared prefixes implicitly.
+    """
+    return SystemMessage(content=content, additional_kwargs={PROMPT_CACHE_MARK: True})
 
-def get_model(model_alias: str, temperature: float = 0.7):
-    """Get a model by alias name."""
+
+def apply_prompt_cache(
+    messages: list[BaseMessage], provider: str
+) -> tuple[list[BaseMessage], dict]:
+    """Turn cached_prefix() marks into provider prompt-caching options.
+
+    Returns the messages to send and extra keyword arguments for the call.
+    """
+    if settings.LLM_PROVIDER_MODE == "fake":
+        # Replay matches on the prompts exactly as they were recorded
+        return messages, {}
+
+    prefix = [m for m in messages if m.additional_kwargs.get(PROMPT_CACHE_MARK)]
+    if not prefix:
+        return messages, {}
+
+    prepared = []
+    for message in messages:
+        if not message.additional_kwargs.get(PROMPT_CACHE_MARK):
+            prepared.append(message)
+            continue
+        update = {
+            "additional_kwargs": {
+                k: v for k, v in message.additional_kwargs.items() if k != PROMPT_CACHE_MARK
+            }
+        }
+        if provider == "anthropic":
+            update["content"] = [
+                {"type": "text", "text": message.text, "cache_control": {"type": "ephemeral"}}
+            ]
+        prepared.append(message.model_copy(update=update))
+
+    options = {}
+    if provider == "openai":
+        digest = hashlib.sha256("".join(m.text for m in prefix).encode("utf-8"))
+        options["prompt_cache_key"] = digest.hexdigest()[:32]
+    return prepared, options
+
+
+def resolve_model(model_alias: str, temperature: float = 0.7):
+    """Get the raw LangChain client for an alias, without caching."""
     actual_model = MODEL_ALIASES.get(model_alias, model_alias)
+    if settings.LLM_PROVIDER_MODE == "fake":
+        return get_fake_model(actual_model, temperature)
+
     clients = get_llm_clients()
+    provider = get_provider(actual_model)
 
-    if actual_model.startswith("gpt"):
-        return clients.get_openai(actual_model, temperature)
-    elif actual_model.startswith("gemini"):
+    if provider == "google":
         return clients.get_google(actual_model, temperature)
-    elif actual_model.startswith("claude"):
+    elif provider == "anthropic":
         return clients.get_anthropic(actual_model, temperature)
     else:
-        # Default to OpenAI
+        # gpt-* and anything unrecognised go to OpenAI
         return clients.get_openai(actual_model, temperature)
+
+
+def get_model(
+    model_alias: str,
+    temperature: float = 0.7,
+    hedge: Optional[bool] = None,
+) -> ManagedChatModel:
+    """Get a model by alias name.
+
+    Args:
+        hedge: Race a backup provider when this call runs slow. Defaults to
+            the LLM_HEDGING_ENABLED setting.
+    """
+    actual_model = MODEL_ALIASES.get(model_alias, model_alias)
+    return ManagedChatModel(
+        resolve_model(model_alias, temperature),
+        model_id=actual_model,
+        temperature=temperature,
+        alias=model_alias,
+        hedge=settings.LLM_HEDGING_ENABLED if hedge is None else hedge,
+    )
+
+
+def get_cache_stats() -> dict:
+    """Hit/miss counters for the LLM response cache."""
+    return get_response_cache().get_stats()
+
+
+def get_llm_metrics() -> dict:
+    """Snapshot of all LLM layer metrics."""
+    return {
+        "cache": get_cache_stats(),
+        "single_flight": get_single_flight().get_stats(),
+        "governors": {
+            f"{provider}:{model_id}": governor.get_stats()
+            for (provider, model_id), governor in _governors.items()
+        },
+        "hedging": {
+            alias: {
+                **stats,
+                "hedge_rate": round(stats["hedged"] / stats["calls"], 4) if stats["calls"] else 0.0,
+            }
+            for alias, stats in _hedge_stats.items()
+        },
+        "calls": get_telemetry().snapshot(),
+        "latency_p50": {
+            model_id: tracker.percentile(50)
+            for model_id, tracker in _latency_trackers.items()
+        },
+    }
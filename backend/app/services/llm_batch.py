@@ -0,0 +1,485 @@
+"""Batch execution for non-interactive LLM work.
+
+Background jobs (news summarization, briefing preparation) don't need an
+answer within seconds. ``LLMBatch`` collects their requests, submits them
+through the provider's asynchronous batch endpoint, polls until the job
+finishes and maps each response back to the request that produced it.
+Provider batches are billed at a discount and don't compete with
+interactive calls for rate limits.
+
+The ``local`` backend runs the same requests through ``get_model()`` with
+bounded concurrency. It is used when ``LLM_BATCH_MODE=local``, in fake
+provider mode, when the provider has no API key, and for any request a
+provider batch failed to answer.
+
+Usage::
+
+    batch = LLMBatch("gemini-3-flash", temperature=0.3)
+    ids = [batch.add(prompt) for prompt in prompts]
+    results = await batch.run()  # BatchResult per request, in add() order
+"""
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional
+
+from langchain_core.messages import AIMessage, BaseMessage
+from loguru import logger
+
+from app.core.config import settings
+from app.services.llm_telemetry import record_batch_call
+
+
+@dataclass
+class BatchRequest:
+    custom_id: str
+    messages: list[BaseMessage]
+
+
+@dataclass
+class BatchResult:
+    custom_id: str
+    message: Optional[AIMessage] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.message is not None
+
+
+_OPENAI_ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+
+
+def _message_text(message: BaseMessage) -> str:
+    return message.content if isinstance(message.content, str) else message.text
+
+
+def _split_system(messages: list[BaseMessage]) -> tuple[str, list[BaseMessage]]:
+    """Separate system prompts for providers that take them as a parameter."""
+    system = "\n\n".join(_message_text(m) for m in messages if m.type == "system")
+    return system, [m for m in messages if m.type != "system"]
+
+
+def _ai_message(content: str, input_tokens: int, output_tokens: int, model_id: str) -> AIMessage:
+    return AIMessage(
+        content=content,
+        usage_metadata={
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        },
+        response_metadata={"model_name": model_id, "batch": True},
+    )
+
+
+class BatchBackend(ABC):
+    """Submit/poll/collect lifecycle shared by all batch backends."""
+
+    name = "base"
+
+    def __init__(self, model_id: str, temperature: float, max_tokens: int):
+        self.model_id = model_id
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+
+    @abstractmethod
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        """Submit requests and return the job id."""
+
+    @abstractmethod
+    async def poll(self, job_id: str) -> bool:
+        """Return True once the job has finished (successfully or not)."""
+
+    @abstractmethod
+    async def results(self, job_id: str, requests: list[BatchRequest]) -> dict[str, BatchResult]:
+        """Collect results for a finished job, keyed by custom_id."""
+
+    async def cancel(self, job_id: str):
+        """Best-effort cancellation of an unfinished job."""
+
+
+class LocalBatchBackend(BatchBackend):
+    """Runs batch requests as regular calls with bounded concurrency."""
+
+    name = "local"
+
+    def __init__(self, model_alias: str, model_id: str, temperature: float, max_tokens: int):
+        super().__init__(model_id, temperature, max_tokens)
+        self.model_alias = model_alias
+        self._jobs: dict[str, asyncio.Task] = {}
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        from app.services.llm import get_model
+
+        llm = get_model(self.model_alias, temperature=self.temperature, hedge=False)
+        semaphore = asyncio.Semaphore(settings.LLM_BATCH_LOCAL_CONCURRENCY)
+
+        async def run_one(request: BatchRequest) -> BatchResult:
+            async with semaphore:
+                try:
+                    message = await llm.ainvoke(request.messages)
+                    return BatchResult(request.custom_id, message=message)
+                except Exception as e:
+                    return BatchResult(request.custom_id, error=str(e))
+
+        async def run_all() -> dict[str, BatchResult]:
+            results = await asyncio.gather(*(run_one(r) for r in requests))
+            return {result.custom_id: result for result in results}
+
+        job_id = f"local-{id(requests)}-{time.monotonic_ns()}"
+        self._jobs[job_id] = asyncio.create_task(run_all())
+        return job_id
+
+    async def poll(self, job_id: str) -> bool:
+        return self._jobs[job_id].done()
+
+    async def results(self, job_id: str, requests: list[BatchRequest]) -> dict[str, BatchResult]:
+        return await self._jobs.pop(job_id)
+
+    async def cancel(self, job_id: str):
+        task = self._jobs.pop(job_id, None)
+        if task is not None:
+            task.cancel()
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """OpenAI Batch API: JSONL file upload against /v1/chat/completions."""
+
+    name = "openai"
+
+    def __init__(self, model_id: str, temperature: float, max_tokens: int):
+        super().__init__(model_id, temperature, max_tokens)
+        from openai import AsyncOpenAI
+
+        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+
+    def _body(self, request: BatchRequest) -> dict:
+        body = {
+            "model": self.model_id,
+            "messages": [
+                {"role": _OPENAI_ROLES.get(m.type, "user"), "content": _message_text(m)}
+                for m in request.messages
+            ],
+        }
+        # gpt-5 reasoning models only accept the default temperature
+        if not self.model_id.startswith("gpt-5") or "chat" in self.model_id or self.temperature == 1:
+            body["temperature"] = self.temperature
+        return body
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": request.custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": self._body(request),
+                },
+                ensure_ascii=False,
+            )
+            for request in requests
+        ]
+        batch_file = await self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch",
+        )
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id
+
+    async def poll(self, job_id: str) -> bool:
+        batch = await self.client.batches.retrieve(job_id)
+        return batch.status in ("completed", "failed", "expired", "cancelled")
+
+    async def results(self, job_id: str, requests: list[BatchRequest]) -> dict[str, BatchResult]:
+        batch = await self.client.batches.retrieve(job_id)
+        results: dict[str, BatchResult] = {}
+
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await self.client.files.content(file_id)
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                custom_id = entry["custom_id"]
+                response = entry.get("response") or {}
+                if entry.get("error") or response.get("status_code") != 200:
+                    error = entry.get("error") or response.get("body", {}).get("error")
+                    results[custom_id] = BatchResult(custom_id, error=str(error))
+                    continue
+                body = response["body"]
+                usage = body.get("usage") or {}
+                results[custom_id] = BatchResult(
+                    custom_id,
+                    message=_ai_message(
+                        body["choices"][0]["message"].get("content") or "",
+                        usage.get("prompt_tokens", 0),
+                        usage.get("completion_tokens", 0),
+                        self.model_id,
+                    ),
+                )
+        return results
+
+    async def cancel(self, job_id: str):
+        await self.client.batches.cancel(job_id)
+
+
+class AnthropicBatchBackend(BatchBackend):
+    """Anthropic Message Batches API."""
+
+    name = "anthropic"
+
+    def __init__(self, model_id: str, temperature: float, max_tokens: int):
+        super().__init__(model_id, temperature, max_tokens)
+        from anthropic import AsyncAnthropic
+
+        self.client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+
+    def _params(self, request: BatchRequest) -> dict:
+        system, messages = _split_system(request.messages)
+        params = {
+            "model": self.model_id,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "messages": [
+                {"role": "assistant" if m.type == "ai" else "user", "content": _message_text(m)}
+                for m in messages
+            ],
+        }
+        if system:
+            params["system"] = system
+        return params
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        batch = await self.client.messages.batches.create(
+            requests=[
+                {"custom_id": request.custom_id, "params": self._params(request)}
+                for request in requests
+            ]
+        )
+        return batch.id
+
+    async def poll(self, job_id: str) -> bool:
+        batch = await self.client.messages.batches.retrieve(job_id)
+        return batch.processing_status == "ended"
+
+    async def results(self, job_id: str, requests: list[BatchRequest]) -> dict[str, BatchResult]:
+        results: dict[str, BatchResult] = {}
+        async for entry in await self.client.messages.batches.results(job_id):
+            if entry.result.type != "succeeded":
+                error = getattr(entry.result, "error", None) or entry.result.type
+                results[entry.custom_id] = BatchResult(entry.custom_id, error=str(error))
+                continue
+            message = entry.result.message
+            text = "".join(block.text for block in message.content if block.type == "text")
+            results[entry.custom_id] = BatchResult(
+                entry.custom_id,
+                message=_ai_message(
+                    text,
+                    message.usage.input_tokens,
+                    message.usage.output_tokens,
+                    self.model_id,
+                ),
+            )
+        return results
+
+    async def cancel(self, job_id: str):
+        await self.client.messages.batches.cancel(job_id)
+
+
+class GoogleBatchBackend(BatchBackend):
+    """Gemini Batch API with inline requests."""
+
+    name = "google"
+
+    FINISHED_STATES = {
+        "JOB_STATE_SUCCEEDED",
+        "JOB_STATE_PARTIALLY_SUCCEEDED",
+        "JOB_STATE_FAILED",
+        "JOB_STATE_CANCELLED",
+        "JOB_STATE_EXPIRED",
+    }
+
+    def __init__(self, model_id: str, temperature: float, max_tokens: int):
+        super().__init__(model_id, temperature, max_tokens)
+        from google import genai
+
+        self.client = genai.Client(api_key=settings.GOOGLE_API_KEY)
+
+    def _inlined_request(self, request: BatchRequest) -> dict:
+        system, messages = _split_system(request.messages)
+        config = {"temperature": self.temperature}
+        if system:
+            config["system_instruction"] = system
+        return {
+            "contents": [
+                {"role": "model" if m.type == "ai" else "user", "parts": [{"text": _message_text(m)}]}
+                for m in messages
+            ],
+            "metadata": {"custom_id": request.custom_id},
+            "config": config,
+        }
+
+    async def submit(self, requests: list[BatchRequest]) -> str:
+        job = await self.client.aio.batches.create(
+            model=self.model_id,
+            src=[self._inlined_request(request) for request in requests],
+        )
+        return job.name
+
+    async def poll(self, job_id: str) -> bool:
+        job = await self.client.aio.batches.get(name=job_id)
+        return job.state.name in self.FINISHED_STATES
+
+    async def results(self, job_id: str, requests: list[BatchRequest]) -> dict[str, BatchResult]:
+        job = await self.client.aio.batches.get(name=job_id)
+        responses = (job.dest.inlined_responses or []) if job.dest else []
+        results: dict[str, BatchResult] = {}
+
+        # Inline responses come back in request order
+        for request, inlined in zip(requests, responses):
+            custom_id = (inlined.metadata or {}).get("custom_id", request.custom_id)
+            if inlined.error or inlined.response is None:
+                results[custom_id] = BatchResult(custom_id, error=str(inlined.error))
+                continue
+            usage = inlined.response.usage_metadata
+            results[custom_id] = BatchResult(
+                custom_id,
+                message=_ai_message(
+                    inlined.response.text or "",
+                    (usage.prompt_token_count or 0) if usage else 0,
+                    (usage.candidates_token_count or 0) if usage else 0,
+                    self.model_id,
+                ),
+            )
+        return results
+
+    async def cancel(self, job_id: str):
+        await self.client.aio.batches.cancel(name=job_id)
+
+
+PROVIDER_BATCH_BACKENDS = {
+    "openai": OpenAIBatchBackend,
+    "anthropic": AnthropicBatchBackend,
+    "google": GoogleBatchBackend,
+}
+
+
+class LLMBatch:
+    """Collect non-interactive requests for one model and run them as a batch."""
+
+    def __init__(
+        self,
+        model_alias: str,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+    ):
+        from app.services.llm import MODEL_ALIASES, get_provider
+
+        self.model_alias = model_alias
+        self.model_id = MODEL_ALIASES.get(model_alias, model_alias)
+        self.provider = get_provider(self.model_id)
+        self.temperature = temperature
+        self.max_tokens = max_tokens or settings.LLM_BATCH_MAX_TOKENS
+        self.requests: list[BatchRequest] = []
+
+    def add(self, input) -> str:
+        """Queue a prompt (string or messages). Returns its custom_id."""
+        from app.services.llm import to_messages
+
+        custom_id = f"req-{len(self.requests)}"
+        self.requests.append(BatchRequest(custom_id, to_messages(input)))
+        return custom_id
+
+    def _local_backend(self) -> LocalBatchBackend:
+        return LocalBatchBackend(self.model_alias, self.model_id, self.temperature, self.max_tokens)
+
+    def _backend(self) -> BatchBackend:
+        from app.services.llm import PROVIDER_API_KEYS
+
+        if (
+            settings.LLM_BATCH_MODE != "provider"
+            or settings.LLM_PROVIDER_MODE != "live"
+            or not getattr(settings, PROVIDER_API_KEYS[self.provider])
+        ):
+            return self._local_backend()
+        return PROVIDER_BATCH_BACKENDS[self.provider](self.model_id, self.temperature, self.max_tokens)
+
+    async def _execute(
+        self, backend: BatchBackend, requests: list[BatchRequest]
+    ) -> dict[str, BatchResult]:
+        """Submit, poll until finished or timed out, and collect results."""
+        job_id = await backend.submit(requests)
+        logger.info(
+            f"LLM batch {job_id} submitted: {len(requests)} requests "
+            f"({backend.name}/{self.model_id})"
+        )
+        interval = settings.LLM_BATCH_POLL_INTERVAL if backend.name != "local" else 0.1
+        deadline = time.monotonic() + settings.LLM_BATCH_TIMEOUT
+
+        while not await backend.poll(job_id):
+            if time.monotonic() > deadline:
+                logger.warning(f"LLM batch {job_id} timed out, cancelling")
+                try:
+                    await backend.cancel(job_id)
+                except Exception as e:
+                    logger.warning(f"Failed to cancel LLM batch {job_id}: {e}")
+                return {}
+            await asyncio.sleep(interval)
+
+        return await backend.results(job_id, requests)
+
+    async def run(self) -> list[BatchResult]:
+        """Run all queued requests. Results are returned in add() order."""
+        if not self.requests:
+            return []
+
+        started = time.monotonic()
+        backend = self._backend()
+        try:
+            results = await self._execute(backend, self.requests)
+        except Exception as e:
+            logger.error(f"LLM batch via {backend.name} failed: {e}")
+            results = {}
+
+        # Anything the provider batch didn't answer is retried as regular calls
+        missing = [r for r in self.requests if r.custom_id not in results or not results[r.custom_id].ok]
+        if missing and backend.name != "local":
+            logger.warning(f"LLM batch: {len(missing)} requests unanswered, running them locally")
+            local_results = await self._execute(self._local_backend(), missing)
+            results.update(local_results)
+
+        elapsed = time.monotonic() - started
+        ordered = []
+        for request in self.requests:
+            result = results.get(request.custom_id) or BatchResult(request.custom_id, error="no result")
+            if result.ok and result.message.response_metadata.get("batch"):
+                record_batch_call(self.provider, self.model_id, result.message, elapsed)
+            ordered.append(result)
+
+        failed = sum(1 for result in ordered if not result.ok)
+        logger.info(
+            f"LLM batch finished: {len(ordered) - failed}/{len(ordered)} succeeded "
+            f"in {elapsed:.1f}s ({backend.name}/{self.model_id})"
+        )
+        return ordered
+
+
+async def run_batch(
+    model_alias: str,
+    inputs: list,
+    temperature: float = 0.7,
+    max_tokens: Optional[int] = None,
+) -> list[BatchResult]:
+    """Run prompts as one batch and return their results in order."""
+    batch = LLMBatch(model_alias, temperature=temperature, max_tokens=max_tokens)
+    for input in inputs:
+        batch.add(input)
+    return await batch.run()
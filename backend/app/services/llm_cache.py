@@ -0,0 +1,207 @@
+"""Content-addressed response cache for LLM calls."""
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from loguru import logger
+
+from app.core.config import settings
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+
+CACHE_KEY_PREFIX = "llm:cache:"
+
+# Back off from Redis for this many seconds after a connection error
+REDIS_RETRY_INTERVAL = 30.0
+
+
+def make_cache_key(
+    model_id: str,
+    temperature: float,
+    messages: Sequence[BaseMessage],
+    **params,
+) -> str:
+    """Build a cache key from the resolved model id, temperature and messages.
+
+    Message content is hashed exactly as sent: whitespace can be meaningful
+    (code blocks, indented tables), so prompts that differ in it get
+    different keys.
+    """
+    payload = {
+        "model": model_id,
+        "temperature": temperature,
+        "messages": [
+            {"type": message.type, "content": message.content}
+            for message in messages
+        ],
+        "params": params,
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """In-process LRU cache with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str, ttl: int):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class LLMResponseCache:
+    """Two-level response cache: in-process LRU in front of Redis.
+
+    Redis is shared across workers. When it is unreachable the cache keeps
+    working from the local LRU and retries Redis after a short back-off.
+    """
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        max_entries: int = 1024,
+        default_ttl: int = 86400,
+    ):
+        self.redis_url = redis_url
+        self.default_ttl = default_ttl
+        self.local = LRUCache(max_entries)
+        self._redis = None
+        self._redis_down_until = 0.0
+        self.stats = {
+            "hits": 0,
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "bypassed": 0,
+            "redis_errors": 0,
+        }
+
+    def _get_redis(self):
+        if aioredis is None or not self.redis_url:
+            return None
+        if time.monotonic() < self._redis_down_until:
+            return None
+        if self._redis is None:
+            self._redis = aioredis.from_url(
+                self.redis_url,
+                socket_connect_timeout=1,
+                socket_timeout=1,
+            )
+        return self._redis
+
+    def _mark_redis_down(self, error: Exception):
+        self.stats["redis_errors"] += 1
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_INTERVAL
+        logger.warning(f"LLM cache: Redis unavailable, using in-process cache ({error})")
+
+    async def get(self, key: str) -> Optional[BaseMessage]:
+        """Return the cached response for key, or None."""
+        raw = self.local.get(key)
+        if raw is not None:
+            self.stats["hits"] += 1
+            self.stats["local_hits"] += 1
+            return self._decode(raw)
+
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                value = await redis.get(CACHE_KEY_PREFIX + key)
+            except Exception as e:
+                self._mark_redis_down(e)
+                value = None
+            if value is not None:
+                raw = value.decode("utf-8") if isinstance(value, bytes) else value
+                self.local.set(key, raw, self.default_ttl)
+                self.stats["hits"] += 1
+                self.stats["redis_hits"] += 1
+                return self._decode(raw)
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, message: BaseMessage, ttl: Optional[int] = None):
+        """Store a response under key."""
+        ttl = ttl or self.default_ttl
+        raw = json.dumps(message_to_dict(message), ensure_ascii=False)
+        self.local.set(key, raw, ttl)
+        self.stats["writes"] += 1
+
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                await redis.set(CACHE_KEY_PREFIX + key, raw, ex=ttl)
+            except Exception as e:
+                self._mark_redis_down(e)
+
+    async def invalidate(self, key: str):
+        """Remove a single entry from both levels."""
+        self.local.delete(key)
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                await redis.delete(CACHE_KEY_PREFIX + key)
+            except Exception as e:
+                self._mark_redis_down(e)
+
+    def record_bypass(self):
+        self.stats["bypassed"] += 1
+
+    def get_stats(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            "local_entries": len(self.local),
+        }
+
+    @staticmethod
+    def _decode(raw: str) -> BaseMessage:
+        return messages_from_dict([json.loads(raw)])[0]
+
+
+_response_cache: Optional[LLMResponseCache] = None
+
+
+def get_response_cache() -> LLMResponseCache:
+    """Get the process-wide LLM response cache."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = LLMResponseCache(
+            redis_url=settings.REDIS_URL,
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            default_ttl=settings.LLM_CACHE_TTL,
+        )
+    return _response_cache
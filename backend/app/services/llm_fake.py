@@ -0,0 +1,287 @@
+"""Fake LLM provider for offline runs and reproducible benchmarks.
+
+Select it with ``LLM_PROVIDER_MODE``:
+
+- ``live``: real providers (default).
+- ``record``: real providers, and every response is saved to
+  ``LLM_FAKE_RECORDINGS_PATH`` (JSON Lines) keyed by prompt hash.
+- ``fake``: no network. Recorded responses are replayed when the prompt
+  hash matches; anything else is synthesized with a log-normal
+  time-to-first-token and a fixed token rate. Fake responses never go
+  through the shared response cache.
+"""
+import asyncio
+import json
+import math
+import os
+import random
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from loguru import logger
+
+from app.core.config import settings
+from app.services.llm_cache import make_cache_key
+from app.services.prompt_budget import count_tokens
+
+
+def prompt_hash(model_id: str, temperature: float, messages: List[BaseMessage]) -> str:
+    """Key used to match recorded responses to prompts."""
+    return make_cache_key(model_id, temperature, messages)
+
+
+class ReplayStore:
+    """Recorded responses keyed by prompt hash, persisted as JSON Lines.
+
+    New recordings are buffered and appended to the file in a worker
+    thread, so recording never blocks the event loop on disk I/O. Call
+    ``flush`` (or ``close_replay_store``) on shutdown to write the rest.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.responses: dict[str, str] = {}
+        self._pending: list[tuple[str, str]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        # Files written by older versions hold a single JSON object
+        self._rewrite = False
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            text = f.read()
+        try:
+            data = json.loads(text) if text.strip() else {}
+        except json.JSONDecodeError:
+            data = None
+        if isinstance(data, dict) and "key" not in data:
+            self.responses = data
+            self._rewrite = bool(data)
+            return
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # Torn last line from an interrupted append
+                logger.warning(f"Skipping a malformed line in {self.path}")
+                continue
+            self.responses[entry["key"]] = entry["content"]
+
+    def get(self, key: str) -> Optional[str]:
+        return self.responses.get(key)
+
+    def put(self, key: str, content: str):
+        if self.responses.get(key) == content:
+            return
+        self.responses[key] = content
+        self._pending.append((key, content))
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_soon())
+
+    async def _flush_soon(self):
+        while self._pending:
+            await asyncio.to_thread(self.flush)
+
+    def flush(self):
+        """Append buffered recordings to the file."""
+        pending, self._pending = self._pending, []
+        if self._rewrite:
+            # Convert the whole file once; it already includes pending entries
+            self._rewrite = False
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for key, content in self.responses.items():
+                    f.write(json.dumps({"key": key, "content": content}, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.path)
+            return
+        if not pending:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            for key, content in pending:
+                f.write(json.dumps({"key": key, "content": content}, ensure_ascii=False) + "\n")
+
+    async def aclose(self):
+        if self._flush_task is not None:
+            await self._flush_task
+        await asyncio.to_thread(self.flush)
+
+
+_replay_store: Optional[ReplayStore] = None
+
+
+def get_replay_store() -> ReplayStore:
+    global _replay_store
+    if _replay_store is None:
+        _replay_store = ReplayStore(settings.LLM_FAKE_RECORDINGS_PATH)
+    return _replay_store
+
+
+async def close_replay_store():
+    """Write recordings still buffered in memory (on shutdown)."""
+    if _replay_store is not None:
+        await _replay_store.aclose()
+
+
+def record_response(model_id: str, temperature: float, messages: List[BaseMessage], response: BaseMessage):
+    """Save a live response for later replay (record mode)."""
+    content = response.content if isinstance(response.content, str) else response.text
+    get_replay_store().put(prompt_hash(model_id, temperature, messages), content)
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that replays recordings or synthesizes timed responses."""
+
+    model_id: str
+    temperature: float = 0.7
+    latency_median: float = 1.0
+    latency_sigma: float = 0.5
+    tokens_per_second: float = 50.0
+    output_tokens: int = 300
+    seed: Optional[int] = None
+
+    _rng: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _get_rng(self) -> random.Random:
+        if self._rng is None:
+            self._rng = random.Random(self.seed)
+        return self._rng
+
+    def _respond(self, messages: List[BaseMessage]) -> tuple[str, float, float]:
+        """Return (content, time to first token, per-token delay)."""
+        key = prompt_hash(self.model_id, self.temperature, messages)
+        content = get_replay_store().get(key)
+        if content is None:
+            content = self._synthesize(key)
+
+        rng = self._get_rng()
+        ttft = rng.lognormvariate(math.log(self.latency_median), self.latency_sigma)
+        per_token = 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        return content, ttft, per_token
+
+    def _synthesize(self, key: str) -> str:
+        words = [f"tok{int(key[i % 60:i % 60 + 4], 16) % 997}" for i in range(self.output_tokens)]
+        return f"[fake {self.model_id}] " + " ".join(words)
+
+    def _usage(self, messages: List[BaseMessage], content: str) -> dict:
+        input_tokens = sum(count_tokens(m.text, self.model_id) for m in messages)
+        output_tokens = count_tokens(content, self.model_id)
+        return {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+
+    def _result(self, messages: List[BaseMessage], content: str) -> ChatResult:
+        message = AIMessage(
+            content=content,
+            usage_metadata=self._usage(messages, content),
+            response_metadata={"model_name": self.model_id},
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        content, ttft, per_token = self._respond(messages)
+        time.sleep(ttft + per_token * count_tokens(content, self.model_id))
+        return self._result(messages, content)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        content, ttft, per_token = self._respond(messages)
+        await asyncio.sleep(ttft + per_token * count_tokens(content, self.model_id))
+        return self._result(messages, content)
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        content, ttft, per_token = self._respond(messages)
+        time.sleep(ttft)
+        for piece in _split_stream(content):
+            time.sleep(per_token)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(content="", usage_metadata=self._usage(messages, content))
+        )
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        content, ttft, per_token = self._respond(messages)
+        await asyncio.sleep(ttft)
+        for piece in _split_stream(content):
+            await asyncio.sleep(per_token)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=piece))
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(content="", usage_metadata=self._usage(messages, content))
+        )
+
+
+def _split_stream(content: str) -> list[str]:
+    """Split content into word-sized stream chunks, keeping whitespace."""
+    pieces = []
+    start = 0
+    for i, char in enumerate(content):
+        if char.isspace():
+            pieces.append(content[start:i + 1])
+            start = i + 1
+    if start < len(content):
+        pieces.append(content[start:])
+    return pieces
+
+
+_fake_models: dict[tuple[str, float], FakeChatModel] = {}
+
+
+def get_fake_model(model_id: str, temperature: float) -> FakeChatModel:
+    """Get the fake client standing in for a model."""
+    key = (model_id, temperature)
+    if key not in _fake_models:
+        if not _fake_models:
+            logger.info("LLM provider mode is 'fake': no provider requests will be made")
+        _fake_models[key] = FakeChatModel(
+            model_id=model_id,
+            temperature=temperature,
+            latency_median=settings.LLM_FAKE_LATENCY_MEDIAN,
+            latency_sigma=settings.LLM_FAKE_LATENCY_SIGMA,
+            tokens_per_second=settings.LLM_FAKE_TOKENS_PER_SECOND,
+            output_tokens=settings.LLM_FAKE_OUTPUT_TOKENS,
+            seed=settings.LLM_FAKE_SEED,
+        )
+    return _fake_models[key]
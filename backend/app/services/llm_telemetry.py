@@ -0,0 +1,309 @@
+"""LLM call telemetry: latency histograms, token usage and cost per graph node."""
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+from uuid import UUID
+
+from langgraph.config import get_config
+from loguru import logger
+from sqlalchemy import update
+
+from app.core.database import async_session_maker
+from app.models.ai_session import AISession
+
+
+# USD per 1M tokens (input, output)
+MODEL_PRICING = {
+    "gpt-5.2": (1.75, 14.0),
+    "gpt-5": (1.25, 10.0),
+    "gpt-5-mini": (0.25, 2.0),
+    "gpt-5-nano": (0.05, 0.40),
+    "gemini-3-pro-preview": (2.0, 12.0),
+    "gemini-3-flash-preview": (0.50, 3.0),
+    "claude-opus-4-5-20251124": (5.0, 25.0),
+    "claude-sonnet-4-5-20250929": (3.0, 15.0),
+    "claude-haiku-4-5-20251001": (1.0, 5.0),
+}
+
+# Provider prompt-cache reads bill at this fraction of the input price
+CACHE_READ_PRICE_FACTOR = 0.1
+
+# Provider batch APIs bill at this fraction of the synchronous price
+BATCH_PRICE_FACTOR = 0.5
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120, float("inf"))
+
+# Sessions whose breakdown was never flushed are dropped beyond this many
+MAX_TRACKED_SESSIONS = 1000
+
+_session_id: ContextVar[Optional[str]] = ContextVar("llm_session_id", default=None)
+_current_call: ContextVar[Optional["LLMCallRecord"]] = ContextVar("llm_current_call", default=None)
+
+
+@contextmanager
+def llm_session(session_id: str):
+    """Attribute LLM calls made inside this block to an AI session."""
+    token = _session_id.set(session_id)
+    try:
+        yield
+    finally:
+        _session_id.reset(token)
+
+
+def current_session_id() -> Optional[str]:
+    return _session_id.get()
+
+
+def current_node() -> Optional[str]:
+    """Name of the LangGraph node currently executing, if any."""
+    try:
+        return get_config().get("metadata", {}).get("langgraph_node")
+    except Exception:
+        return None
+
+
+def estimate_cost(
+    model_id: str,
+    input_tokens: int,
+    output_tokens: int,
+    cache_read_tokens: int = 0,
+) -> float:
+    input_price, output_price = MODEL_PRICING.get(model_id, (0.0, 0.0))
+    # input_tokens includes prompt-cache reads, which are billed at a discount
+    uncached = input_tokens - cache_read_tokens
+    cached = cache_read_tokens * CACHE_READ_PRICE_FACTOR
+    return ((uncached + cached) * input_price + output_tokens * output_price) / 1_000_000
+
+
+@dataclass
+class LLMCallRecord:
+    """One call to the LLM layer."""
+
+    provider: str
+    model: str
+    node: Optional[str]
+    session_id: Optional[str]
+    source: str = "provider"  # provider, cache, batch
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    latency: float = 0.0
+    retries: int = 0
+    error: Optional[str] = None
+    started_at: float = field(default_factory=time.monotonic)
+
+    def set_response(self, response):
+        usage = getattr(response, "usage_metadata", None) or {}
+        self.input_tokens = usage.get("input_tokens", 0) or 0
+        self.output_tokens = usage.get("output_tokens", 0) or 0
+        details = usage.get("input_token_details") or {}
+        self.cache_read_tokens = details.get("cache_read", 0) or 0
+
+    @property
+    def cost(self) -> float:
+        if self.source == "cache":
+            return 0.0
+        cost = estimate_cost(
+            self.model, self.input_tokens, self.output_tokens, self.cache_read_tokens
+        )
+        return cost * BATCH_PRICE_FACTOR if self.source == "batch" else cost
+
+
+class LatencyHistogram:
+    """Cumulative-bucket latency histogram."""
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def to_dict(self) -> dict:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            cumulative += count
+            buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "avg": round(self.total / self.count, 3) if self.count else 0.0,
+            "buckets": buckets,
+        }
+
+
+def _empty_totals() -> dict:
+    return {
+        "calls": 0,
+        "cache_hits": 0,
+        "batch_calls": 0,
+        "errors": 0,
+        "retries": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cache_read_tokens": 0,
+        "cost_usd": 0.0,
+        "latency_seconds": 0.0,
+    }
+
+
+def _add(totals: dict, record: LLMCallRecord):
+    totals["calls"] += 1
+    totals["cache_hits"] += record.source == "cache"
+    totals["batch_calls"] += record.source == "batch"
+    totals["errors"] += record.error is not None
+    totals["retries"] += record.retries
+    totals["input_tokens"] += record.input_tokens
+    totals["output_tokens"] += record.output_tokens
+    totals["cache_read_tokens"] += record.cache_read_tokens
+    totals["cost_usd"] = round(totals["cost_usd"] + record.cost, 6)
+    totals["latency_seconds"] = round(totals["latency_seconds"] + record.latency, 3)
+
+
+class TelemetryCollector:
+    """Aggregates call records per (provider, model, node) and per session."""
+
+    def __init__(self):
+        self.histograms: dict[tuple, LatencyHistogram] = {}
+        self.totals: dict[tuple, dict] = {}
+        self.sessions: OrderedDict[str, dict] = OrderedDict()
+
+    def record(self, record: LLMCallRecord):
+        key = (record.provider, record.model, record.node or "-")
+        if record.source == "provider" and record.error is None:
+            self.histograms.setdefault(key, LatencyHistogram()).observe(record.latency)
+        _add(self.totals.setdefault(key, _empty_totals()), record)
+
+        if record.session_id:
+            session = self._session(record.session_id)
+            _add(session["totals"], record)
+            node = session["nodes"].setdefault(record.node or "-", _empty_totals())
+            _add(node, record)
+            node.setdefault("models", [])
+            if record.model not in node["models"]:
+                node["models"].append(record.model)
+
+        logger.debug(
+            f"LLM call {record.provider}/{record.model} node={record.node} "
+            f"source={record.source} latency={record.latency:.2f}s "
+            f"tokens={record.input_tokens}/{record.output_tokens} retries={record.retries}"
+        )
+
+    def record_prompt_budget(self, report: dict):
+        """Attach a prompt budget report to the current session/node."""
+        session_id = current_session_id()
+        if not session_id:
+            return
+        session = self._session(session_id)
+        session["prompt_budgets"].setdefault(current_node() or "-", []).append(report)
+
+    def _session(self, session_id: str) -> dict:
+        if session_id not in self.sessions:
+            self.sessions[session_id] = {
+                "totals": _empty_totals(),
+                "nodes": {},
+                "prompt_budgets": {},
+            }
+            while len(self.sessions) > MAX_TRACKED_SESSIONS:
+                self.sessions.popitem(last=False)
+        return self.sessions[session_id]
+
+    def pop_session(self, session_id: str) -> Optional[dict]:
+        return self.sessions.pop(session_id, None)
+
+    def snapshot(self) -> dict:
+        return {
+            f"{provider}:{model}:{node}": {
+                **self.totals[(provider, model, node)],
+                "latency": self.histograms.get((provider, model, node), LatencyHistogram()).to_dict(),
+            }
+            for (provider, model, node) in self.totals
+        }
+
+
+_collector = TelemetryCollector()
+
+
+def get_telemetry() -> TelemetryCollector:
+    return _collector
+
+
+@contextmanager
+def track_llm_call(provider: str, model_id: str, source: str = "provider"):
+    """Time an LLM call and record it on exit.
+
+    The yielded record is also the current call for note_retry().
+    """
+    record = LLMCallRecord(
+        provider=provider,
+        model=model_id,
+        node=current_node(),
+        session_id=current_session_id(),
+        source=source,
+    )
+    token = _current_call.set(record)
+    try:
+        yield record
+    except BaseException as e:
+        record.error = type(e).__name__
+        raise
+    finally:
+        try:
+            _current_call.reset(token)
+        except ValueError:
+            # Async generators may be closed from a different context
+            pass
+        record.latency = time.monotonic() - record.started_at
+        _collector.record(record)
+
+
+def record_cache_hit(provider: str, model_id: str):
+    """Record a call that was answered from the response cache."""
+    with track_llm_call(provider, model_id, source="cache"):
+        pass
+
+
+def record_batch_call(provider: str, model_id: str, response, latency: float):
+    """Record one request answered by a provider batch job."""
+    record = LLMCallRecord(
+        provider=provider,
+        model=model_id,
+        node=current_node(),
+        session_id=current_session_id(),
+        source="batch",
+        latency=latency,
+    )
+    record.set_response(response)
+    _collector.record(record)
+
+
+def note_retry():
+    """Count a retry against the call currently being tracked."""
+    record = _current_call.get()
+    if record is not None:
+        record.retries += 1
+
+
+async def save_session_telemetry(session_id: str):
+    """Write the session's LLM usage breakdown into AISession.output_data."""
+    breakdown = _collector.pop_session(session_id)
+    if not breakdown:
+        return
+
+    async with async_session_maker() as db:
+        await db.execute(
+            update(AISession)
+            .where(AISession.id == UUID(session_id))
+            .values(output_data=AISession.merged_output_data({"telemetry": breakdown}))
+        )
+        await db.commit()
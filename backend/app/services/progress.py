@@ -0,0 +1,252 @@
+"""Push-based progress for running AI sessions.
+
+Graph nodes publish progress events instead of writing them to Postgres.
+Events go to the Redis channel ``ai:progress:{session_id}`` (and the
+latest snapshot to a short-lived key), so any web process can stream them
+to the browser; without Redis they are delivered in-process. Postgres only
+receives a coalesced write every PROGRESS_FLUSH_INTERVAL seconds, plus the
+last snapshot of a run that didn't complete.
+"""
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Optional
+from uuid import UUID
+
+from loguru import logger
+from sqlalchemy import case, select, update
+
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.ai_session import AISession
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+
+CHANNEL_PREFIX = "ai:progress:"
+SNAPSHOT_PREFIX = "ai:progress:last:"
+TERMINAL_STATUSES = ("completed", "failed", "cancelled")
+
+# Back off from Redis for this many seconds after a connection error
+REDIS_RETRY_INTERVAL = 30.0
+
+
+class ProgressBroker:
+    """Publishes session progress and fans it out to subscribers."""
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis_url = redis_url
+        self._redis = None
+        self._redis_down_until = 0.0
+        # Progress of the sessions running in this process
+        self._snapshots: dict[str, dict] = {}
+        # In-process subscribers, used while Redis is unavailable
+        self._subscribers: dict[str, set[asyncio.Queue]] = {}
+        self._flush_tasks: dict[str, asyncio.Task] = {}
+        self.stats = {
+            "published": 0,
+            "db_writes": 0,
+            "redis_errors": 0,
+        }
+
+    def _get_redis(self):
+        if aioredis is None or not self.redis_url:
+            return None
+        if time.monotonic() < self._redis_down_until:
+            return None
+        if self._redis is None:
+            self._redis = aioredis.from_url(
+                self.redis_url,
+                socket_connect_timeout=1,
+            )
+        return self._redis
+
+    def _mark_redis_down(self, error: Exception):
+        self.stats["redis_errors"] += 1
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_INTERVAL
+        logger.warning(f"Progress: Redis unavailable, delivering in-process ({error})")
+
+    def current(self, session_id: str) -> dict:
+        """Latest progress published by this process for the session."""
+        return dict(self._snapshots.get(session_id, {}))
+
+    async def publish(self, session_id: str, progress: dict):
+        """Replace the session's progress and push it to subscribers."""
+        self._snapshots[session_id] = progress
+        self.stats["published"] += 1
+        await self._broadcast(session_id, {"status": "processing", "progress": progress})
+        if session_id not in self._flush_tasks:
+            self._flush_tasks[session_id] = asyncio.create_task(self._flush_later(session_id))
+
+    async def finish(self, session_id: str, retrying: bool = False):
+        """Announce the session's final status once its run has ended.
+
+        A failed attempt that the job queue will run again is announced as
+        ``retrying``, which subscribers don't treat as the end of the session.
+        """
+        task = self._flush_tasks.pop(session_id, None)
+        if task is not None:
+            task.cancel()
+        progress = self._snapshots.pop(session_id, None)
+        if retrying:
+            await self.announce(session_id, "retrying")
+            return
+
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(AISession.status).where(AISession.id == UUID(session_id))
+            )
+            status = result.scalar_one_or_none()
+
+        # Completed sessions have their result saved; keep the last progress otherwise
+        if progress and status != "completed":
+            await self._write(session_id, progress)
+        await self.announce(session_id, status or "failed")
+
+    async def announce(self, session_id: str, status: str):
+        """Push a status change (e.g. cancelled) to subscribers."""
+        await self._broadcast(session_id, {"status": status})
+
+    async def _broadcast(self, session_id: str, event: dict):
+        raw = json.dumps(event, ensure_ascii=False, default=str)
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                await redis.publish(CHANNEL_PREFIX + session_id, raw)
+                if "progress" in event:
+                    await redis.set(
+                        SNAPSHOT_PREFIX + session_id,
+                        json.dumps(event["progress"], ensure_ascii=False, default=str),
+                        ex=settings.PROGRESS_SNAPSHOT_TTL,
+                    )
+            except Exception as e:
+                self._mark_redis_down(e)
+        for queue in self._subscribers.get(session_id, ()):
+            queue.put_nowait(event)
+
+    async def _flush_later(self, session_id: str):
+        """Coalesce the progress published during one interval into a DB write."""
+        await asyncio.sleep(settings.PROGRESS_FLUSH_INTERVAL)
+        self._flush_tasks.pop(session_id, None)
+        progress = self._snapshots.get(session_id)
+        if progress is not None:
+            await self._write(session_id, progress)
+
+    async def _write(self, session_id: str, progress: dict):
+        try:
+            async with async_session_maker() as db:
+                # A completed session's result replaces its progress
+                await db.execute(
+                    update(AISession)
+                    .where(AISession.id == UUID(session_id), AISession.status != "completed")
+                    .values(
+                        status=case(
+                            (AISession.status == "pending", "processing"),
+                            else_=AISession.status,
+                        ),
+                        output_data=AISession.merged_output_data({"progress": progress}),
+                    )
+                )
+                await db.commit()
+                self.stats["db_writes"] += 1
+        except Exception as e:
+            logger.warning(f"Progress: failed to save progress of session {session_id}: {e}")
+
+    async def latest(self, session_id: str) -> Optional[dict]:
+        """Latest live progress from this process or Redis, if any."""
+        if session_id in self._snapshots:
+            return self.current(session_id)
+        redis = self._get_redis()
+        if redis is not None:
+            try:
+                value = await redis.get(SNAPSHOT_PREFIX + session_id)
+            except Exception as e:
+                self._mark_redis_down(e)
+                value = None
+            if value is not None:
+                return json.loads(value)
+        return None
+
+    async def subscribe(self, session_id: str) -> AsyncIterator[Optional[dict]]:
+        """Yield the session's events as they are published.
+
+        Yields None every PROGRESS_HEARTBEAT_INTERVAL seconds without events,
+        so callers can keep idle connections alive.
+        """
+        timeout = settings.PROGRESS_HEARTBEAT_INTERVAL
+        redis = self._get_redis()
+        pubsub = None
+        if redis is not None:
+            try:
+                pubsub = redis.pubsub()
+                await pubsub.subscribe(CHANNEL_PREFIX + session_id)
+            except Exception as e:
+                self._mark_redis_down(e)
+                pubsub = None
+
+        if pubsub is not None:
+            try:
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+                    yield json.loads(message["data"]) if message else None
+            finally:
+                await pubsub.aclose()
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(session_id, set()).add(queue)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            self._subscribers[session_id].discard(queue)
+            if not self._subscribers[session_id]:
+                del self._subscribers[session_id]
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "running_sessions": len(self._snapshots),
+            "local_subscribers": sum(len(queues) for queues in self._subscribers.values()),
+        }
+
+
+_broker: Optional[ProgressBroker] = None
+
+
+def get_progress_broker() -> ProgressBroker:
+    """Get the progress broker singleton."""
+    global _broker
+    if _broker is None:
+        _broker = ProgressBroker(redis_url=settings.REDIS_URL)
+    return _broker
+
+
+def current_progress(session_id: str) -> dict:
+    return get_progress_broker().current(session_id)
+
+
+async def publish_progress(session_id: str, progress: dict):
+    await get_progress_broker().publish(session_id, progress)
+
+
+async def finish_progress(session_id: str, retrying: bool = False):
+    try:
+        await get_progress_broker().finish(session_id, retrying)
+    except Exception as e:
+        logger.warning(f"Progress: failed to finish session {session_id}: {e}")
+
+
+async def read_progress(session: AISession) -> dict:
+    """Live progress of a session, falling back to the last saved snapshot."""
+    if session.status not in TERMINAL_STATUSES:
+        live = await get_progress_broker().latest(str(session.id))
+        if live is not None:
+            return live
+    return session.output_data.get("progress", {}) if session.output_data else {}
@@ -0,0 +1,185 @@
+"""Token-aware prompt budgeting.
+
+Graphs used to cut context by characters (``resume[:3000]``), which wastes
+context for English and overflows it for Korean. ``PromptBudget`` counts
+tokens per model family, splits a token budget across prompt sections by
+priority and trims each section at paragraph/sentence boundaries.
+
+OpenAI models are counted exactly with tiktoken (the Docker image bakes in
+its encoding). Other families, and hosts where the encoding can't be
+loaded, use per-script ratio estimates.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+from loguru import logger
+
+from app.services.llm_telemetry import get_telemetry
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+# Approximate tokens per character for families without a local tokenizer,
+# split by script since Hangul costs far more per character than Latin text.
+FAMILY_TOKEN_RATIOS = {
+    # family: (hangul/cjk, other)
+    "openai": (0.75, 0.25),
+    "anthropic": (1.0, 0.3),
+    "google": (0.6, 0.25),
+}
+
+_CJK_PATTERN = re.compile(r"[\u1100-\u11ff\u3130-\u318f\uac00-\ud7a3\u4e00-\u9fff\u3040-\u30ff]")
+_SENTENCE_END = re.compile(r"(?<=[.!?。！？])\s+|\n")
+
+_encoder = None
+_encoder_failed = False
+
+
+def get_model_family(model_id: str) -> str:
+    """Tokenizer family for a resolved model id."""
+    if model_id.startswith("claude"):
+        return "anthropic"
+    if model_id.startswith("gemini"):
+        return "google"
+    return "openai"
+
+
+def _get_encoder():
+    """Load the OpenAI tokenizer once; fall back to estimates if unavailable."""
+    global _encoder, _encoder_failed
+    if _encoder is None and not _encoder_failed and tiktoken is not None:
+        try:
+            _encoder = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            _encoder_failed = True
+            logger.warning(f"tiktoken encoding unavailable, estimating token counts: {e}")
+    return _encoder
+
+
+def count_tokens(text: str, model_id: str = "gpt-5-mini") -> int:
+    """Count (or estimate) the tokens text will use for the given model."""
+    if not text:
+        return 0
+    family = get_model_family(model_id)
+    if family == "openai":
+        encoder = _get_encoder()
+        if encoder is not None:
+            return len(encoder.encode(text, disallowed_special=()))
+
+    cjk_ratio, other_ratio = FAMILY_TOKEN_RATIOS[family]
+    cjk = len(_CJK_PATTERN.findall(text))
+    return int(cjk * cjk_ratio + (len(text) - cjk) * other_ratio) + 1
+
+
+def _split_paragraphs(text: str) -> list[str]:
+    """Split text into non-empty paragraphs."""
+    return [p for p in re.split(r"\n\s*\n", text) if p.strip()]
+
+
+def trim_to_tokens(text: str, max_tokens: int, model_id: str = "gpt-5-mini") -> str:
+    """Trim text to at most max_tokens, cutting at paragraph then sentence boundaries."""
+    if not text or max_tokens <= 0:
+        return ""
+    if count_tokens(text, model_id) <= max_tokens:
+        return text
+
+    kept: list[str] = []
+    used = 0
+    separator_cost = count_tokens("\n\n", model_id)
+
+    for paragraph in _split_paragraphs(text):
+        cost = count_tokens(paragraph, model_id) + (separator_cost if kept else 0)
+        if used + cost <= max_tokens:
+            kept.append(paragraph)
+            used += cost
+            continue
+
+        # Paragraph doesn't fit whole: take as many sentences as we can
+        sentences = [s for s in _SENTENCE_END.split(paragraph) if s and s.strip()]
+        partial: list[str] = []
+        remaining = max_tokens - used - (separator_cost if kept else 0)
+        for sentence in sentences:
+            sentence_cost = count_tokens(sentence, model_id) + 1
+            if sentence_cost > remaining:
+                break
+            partial.append(sentence.strip())
+            remaining -= sentence_cost
+        if partial:
+            kept.append(" ".join(partial))
+        elif not kept:
+            # A single huge sentence: fall back to a proportional character cut
+            ratio = max_tokens / count_tokens(paragraph, model_id)
+            kept.append(paragraph[: max(1, int(len(paragraph) * ratio * 0.95))])
+        break
+
+    return "\n\n".join(kept)
+
+
+@dataclass
+class _Section:
+    name: str
+    text: str
+    priority: int
+    max_tokens: Optional[int]
+    tokens: int = 0
+
+
+@dataclass
+class PromptBudget:
+    """Allocate a token budget across prompt sections by priority.
+
+    Higher-priority sections are filled first (up to their own cap); lower
+    priority sections get whatever remains and are trimmed at paragraph or
+    sentence boundaries.
+
+    Usage::
+
+        budget = PromptBudget("claude-sonnet-4-5-20250929", total_tokens=6000)
+        budget.add("resume", resume, priority=3, max_tokens=2500)
+        budget.add("portfolio", portfolio, priority=2)
+        sections = budget.allocate()
+    """
+
+    model_id: str
+    total_tokens: int
+    sections: list[_Section] = field(default_factory=list)
+    report: dict = field(default_factory=dict)
+
+    def add(
+        self,
+        name: str,
+        text: Optional[str],
+        priority: int = 1,
+        max_tokens: Optional[int] = None,
+    ) -> "PromptBudget":
+        self.sections.append(_Section(name, text or "", priority, max_tokens))
+        return self
+
+    def allocate(self) -> dict[str, str]:
+        """Return the trimmed text for each section, keyed by name."""
+        remaining = self.total_tokens
+        result: dict[str, str] = {}
+        report: dict[str, dict] = {}
+
+        for section in sorted(self.sections, key=lambda s: -s.priority):
+            original = count_tokens(section.text, self.model_id)
+            cap = remaining if section.max_tokens is None else min(remaining, section.max_tokens)
+            trimmed = section.text if original <= cap else trim_to_tokens(section.text, cap, self.model_id)
+            section.tokens = count_tokens(trimmed, self.model_id)
+            remaining -= section.tokens
+            result[section.name] = trimmed
+            report[section.name] = {"tokens": section.tokens, "original_tokens": original}
+
+        self.report = {
+            "model": self.model_id,
+            "budget": self.total_tokens,
+            "used": self.total_tokens - remaining,
+            "sections": report,
+        }
+        logger.debug(f"Prompt budget: {self.report}")
+        get_telemetry().record_prompt_budget(self.report)
+        return result
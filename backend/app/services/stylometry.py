@@ -0,0 +1,273 @@
+"""Cheap local writing-style similarity.
+
+Compares a text against a user's reference writing (e.g. their existing
+cover letters) without an LLM call. Texts become fixed-size NumPy vectors:
+
+- hashed character 1-3-gram counts (vocabulary, spacing, Korean endings),
+- function word and particle frequencies,
+- surface features: sentence and word length, punctuation, formal, polite
+  or plain sentence endings.
+
+Each reference gets a ``style_fingerprint`` when its document digest is
+built at upload, and a user's profile is combined from the stored
+fingerprints, so scoring a draft costs a few vector operations and never
+needs the references' text. Scores are calibrated against the references
+themselves: ``relative_similarity`` is 1.0 when a text is as close to the
+profile as the user's own letters are to each other.
+"""
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+NGRAM_DIMENSIONS = 1 << 14
+NGRAM_SIZES = (1, 2, 3)
+_NGRAM_MULTIPLIERS = (np.uint64(1_000_003), np.uint64(998_244_353))
+
+FUNCTION_WORDS = (
+    "은", "는", "이", "가", "을", "를", "에", "에서", "으로", "로", "와", "과", "의", "도", "만",
+    "그리고", "하지만", "그러나", "또한", "따라서", "그래서", "특히", "즉",
+    "때문에", "통해", "위해", "대한", "같은", "있는", "하는", "되는", "했던",
+    "저는", "제가", "저의", "저희",
+)
+_FUNCTION_WORD_INDEX = {word: i for i, word in enumerate(FUNCTION_WORDS)}
+_PARTICLE_INDEX = {word: i for i, word in enumerate(FUNCTION_WORDS) if len(word) == 1}
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?。])\s+|\n+")
+FORMAL_ENDINGS = ("습니다", "습니까", "니다")
+POLITE_ENDINGS = ("요",)
+PLAIN_ENDINGS = ("다",)
+
+# Component weights: character n-grams, function words, surface features
+WEIGHTS = np.array([0.5, 0.3, 0.2])
+
+PROFILE_CACHE_SIZE = 256
+
+
+@dataclass
+class StyleVector:
+    ngrams: np.ndarray  # L2-normalized
+    function_words: np.ndarray  # L2-normalized
+    surface: np.ndarray  # each feature roughly in [0, 1]
+
+
+@dataclass
+class StyleProfile:
+    centroid: StyleVector
+    # Similarity of the user's own letters to their profile (calibration)
+    baseline: float
+
+
+def _ngram_counts(text: str) -> np.ndarray:
+    compact = re.sub(r"\s+", " ", text)
+    codes = np.frombuffer(compact.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    hashes = []
+    for size in NGRAM_SIZES:
+        if len(codes) < size:
+            continue
+        h = codes[: len(codes) - size + 1].copy()
+        for offset in range(1, size):
+            h = h * _NGRAM_MULTIPLIERS[offset - 1] + codes[offset: len(codes) - size + 1 + offset]
+        hashes.append((h + np.uint64(size)) % np.uint64(NGRAM_DIMENSIONS))
+    if not hashes:
+        return np.zeros(NGRAM_DIMENSIONS)
+    return np.bincount(np.concatenate(hashes).astype(np.int64), minlength=NGRAM_DIMENSIONS).astype(float)
+
+
+def _function_word_counts(text: str) -> np.ndarray:
+    words = text.split()
+    counts = np.zeros(len(FUNCTION_WORDS))
+    for word in words:
+        # Whole words, or particles/endings attached to the end of a word
+        index = _FUNCTION_WORD_INDEX.get(word)
+        if index is None:
+            index = _PARTICLE_INDEX.get(word.rstrip(".,!?")[-1:])
+        if index is not None:
+            counts[index] += 1
+    return counts / max(len(words), 1)
+
+
+def _surface(text: str) -> np.ndarray:
+    sentences = [s.strip() for s in SENTENCE_SPLIT.split(text) if s.strip()] or [text]
+    lengths = np.array([len(s) for s in sentences], dtype=float)
+    words = np.array([len(w) for w in text.split()] or [0], dtype=float)
+    stripped = [s.rstrip(".!?。 ") for s in sentences]
+    endings = np.array([
+        [s.endswith(FORMAL_ENDINGS), s.endswith(POLITE_ENDINGS), s.endswith(PLAIN_ENDINGS)]
+        for s in stripped
+    ], dtype=float).mean(axis=0)
+    chars = max(len(text), 1)
+    features = np.array([
+        lengths.mean() / 100,
+        lengths.std() / 100,
+        words.mean() / 10,
+        text.count(",") / chars * 20,
+        sum(text.count(p) for p in "!?") / chars * 50,
+        endings[0],
+        endings[1],
+        max(endings[2] - endings[0], 0.0),
+    ])
+    return np.clip(features, 0.0, 1.0)
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def vectorize(text: str) -> StyleVector:
+    return StyleVector(
+        ngrams=_normalize(_ngram_counts(text)),
+        function_words=_normalize(_function_word_counts(text)),
+        surface=_surface(text),
+    )
+
+
+def _centroid(vectors: Sequence[StyleVector]) -> StyleVector:
+    return StyleVector(
+        ngrams=_normalize(np.sum([v.ngrams for v in vectors], axis=0)),
+        function_words=_normalize(np.sum([v.function_words for v in vectors], axis=0)),
+        surface=np.mean([v.surface for v in vectors], axis=0),
+    )
+
+
+def _similarity(vector: StyleVector, centroid: StyleVector) -> float:
+    surface_distance = np.linalg.norm(vector.surface - centroid.surface) / np.sqrt(len(vector.surface))
+    components = np.array([
+        vector.ngrams @ centroid.ngrams,
+        vector.function_words @ centroid.function_words,
+        1.0 - surface_distance,
+    ])
+    return float(WEIGHTS @ components)
+
+
+def _split_halves(text: str) -> List[str]:
+    sentences = [s for s in SENTENCE_SPLIT.split(text) if s.strip()]
+    middle = len(sentences) // 2
+    halves = [" ".join(sentences[:middle]), " ".join(sentences[middle:])]
+    return [half for half in halves if half]
+
+
+def _leave_one_out(vectors: Sequence[StyleVector]) -> Optional[float]:
+    """Mean similarity of each vector to the centroid of the others."""
+    if len(vectors) < 2:
+        return None
+    return float(np.mean([
+        _similarity(vector, _centroid(vectors[:i] + vectors[i + 1:]))
+        for i, vector in enumerate(vectors)
+    ]))
+
+
+def style_fingerprint(text: str) -> dict:
+    """JSON-serializable style vector of a reference text.
+
+    Stored with the document's digest. ``baseline`` is the similarity of
+    the text's two halves, the calibration used when it is a user's only
+    reference.
+    """
+    counts = _ngram_counts(text)
+    index = np.flatnonzero(counts)
+    return {
+        "ngram_index": index.tolist(),
+        "ngram_count": counts[index].astype(int).tolist(),
+        "function_words": _normalize(_function_word_counts(text)).tolist(),
+        "surface": _surface(text).tolist(),
+        "baseline": _leave_one_out([vectorize(half) for half in _split_halves(text)]),
+    }
+
+
+def _from_fingerprint(fingerprint: dict) -> StyleVector:
+    counts = np.zeros(NGRAM_DIMENSIONS)
+    counts[np.asarray(fingerprint["ngram_index"], dtype=np.int64)] = fingerprint["ngram_count"]
+    return StyleVector(
+        ngrams=_normalize(counts),
+        function_words=np.asarray(fingerprint["function_words"], dtype=float),
+        surface=np.asarray(fingerprint["surface"], dtype=float),
+    )
+
+
+def profile_from_fingerprints(fingerprints: Sequence[dict]) -> Optional[StyleProfile]:
+    """Style profile of a user's references from their stored fingerprints.
+
+    The baseline is the leave-one-out similarity of each reference to the
+    others (the two halves of a single reference when there is only one).
+    """
+    if not fingerprints:
+        return None
+    vectors = [_from_fingerprint(fingerprint) for fingerprint in fingerprints]
+    baseline = _leave_one_out(vectors) if len(vectors) > 1 else fingerprints[0].get("baseline")
+    return StyleProfile(centroid=_centroid(vectors), baseline=max(baseline or 1.0, 1e-6))
+
+
+def style_profile(texts: Sequence[str]) -> StyleProfile:
+    """Style profile of reference texts (see ``profile_from_fingerprints``)."""
+    texts = [text for text in texts if text.strip()]
+    return profile_from_fingerprints([style_fingerprint(text) for text in texts]) or StyleProfile(
+        centroid=vectorize(""), baseline=1.0,
+    )
+
+
+def style_similarity(text: str, profile: StyleProfile) -> float:
+    """Raw similarity of text to the profile, from 0 to 1."""
+    return _similarity(vectorize(text), profile.centroid)
+
+
+def relative_similarity(text: str, profile: StyleProfile) -> float:
+    """Similarity relative to the user's own letters (1.0 = as close as they are)."""
+    return style_similarity(text, profile) / profile.baseline
+
+
+def rank_by_profile(candidates: Sequence[str], profile: StyleProfile) -> List[tuple[int, float]]:
+    """Candidate indices with their style scores, most similar first."""
+    scores = [(i, style_similarity(text, profile)) for i, text in enumerate(candidates)]
+    return sorted(scores, key=lambda item: item[1], reverse=True)
+
+
+def style_feedback(text: str, profile: StyleProfile) -> str:
+    """Revision hints from the largest surface-feature differences."""
+    surface = _surface(text)
+    reference = profile.centroid.surface
+    hints = []
+    if surface[0] > reference[0] * 1.3:
+        hints.append("기존 자기소개서보다 문장이 깁니다. 문장을 더 짧게 나눠주세요.")
+    elif surface[0] < reference[0] * 0.7:
+        hints.append("기존 자기소개서보다 문장이 짧습니다. 문장을 자연스럽게 이어주세요.")
+    if reference[5] >= 0.5 and surface[5] < reference[5] - 0.2:
+        hints.append("기존 자기소개서처럼 '~습니다' 체로 작성해주세요.")
+    elif reference[7] >= 0.5 and surface[7] < reference[7] - 0.2:
+        hints.append("기존 자기소개서처럼 '~다' 체로 작성해주세요.")
+    if abs(surface[3] - reference[3]) > 0.3:
+        hints.append("쉼표 사용 빈도를 기존 자기소개서와 비슷하게 맞춰주세요.")
+    hints.append("기존 자기소개서의 어휘와 표현 방식을 더 많이 참고해주세요.")
+    return " ".join(hints)
+
+
+def tone_features(text: str) -> dict:
+    """Readable summary of a text's surface style, for prompts."""
+    surface = _surface(text)
+    endings = {"formal": surface[5], "polite": surface[6], "plain": surface[7]}
+    return {
+        "sentence_length": round(float(surface[0]) * 100),
+        "word_length": round(float(surface[2]) * 10, 1),
+        "ending": max(endings, key=endings.get) if max(endings.values()) > 0 else "mixed",
+        "comma_rate": round(float(surface[3]), 2),
+        "exclamation_rate": round(float(surface[4]), 2),
+    }
+
+
+_profiles: "OrderedDict[str, StyleProfile]" = OrderedDict()
+
+
+def cached_profile(key: str) -> Optional[StyleProfile]:
+    """Profile stored under key by ``cache_profile``, if still cached."""
+    profile = _profiles.get(key)
+    if profile is not None:
+        _profiles.move_to_end(key)
+    return profile
+
+
+def cache_profile(key: str, profile: StyleProfile):
+    _profiles[key] = profile
+    if len(_profiles) > PROFILE_CACHE_SIZE:
+        _profiles.popitem(last=False)
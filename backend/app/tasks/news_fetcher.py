@@ -11,6 +11,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import async_session_maker
 from app.core.config import settings
 from app.models.economy import NewsArticle
+from app.services.prompt_budget import trim_to_tokens
+
+SUMMARY_MODEL = "gemini-3-flash-preview"
+SUMMARY_TEMPERATURE = 0.3
+ARTICLE_CONTENT_TOKENS = 600
 
 # RSS Feed sources categorized by topic
 RSS_FEEDS = {
@@ -70,27 +75,14 @@ async def fetch_rss_feed(url: str, source: str, category: str) -> list[dict]:
     return articles
 
 
-async def summarize_and_analyze(article: dict) -> dict:
-    """Use AI to summarize article and analyze sentiment."""
-    try:
-        from langchain_google_genai import ChatGoogleGenerativeAI
-
-        if not settings.GOOGLE_API_KEY:
-            # Fallback: use first 200 chars as summary
-            article["summary"] = article.get("original_content", "")[:200] + "..."
-            article["sentiment"] = "neutral"
-            return article
-
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-3-flash-preview",
-            google_api_key=settings.GOOGLE_API_KEY,
-            temperature=0.3,
-        )
+def build_summary_prompt(article: dict) -> str:
+    """Prompt asking for a short summary and sentiment of an article."""
+    content = trim_to_tokens(
+        article.get("original_content", ""), ARTICLE_CONTENT_TOKENS, SUMMARY_MODEL
+    )
+    title = article.get("title", "")
 
-        content = article.get("original_content", "")[:1000]
-        title = article.get("title", "")
-
-        prompt = f"""다음 뉴스 기사를 분석해주세요.
+    return f"""다음 뉴스 기사를 분석해주세요.
 
 제목: {title}
 내용: {content}
@@ -99,35 +91,84 @@ async def summarize_and_analyze(article: dict) -> dict:
 요약: (2-3문장으로 핵심 내용 요약)
 감정: (positive/negative/neutral 중 하나)"""
 
-        response = await asyncio.to_thread(llm.invoke, prompt)
-        result = response.content
-
-        # Parse response
-        lines = result.strip().split("\n")
-        summary = ""
-        sentiment = "neutral"
-
-        for line in lines:
-            if line.startswith("요약:"):
-                summary = line.replace("요약:", "").strip()
-            elif line.startswith("감정:"):
-                sentiment_text = line.replace("감정:", "").strip().lower()
-                if "positive" in sentiment_text or "긍정" in sentiment_text:
-                    sentiment = "positive"
-                elif "negative" in sentiment_text or "부정" in sentiment_text:
-                    sentiment = "negative"
-                else:
-                    sentiment = "neutral"
 
-        article["summary"] = summary or content[:200] + "..."
-        article["sentiment"] = sentiment
+def apply_fallback_summary(article: dict) -> dict:
+    """Use the start of the feed content when no AI summary is available."""
+    article["summary"] = article.get("original_content", "")[:200] + "..."
+    article["sentiment"] = "neutral"
+    return article
+
+
+def apply_analysis(article: dict, result: str) -> dict:
+    """Parse a summary/sentiment response into the article."""
+    lines = result.strip().split("\n")
+    summary = ""
+    sentiment = "neutral"
+
+    for line in lines:
+        if line.startswith("요약:"):
+            summary = line.replace("요약:", "").strip()
+        elif line.startswith("감정:"):
+            sentiment_text = line.replace("감정:", "").strip().lower()
+            if "positive" in sentiment_text or "긍정" in sentiment_text:
+                sentiment = "positive"
+            elif "negative" in sentiment_text or "부정" in sentiment_text:
+                sentiment = "negative"
+            else:
+                sentiment = "neutral"
+
+    article["summary"] = summary or article.get("original_content", "")[:200] + "..."
+    article["sentiment"] = sentiment
+    return article
+
+
+def can_summarize() -> bool:
+    return bool(settings.GOOGLE_API_KEY) or settings.LLM_PROVIDER_MODE == "fake"
+
+
+async def summarize_and_analyze(article: dict) -> dict:
+    """Use AI to summarize article and analyze sentiment."""
+    if not can_summarize():
+        return apply_fallback_summary(article)
+
+    try:
+        from app.services.llm import get_model
+
+        llm = get_model(SUMMARY_MODEL, temperature=SUMMARY_TEMPERATURE)
+        response = await llm.ainvoke(build_summary_prompt(article))
+        return apply_analysis(article, response.text)
 
     except Exception as e:
         logger.error(f"Failed to analyze article: {e}")
-        article["summary"] = article.get("original_content", "")[:200] + "..."
-        article["sentiment"] = "neutral"
+        return apply_fallback_summary(article)
 
-    return article
+
+async def summarize_articles(articles: list[dict]) -> list[dict]:
+    """Summarize many articles in one provider batch job."""
+    if not articles:
+        return articles
+    if not can_summarize():
+        return [apply_fallback_summary(article) for article in articles]
+
+    from app.services.llm_batch import run_batch
+
+    try:
+        results = await run_batch(
+            SUMMARY_MODEL,
+            [build_summary_prompt(article) for article in articles],
+            temperature=SUMMARY_TEMPERATURE,
+        )
+    except Exception as e:
+        logger.error(f"Failed to batch-summarize articles: {e}")
+        return [apply_fallback_summary(article) for article in articles]
+
+    for article, result in zip(articles, results):
+        if result.ok:
+            apply_analysis(article, result.message.text)
+        else:
+            logger.error(f"Failed to analyze article: {result.error}")
+            apply_fallback_summary(article)
+    return articles
 
 
 async def store_article(db: AsyncSession, article: dict) -> Optional[NewsArticle]:
@@ -190,14 +231,30 @@ async def fetch_and_store_news() -> dict:
 
     logger.info(f"Fetched {stats['fetched']} articles from RSS feeds")
 
-    # Process and store articles
+    # Only summarize articles we haven't stored yet
     async with async_session_maker() as db:
-        for article in all_articles:
-            try:
-                # Analyze with AI
-                analyzed = await summarize_and_analyze(article)
+        result = await db.execute(
+            select(NewsArticle.url).where(
+                NewsArticle.url.in_([a["url"] for a in all_articles])
+            )
+        )
+        known_urls = set(result.scalars().all())
 
-                # Store in database
+    new_articles = []
+    for article in all_articles:
+        if article["url"] in known_urls:
+            stats["skipped"] += 1
+            continue
+        known_urls.add(article["url"])
+        new_articles.append(article)
+
+    # Summaries aren't latency sensitive, so they go through the batch API
+    analyzed_articles = await summarize_articles(new_articles)
+
+    # Store articles
+    async with async_session_maker() as db:
+        for analyzed in analyzed_articles:
+            try:
                 stored = await store_article(db, analyzed)
 
                 if stored:
@@ -0,0 +1,99 @@
+"""AI session worker process.
+
+Claims jobs from the Postgres job queue and runs their graphs, so long LLM
+workflows don't compete with request handling in the web process.
+
+    JOB_QUEUE_BACKEND=postgres python -m app.worker
+"""
+import asyncio
+import signal
+
+from loguru import logger
+
+from app.core.config import settings
+from app.core.database import init_db
+from app.graphs.checkpoint import close_checkpointer, open_checkpointer
+from app.graphs.registry import compile_graphs
+from app.services.job_queue import (
+    Job,
+    PostgresJobQueue,
+    execute_job,
+    make_worker_id,
+)
+from app.services.llm_fake import close_replay_store
+
+
+async def heartbeat(queue: PostgresJobQueue, job: Job, worker_id: str):
+    """Keep the job claimed while its graph runs."""
+    interval = max(settings.JOB_VISIBILITY_TIMEOUT / 3, 1)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await queue.heartbeat(job, worker_id)
+        except Exception as e:
+            logger.warning(f"Heartbeat failed for job {job.id}: {e}")
+
+
+async def process_job(queue: PostgresJobQueue, job: Job, worker_id: str):
+    logger.info(f"Running job {job.ai_type}/{job.session_id} (attempt {job.attempts}/{job.max_attempts})")
+    beat = asyncio.create_task(heartbeat(queue, job, worker_id))
+    try:
+        error = await execute_job(job)
+    except Exception as e:
+        error = str(e)
+    finally:
+        beat.cancel()
+
+    if error is not None:
+        logger.warning(f"Job {job.ai_type}/{job.session_id} attempt {job.attempts} failed: {error}")
+    await queue.finish(job, error)
+
+
+async def run_worker():
+    worker_id = make_worker_id()
+    queue = PostgresJobQueue()
+    stopping = asyncio.Event()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    await init_db()
+    checkpointer = await open_checkpointer()
+    compile_graphs(checkpointer)
+    logger.info(f"Worker {worker_id} started (concurrency {settings.WORKER_CONCURRENCY})")
+
+    running: set[asyncio.Task] = set()
+    while not stopping.is_set():
+        free = settings.WORKER_CONCURRENCY - len(running)
+        jobs = []
+        if free > 0:
+            try:
+                jobs = await queue.claim(worker_id, free)
+            except Exception as e:
+                logger.error(f"Failed to claim jobs: {e}")
+
+        for job in jobs:
+            task = asyncio.create_task(process_job(queue, job, worker_id))
+            running.add(task)
+            task.add_done_callback(running.discard)
+
+        if not jobs:
+            # Idle or full: wait for a slot, new jobs, or shutdown
+            try:
+                await asyncio.wait_for(stopping.wait(), timeout=settings.JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+
+    # Let claimed jobs finish; anything cut off is retried after its visibility timeout
+    if running:
+        logger.info(f"Worker {worker_id} stopping, waiting for {len(running)} jobs")
+        await asyncio.gather(*running, return_exceptions=True)
+
+    await close_checkpointer()
+    await close_replay_store()
+    logger.info(f"Worker {worker_id} stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
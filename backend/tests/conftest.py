@@ -0,0 +1,20 @@
+import os
+
+# Keep tests off real services: no Redis, no provider calls, no SQL echo
+os.environ.setdefault("REDIS_URL", "")
+os.environ.setdefault("DEBUG", "false")
+os.environ.setdefault("LLM_PROVIDER_MODE", "live")
+os.environ.setdefault("GRAPH_CHECKPOINTING_ENABLED", "false")
+
+import pytest
+
+from app.core.config import settings
+
+
+@pytest.fixture
+def override_settings(monkeypatch):
+    """Temporarily override settings attributes: override_settings(NAME=value)."""
+    def apply(**values):
+        for name, value in values.items():
+            monkeypatch.setattr(settings, name, value)
+    return apply
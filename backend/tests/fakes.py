@@ -0,0 +1,66 @@
+"""In-memory stand-ins for the database session used by services and graphs."""
+from typing import Optional
+
+
+class FakeResult:
+    def __init__(self, rows=None, scalar=None, rowcount=0):
+        self.rows = rows or []
+        self.scalar = scalar
+        self.rowcount = rowcount
+
+    def scalar_one_or_none(self):
+        return self.scalar if self.scalar is not None else (self.rows[0] if self.rows else None)
+
+    def scalar_one(self):
+        return self.scalar
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakeDB:
+    """Async session over a dict of objects keyed by id.
+
+    ``execute`` answers with ``on_execute(statement)`` when given, so tests
+    can script query results.
+    """
+
+    def __init__(self, objects: Optional[dict] = None, on_execute=None):
+        self.objects = objects if objects is not None else {}
+        self.on_execute = on_execute
+        self.added = []
+        self.commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def get(self, model, key):
+        return self.objects.get(key)
+
+    async def execute(self, statement):
+        if self.on_execute is not None:
+            return self.on_execute(statement)
+        return FakeResult()
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+    async def refresh(self, obj):
+        pass
+
+
+def session_maker(db: FakeDB):
+    """Replacement for async_session_maker that always yields db."""
+    return lambda: db
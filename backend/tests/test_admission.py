@@ -0,0 +1,85 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import admission
+from app.services.admission import admit_session
+from tests.fakes import FakeDB, FakeResult
+
+
+def admission_db(user_active: int, type_counts: dict[str, int]) -> FakeDB:
+    """Answers the per-user count, then the per-type status counts."""
+    db = FakeDB()
+    db.results = [
+        FakeResult(scalar=user_active),
+        FakeResult(rows=[("proposal", status, count) for status, count in type_counts.items()]),
+    ]
+    db.on_execute = lambda statement: db.results.pop(0)
+    return db
+
+
+@pytest.fixture(autouse=True)
+def limits(monkeypatch, override_settings):
+    monkeypatch.setattr(admission, "_stats", {})
+    override_settings(
+        ADMISSION_CONTROL_ENABLED=True,
+        ADMISSION_USER_MAX_ACTIVE=3,
+        ADMISSION_TYPE_MAX_ACTIVE={"proposal": 2},
+        ADMISSION_TYPE_MAX_QUEUED=2,
+    )
+
+
+async def test_session_under_every_limit_starts_right_away():
+    result = await admit_session(admission_db(0, {"processing": 1}), uuid4(), "proposal")
+
+    assert (result.queue_position, result.estimated_wait) == (0, 0)
+    assert admission.get_admission_stats()["proposal"]["admitted"] == 1
+
+
+async def test_user_over_their_limit_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        await admit_session(admission_db(3, {}), uuid4(), "proposal")
+
+    assert error.value.status_code == 429
+    assert error.value.headers["Retry-After"] == str(admission.SESSION_DURATION_ESTIMATES["proposal"])
+    assert admission.get_admission_stats()["proposal"]["rejected_user"] == 1
+
+
+async def test_type_at_capacity_queues_with_a_wait_estimate():
+    duration = admission.SESSION_DURATION_ESTIMATES["proposal"]
+
+    first = await admit_session(admission_db(0, {"processing": 2}), uuid4(), "proposal")
+    second = await admit_session(admission_db(0, {"processing": 2, "pending": 1}), uuid4(), "proposal")
+
+    assert (first.queue_position, first.estimated_wait) == (1, duration)
+    assert (second.queue_position, second.estimated_wait) == (2, duration)
+
+
+async def test_full_queue_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        await admit_session(admission_db(0, {"processing": 2, "pending": 2}), uuid4(), "proposal")
+
+    assert error.value.status_code == 429
+    assert admission.get_admission_stats()["proposal"]["rejected_type"] == 1
+
+
+async def test_inline_sessions_are_rejected_instead_of_queued():
+    with pytest.raises(HTTPException):
+        await admit_session(admission_db(0, {"processing": 2}), uuid4(), "proposal", queueable=False)
+
+
+async def test_uncapped_type_skips_the_type_count(override_settings):
+    override_settings(ADMISSION_TYPE_MAX_ACTIVE={})
+    db = admission_db(0, {"processing": 100})
+
+    result = await admit_session(db, uuid4(), "proposal")
+
+    assert result.queue_position == 0
+    assert len(db.results) == 1  # type counts never queried
+
+
+async def test_disabled_admission_admits_everything(override_settings):
+    override_settings(ADMISSION_CONTROL_ENABLED=False)
+    result = await admit_session(admission_db(10, {"processing": 10}), uuid4(), "proposal")
+    assert result.queue_position == 0
@@ -0,0 +1,76 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+import app.services.llm as llm
+from app.services import cancellation
+from app.services.cancellation import SessionCancelled, cancellable
+from app.services.llm import ManagedChatModel, SingleFlight
+from app.services.llm_telemetry import llm_session
+
+
+class RateLimitedOnce:
+    """Fails its first call with a 429 once released, then answers."""
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.calls = 0
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        self.calls += 1
+        if self.calls == 1:
+            await self.release.wait()
+            raise RuntimeError("429 rate limit exceeded")
+        return AIMessage(content="shared answer")
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch, override_settings):
+    override_settings(
+        LLM_CACHE_ENABLED=False,
+        LLM_SINGLE_FLIGHT_ENABLED=True,
+        LLM_GOVERNOR_ENABLED=True,
+        LLM_RATE_LIMITS={"openai": {"rpm": 6_000_000, "tpm": 10 ** 9}},
+    )
+    monkeypatch.setattr(llm, "_single_flight", SingleFlight())
+    monkeypatch.setattr(llm, "_governors", {})
+    monkeypatch.setattr(cancellation, "_watch_cancellations", AsyncMock())
+
+
+async def run_session(session_id: str, model: ManagedChatModel):
+    with llm_session(session_id), cancellable(session_id):
+        return await model.ainvoke([HumanMessage(content="same prompt")])
+
+
+async def test_cancelling_one_session_keeps_a_shared_call_alive():
+    provider = RateLimitedOnce()
+    model = ManagedChatModel(provider, "gpt-5-mini", 0.0)
+
+    leader = asyncio.create_task(run_session("session-a", model))
+    await asyncio.sleep(0.01)
+    follower = asyncio.create_task(run_session("session-b", model))
+    await asyncio.sleep(0.01)
+    assert llm.get_single_flight().get_stats()["coalesced"] == 1
+
+    # The leader's session is cancelled while the shared call is still
+    # running; its retry after the 429 must still serve the follower
+    assert cancellation._cancel_local("session-a")
+    provider.release.set()
+
+    assert await leader is None
+    assert (await follower).content == "shared answer"
+    assert provider.calls == 2
+
+
+async def test_cancelled_session_doesnt_start_new_calls():
+    provider = RateLimitedOnce()
+    model = ManagedChatModel(provider, "gpt-5-mini", 0.0)
+    cancellation._cancelled.add("session-a")
+    try:
+        with llm_session("session-a"), pytest.raises(SessionCancelled):
+            await model.ainvoke([HumanMessage(content="prompt")])
+    finally:
+        cancellation._cancelled.discard("session-a")
+    assert provider.calls == 0
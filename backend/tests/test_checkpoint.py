@@ -0,0 +1,87 @@
+import asyncio
+import operator
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import Annotated, TypedDict
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+from sqlalchemy.dialects import postgresql
+
+from app.graphs import checkpoint, registry
+from app.services import job_queue
+from tests.fakes import FakeDB, FakeResult, session_maker
+
+
+class CounterState(TypedDict):
+    steps: Annotated[list, operator.add]
+
+
+def counter_graph(checkpointer=None):
+    workflow = StateGraph(CounterState)
+    workflow.add_node("step", lambda state: {"steps": ["done"]})
+    workflow.add_edge(START, "step")
+    workflow.add_edge("step", END)
+    return workflow.compile(checkpointer=checkpointer)
+
+
+async def test_recent_sessions_are_requeued_and_old_ones_failed(monkeypatch):
+    now = datetime.utcnow()
+    recent = [
+        SimpleNamespace(id=uuid4(), user_id=uuid4(), ai_type="proposal", input_data={"idea": "a"}, created_at=now),
+        SimpleNamespace(id=uuid4(), user_id=uuid4(), ai_type="travel", input_data={"destination": "b"}, created_at=now),
+    ]
+    old = SimpleNamespace(
+        id=uuid4(), user_id=uuid4(), ai_type="travel", input_data={}, created_at=now - timedelta(days=2),
+    )
+    statements = []
+
+    def on_execute(statement):
+        statements.append(statement)
+        return FakeResult(rows=recent + [old])
+
+    runs = []
+
+    async def runner(**kwargs):
+        runs.append(kwargs)
+
+    queue = job_queue.LocalJobQueue(concurrency=1)
+    discard = AsyncMock()
+    monkeypatch.setattr(checkpoint, "async_session_maker", session_maker(FakeDB(on_execute=on_execute)))
+    monkeypatch.setattr(
+        job_queue, "async_session_maker",
+        session_maker(FakeDB(on_execute=lambda statement: FakeResult(scalar="processing"))),
+    )
+    monkeypatch.setattr(job_queue, "get_job_queue", lambda: queue)
+    monkeypatch.setattr(job_queue, "discard_checkpoint", discard)
+    monkeypatch.setattr(registry, "get_runners", lambda: {"proposal": runner, "travel": runner})
+
+    assert await checkpoint.resume_interrupted_sessions() == 2
+    await asyncio.gather(*queue._tasks)
+
+    select_sql = str(statements[0].compile(compile_kwargs={"literal_binds": True}))
+    assert "'pending'" in select_sql and "'processing'" in select_sql
+    update_sql = str(statements[1].compile(dialect=postgresql.dialect()))
+    assert update_sql.startswith("UPDATE ai_sessions SET status=")
+    discard.assert_awaited_once_with("travel", str(old.id))
+    # Run through the queue as a second attempt: resumed, with a retry left
+    assert sorted(run["session_id"] for run in runs) == sorted(str(s.id) for s in recent)
+    assert all(run["resume"] and run["retry"] for run in runs)
+
+
+async def test_delete_checkpoint_drops_the_session_thread():
+    graph = counter_graph(InMemorySaver())
+    config = checkpoint.graph_config("session-1")
+    await graph.ainvoke({"steps": []}, config)
+    assert (await graph.aget_state(config)).values
+
+    await checkpoint.delete_checkpoint(graph, "session-1")
+
+    assert not (await graph.aget_state(config)).values
+
+
+async def test_delete_checkpoint_without_a_checkpointer_is_a_no_op():
+    await checkpoint.delete_checkpoint(counter_graph(), "session-1")
+    assert not await checkpoint.has_checkpoint(counter_graph(), checkpoint.graph_config("session-1"))
@@ -0,0 +1,358 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from app.graphs import cover_letter
+from app.services import cancellation
+from app.services.stylometry import profile_from_fingerprints, style_fingerprint
+from tests.fakes import FakeDB, FakeResult, session_maker
+
+
+class ScriptedModel:
+    """Chat model answering prompts through a shared ``respond`` function."""
+
+    def __init__(self, alias: str, temperature: float, respond):
+        self.model_id = alias
+        self.alias = alias
+        self.temperature = temperature
+        self.respond = respond
+
+    async def ainvoke(self, messages, **kwargs):
+        content = await self.respond(self, messages[-1].content)
+        return AIMessage(content=content, usage_metadata={
+            "input_tokens": 100, "output_tokens": 50, "total_tokens": 150,
+        })
+
+
+def initial_state(**values) -> cover_letter.CoverLetterState:
+    state = cover_letter.CoverLetterState(
+        session_id="00000000-0000-0000-0000-000000000001",
+        user_id="00000000-0000-0000-0000-000000000002",
+        company_name="테스트 주식회사",
+        job_posting="백엔드 개발자 채용",
+        document_ids=[],
+        additional_instructions=None,
+        resume_content="",
+        portfolio_content="",
+        existing_cover_letters=[],
+        style_document_ids=[],
+        company_research="",
+        job_requirements={},
+        context_prefix="",
+        current_cover_letter={},
+        revised_questions=[],
+        comparison_score=None,
+        answer_scores={},
+        answer_feedback={},
+        iteration_count=0,
+        started_at=time.time(),
+        loop_tokens=0,
+        score_history=[],
+        best_cover_letter={},
+        best_answer_scores={},
+        best_score=None,
+        stop_reason=None,
+        final_cover_letter={},
+        final_score=None,
+        error=None,
+    )
+    state.update(values)
+    return state
+
+
+def letter_digest(text: str, excerpt: str = None) -> dict:
+    """Digest of a past cover letter, as built at upload."""
+    return {"excerpt": excerpt or text, "style": style_fingerprint(text)}
+
+
+async def default_respond(model, prompt: str) -> str:
+    if "채용 공고를 분석" in prompt:
+        return json.dumps({"position": "백엔드", "questions": ["지원동기", "입사 후 포부"]}, ensure_ascii=False)
+    if "회사에 대해 조사" in prompt:
+        return "회사 조사 결과"
+    if "동일인물이 작성했는지" in prompt:
+        return "{}"
+    return f"{model.alias} 답변"
+
+
+@pytest.fixture
+def cover_letter_run(monkeypatch):
+    """Run the compiled cover-letter graph with scripted models and no database."""
+    documents = {"resume": [], "portfolio": [], "cover_letter": []}
+    progress = {}
+    # Document ids whose style profile was loaded
+    profiled = []
+    run = SimpleNamespace(documents=documents, profiled=profiled, progress=progress, respond=default_respond, models=[])
+
+    async def load_digests(db, user_id, categories, limit=None):
+        return [
+            SimpleNamespace(document_id=f"{categories[0]}-{i}", digest=digest)
+            for i, digest in enumerate(documents[categories[0]])
+        ][:limit]
+
+    async def load_style_profile(user_id, document_ids):
+        profiled.append(list(document_ids))
+        digests = {f"cover_letter-{i}": d for i, d in enumerate(documents["cover_letter"])}
+        return profile_from_fingerprints([digests[i]["style"] for i in document_ids])
+
+    async def publish(session_id, value):
+        progress[session_id] = value
+
+    def get_model(alias, temperature=0.7, **kwargs):
+        model = ScriptedModel(alias, temperature, lambda m, p: run.respond(m, p))
+        run.models.append(model)
+        return model
+
+    monkeypatch.setattr(cover_letter, "async_session_maker", session_maker(FakeDB()))
+    monkeypatch.setattr(cover_letter, "load_digests", load_digests)
+    monkeypatch.setattr(cover_letter, "load_style_profile", load_style_profile)
+    monkeypatch.setattr(cover_letter, "publish_progress", publish)
+    monkeypatch.setattr(cover_letter, "current_progress", lambda session_id: progress.get(session_id, {}))
+    monkeypatch.setattr(cover_letter, "get_model", get_model)
+
+    async def invoke(**values):
+        graph = cover_letter.create_cover_letter_graph()
+        return await graph.ainvoke(initial_state(**values))
+
+    run.invoke = invoke
+    return run
+
+
+async def test_preparation_branches_run_concurrently(cover_letter_run):
+    started = {"research": asyncio.Event(), "analysis": asyncio.Event()}
+
+    async def respond(model, prompt):
+        # Each branch waits for the other: a sequential run would time out
+        branch = "research" if "회사에 대해 조사" in prompt else "analysis" if "채용 공고를 분석" in prompt else None
+        if branch:
+            started[branch].set()
+            other = "analysis" if branch == "research" else "research"
+            await asyncio.wait_for(started[other].wait(), timeout=2)
+        return await default_respond(model, prompt)
+
+    cover_letter_run.respond = respond
+    cover_letter_run.documents["resume"] = [{"summary": "백엔드 5년차", "skills": ["Python"]}]
+
+    state = await cover_letter_run.invoke()
+
+    assert state["company_research"] == "회사 조사 결과"
+    assert "백엔드 5년차" in state["resume_content"]
+    assert "백엔드 5년차" in state["context_prefix"] and "회사 조사 결과" in state["context_prefix"]
+    assert list(state["final_cover_letter"]) == ["지원동기", "입사 후 포부"]
+    branches = cover_letter_run.progress[state["session_id"]]["branches"]
+    assert set(branches.values()) == {"completed"}
+
+
+async def test_unreadable_job_analysis_falls_back_to_default_questions(cover_letter_run):
+    async def respond(model, prompt):
+        if "채용 공고를 분석" in prompt:
+            return "분석할 수 없습니다"
+        return await default_respond(model, prompt)
+
+    cover_letter_run.respond = respond
+
+    state = await cover_letter_run.invoke()
+
+    assert list(state["final_cover_letter"]) == cover_letter.DEFAULT_QUESTIONS
+    assert state["stop_reason"] == "no_reference"
+
+
+async def test_resumed_run_restarts_the_time_budget(cover_letter_run, monkeypatch, override_settings):
+    override_settings(COVER_LETTER_STYLE_GATE=False)
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(cover_letter, "time", SimpleNamespace(time=lambda: clock.now))
+    session = SimpleNamespace(id=uuid4(), status="pending", completed_at=None, output_data=None, error_message=None)
+    monkeypatch.setattr(
+        cover_letter, "async_session_maker",
+        session_maker(FakeDB(on_execute=lambda statement: FakeResult(scalar=session))),
+    )
+    graph = cover_letter.create_cover_letter_graph(checkpointer=InMemorySaver())
+    monkeypatch.setattr(cover_letter, "get_graph", lambda name: graph)
+    monkeypatch.setattr(cover_letter, "save_session_telemetry", AsyncMock())
+    monkeypatch.setattr(cover_letter, "finish_progress", AsyncMock())
+    monkeypatch.setattr(cover_letter, "mark_session_processing", AsyncMock(return_value=True))
+    monkeypatch.setattr(cancellation, "_watch_cancellations", AsyncMock())
+    cover_letter_run.documents["cover_letter"] = [letter_digest("저는 꾸준히 성장해 왔습니다.")]
+
+    async def judge_down(model, prompt):
+        if "동일인물이 작성했는지" in prompt:
+            raise RuntimeError("provider down")
+        return await default_respond(model, prompt)
+
+    cover_letter_run.respond = judge_down
+    args = {"session_id": str(session.id), "user_id": str(uuid4()), "input_data": {
+        "company_name": "테스트 주식회사", "job_posting": "백엔드 개발자 채용",
+    }}
+    await cover_letter.run_cover_letter_graph(**args)
+    config = {"configurable": {"thread_id": str(session.id)}}
+    assert session.status == "failed"
+    assert (await graph.aget_state(config)).next == ("compare_identity",)
+
+    # Restarted well past the time budget: the downtime must not count
+    clock.now += 10 * cover_letter.SESSION_TIME_BUDGET
+    cover_letter_run.respond = default_respond
+    await cover_letter.run_cover_letter_graph(**args, resume=True)
+
+    assert session.status == "completed"
+    assert session.output_data["stop_reason"] == "plateau"
+    # Finished runs don't keep their checkpoints
+    assert not (await graph.aget_state(config)).values
+
+
+async def test_each_question_is_drafted_in_its_own_concurrent_call(cover_letter_run):
+    questions = ["지원동기", "입사 후 포부", "협업 경험"]
+    drafting, all_drafting = set(), asyncio.Event()
+
+    async def respond(model, prompt):
+        if "채용 공고를 분석" in prompt:
+            return json.dumps({"questions": questions}, ensure_ascii=False)
+        if "## 작성 요청" in prompt:
+            question = next(q for q in questions if f"## 문항\n    {q}\n" in prompt)
+            drafting.add(question)
+            if len(drafting) == len(questions):
+                all_drafting.set()
+            # Every draft waits for the others: a sequential run would time out
+            await asyncio.wait_for(all_drafting.wait(), timeout=2)
+            return f"{question} 답변"
+        return await default_respond(model, prompt)
+
+    cover_letter_run.respond = respond
+
+    state = await cover_letter_run.invoke()
+
+    assert state["final_cover_letter"] == {q: f"{q} 답변" for q in questions}
+
+
+async def test_only_answers_below_target_are_revised_and_rejudged(cover_letter_run, override_settings):
+    override_settings(COVER_LETTER_STYLE_GATE=False)
+    cover_letter_run.documents["cover_letter"] = [letter_digest("저는 꾸준히 성장해 왔습니다.")]
+    judged, revised = [], []
+
+    async def respond(model, prompt):
+        if "동일인물이 작성했는지" in prompt:
+            answers = json.loads(prompt.split("## 새로 작성된 답변\n")[1].split("\n")[0])
+            judged.append(sorted(answers))
+            return json.dumps({
+                q: {"similarity_score": 90 if "수정" in a or q == "지원동기" else 60, "feedback": f"{q} 피드백"}
+                for q, a in answers.items()
+            }, ensure_ascii=False)
+        if "피드백을 반영하여" in prompt:
+            revised.append(prompt)
+            return "입사 후 포부 수정 답변"
+        return await default_respond(model, prompt)
+
+    cover_letter_run.respond = respond
+
+    state = await cover_letter_run.invoke()
+
+    assert judged == [["입사 후 포부", "지원동기"], ["입사 후 포부"]]
+    assert len(revised) == 1 and "입사 후 포부 피드백" in revised[0]
+    assert state["final_cover_letter"]["입사 후 포부"] == "입사 후 포부 수정 답변"
+    assert state["answer_scores"] == {"지원동기": 90.0, "입사 후 포부": 90.0}
+    assert state["stop_reason"] == "target_reached"
+
+
+async def test_best_of_n_never_repeats_a_draft_candidate(cover_letter_run, override_settings):
+    override_settings(COVER_LETTER_BEST_OF_N=len(cover_letter.DRAFT_CANDIDATES) + 2)
+    cover_letter_run.documents["cover_letter"] = [letter_digest("저는 꾸준히 성장해 왔습니다.")]
+    drafts = []
+
+    async def respond(model, prompt):
+        if "## 작성 요청" in prompt:
+            drafts.append((model.alias, model.temperature))
+        return await default_respond(model, prompt)
+
+    cover_letter_run.respond = respond
+
+    await cover_letter_run.invoke()
+
+    # Two questions, each drafted once by every distinct candidate
+    assert sorted(drafts) == sorted(cover_letter.DRAFT_CANDIDATES * 2)
+
+
+async def test_style_gate_only_sends_borderline_answers_to_the_judge(cover_letter_run, monkeypatch):
+    ratios = {
+        "지원동기": cover_letter.STYLE_ACCEPT_RATIO,
+        "입사 후 포부": cover_letter.STYLE_REJECT_RATIO,
+        "협업 경험": 0.8,
+    }
+    answers = {question: f"{question} 답변" for question in ratios}
+    monkeypatch.setattr(cover_letter, "relative_similarity", lambda text, profile: ratios[text.removesuffix(" 답변")])
+    judged = []
+
+    async def respond(model, prompt):
+        judged.append(json.loads(prompt.split("## 새로 작성된 답변\n")[1].split("\n")[0]))
+        return json.dumps({"협업 경험": {"similarity_score": 70, "feedback": "judge"}}, ensure_ascii=False)
+
+    cover_letter_run.respond = respond
+    cover_letter_run.documents["cover_letter"] = [letter_digest("저는 꾸준히 성장해 왔습니다.")]
+    state = initial_state(
+        existing_cover_letters=["저는 꾸준히 성장해 왔습니다."],
+        style_document_ids=["cover_letter-0"],
+        current_cover_letter=answers,
+        revised_questions=list(answers),
+        iteration_count=1,
+    )
+
+    result = await cover_letter.compare_identity(state)
+
+    assert judged == [{"협업 경험": "협업 경험 답변"}]
+    assert result["answer_scores"] == {"지원동기": 95.0, "입사 후 포부": 60.0, "협업 경험": 70.0}
+    assert result["answer_feedback"]["지원동기"] == ""
+    assert result["answer_feedback"]["입사 후 포부"]
+    assert result["score_history"][-1]["locally_scored"] == ["입사 후 포부", "지원동기"]
+
+
+async def test_style_is_profiled_from_stored_fingerprints_not_letter_text(cover_letter_run):
+    letter = "저는 꾸준히 성장해 왔습니다. 그리고 팀과 함께 많은 문제를 해결했습니다."
+    cover_letter_run.documents["cover_letter"] = [
+        letter_digest(letter, excerpt="저는 꾸준히 성장해 왔습니다."),
+        # Digest built before fingerprints existed: not a style reference
+        {"excerpt": "예전 자기소개서입니다."},
+    ]
+
+    state = await cover_letter_run.invoke()
+
+    assert state["existing_cover_letters"] == ["저는 꾸준히 성장해 왔습니다.", "예전 자기소개서입니다."]
+    assert state["style_document_ids"] == ["cover_letter-0"]
+    assert letter not in json.dumps(state, ensure_ascii=False, default=str)
+    assert cover_letter_run.profiled and all(ids == ["cover_letter-0"] for ids in cover_letter_run.profiled)
+
+
+def history_entry(score: float, tokens: int, elapsed: float) -> dict:
+    return {"score": score, "answer_scores": {"지원동기": score}, "tokens": tokens, "elapsed": elapsed}
+
+
+def test_budgets_are_projected_from_revise_rounds_only(monkeypatch):
+    monkeypatch.setattr(cover_letter, "SESSION_TOKEN_BUDGET", 10_000)
+    monkeypatch.setattr(cover_letter, "SESSION_TIME_BUDGET", 100)
+    state = initial_state(iteration_count=1)
+    # Preparing and drafting cost far more than a revision
+    drafted = history_entry(50.0, tokens=6_000, elapsed=60.0)
+
+    assert cover_letter.convergence_stop_reason(state, [drafted]) is None
+    revised = history_entry(60.0, tokens=7_000, elapsed=70.0)
+    assert cover_letter.convergence_stop_reason(state, [drafted, revised]) is None
+    # One revision already shows the next one won't fit: 9.5k + 3.5k > 10k
+    expensive = history_entry(60.0, tokens=9_500, elapsed=70.0)
+    assert cover_letter.convergence_stop_reason(state, [drafted, expensive]) == "token_budget"
+    slow = history_entry(60.0, tokens=7_000, elapsed=90.0)
+    assert cover_letter.convergence_stop_reason(state, [drafted, slow]) == "time_budget"
+
+    history = [drafted, revised, history_entry(70.0, tokens=8_000, elapsed=80.0)]
+    assert cover_letter.convergence_stop_reason(state, history) is None
+    history.append(history_entry(80.0, tokens=9_500, elapsed=85.0))
+    assert cover_letter.convergence_stop_reason(state, history) == "token_budget"
+    history[-1] = history_entry(80.0, tokens=8_500, elapsed=95.0)
+    assert cover_letter.convergence_stop_reason(state, history) == "time_budget"
+
+    # Already over budget, with nothing to project from yet
+    assert cover_letter.convergence_stop_reason(state, [history_entry(50.0, 12_000, 60.0)]) == "token_budget"
+    assert cover_letter.convergence_stop_reason(state, [history_entry(50.0, 6_000, 120.0)]) == "time_budget"
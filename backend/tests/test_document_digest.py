@@ -0,0 +1,152 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from app.models.document_digest import DocumentDigest
+from app.services import document_digest
+from app.services.document_digest import (
+    build_digest,
+    content_hash,
+    load_digests,
+    load_style_profile,
+    refresh_digest,
+    render_digest,
+)
+from app.services.prompt_budget import count_tokens
+from app.services.stylometry import style_fingerprint, style_profile, style_similarity
+from tests.fakes import FakeDB, FakeResult, session_maker
+
+LETTER = "\n\n".join(
+    f"저는 {i}번째 프로젝트에서 팀과 함께 문제를 해결했습니다. 그 과정에서 꾸준히 성장했습니다." for i in range(200)
+)
+RESUME = "# 이력서\n\n백엔드 개발자 5년차. Python, PostgreSQL, AWS 경험."
+
+
+class ExtractingModel:
+    def __init__(self, content: str):
+        self.content = content
+
+    async def ainvoke(self, messages, **kwargs):
+        return AIMessage(content=self.content)
+
+
+def document(category: str, text: str):
+    return SimpleNamespace(id=uuid4(), user_id=uuid4(), category=category, markdown_content=text)
+
+
+async def test_letters_keep_tone_and_a_short_excerpt_without_an_llm():
+    digest, model = await build_digest("cover_letter", LETTER)
+
+    assert model is None
+    assert digest["tone"]["ending"] == "formal"
+    assert count_tokens(digest["excerpt"]) <= document_digest.STYLE_EXCERPT_TOKENS["cover_letter"]
+    assert LETTER.startswith(digest["excerpt"])
+    # The excerpt is a style reference, not prompt content
+    assert digest["excerpt"] not in render_digest(digest)
+    # The style profile is built from the whole letter, once
+    assert digest["style"] == style_fingerprint(LETTER)
+    assert "style" not in (await build_digest("weekly_report", LETTER))[0]
+
+
+async def test_resume_profile_is_extracted_by_the_digest_model(monkeypatch):
+    extracted = {"summary": "백엔드 개발자", "skills": ["Python", "AWS"]}
+    model = ExtractingModel(f"```json\n{json.dumps(extracted, ensure_ascii=False)}\n```")
+    monkeypatch.setattr(document_digest, "get_model", lambda alias, temperature=0.0: model)
+
+    digest, model_id = await build_digest("resume", RESUME)
+
+    assert model_id == document_digest.settings.DOCUMENT_DIGEST_MODEL
+    assert digest["skills"] == ["Python", "AWS"]
+    assert "기술/역량: Python, AWS" in render_digest(digest)
+
+
+async def test_unreadable_extraction_keeps_the_trimmed_text(monkeypatch):
+    monkeypatch.setattr(document_digest, "get_model", lambda alias, temperature=0.0: ExtractingModel("모르겠습니다"))
+
+    digest, model_id = await build_digest("resume", RESUME)
+
+    assert model_id is None
+    assert digest["content"] == RESUME
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    """A stored digest row and a build_digest that records its calls."""
+    doc = document("cover_letter", LETTER)
+    row = DocumentDigest(
+        document_id=doc.id, user_id=doc.user_id, category="cover_letter",
+        content_hash=content_hash(LETTER), digest={"excerpt": "이전 발췌", "style": {}},
+    )
+    build = AsyncMock(return_value=({"excerpt": "새 발췌"}, None))
+    monkeypatch.setattr(document_digest, "build_digest", build)
+    db = FakeDB(on_execute=lambda statement: FakeResult(scalar=row))
+    return SimpleNamespace(document=doc, row=row, build=build, db=db)
+
+
+async def test_digest_of_unchanged_text_is_not_rebuilt(stored):
+    assert await refresh_digest(stored.db, stored.document) is stored.row
+
+    stored.build.assert_not_called()
+    assert stored.db.commits == 0
+
+
+@pytest.mark.parametrize("change", ["text", "category", "no style"])
+async def test_changed_document_is_digested_again(stored, change):
+    if change == "text":
+        stored.document.markdown_content = LETTER + "\n\n추가 문단입니다."
+    elif change == "category":
+        stored.document.category = "weekly_report"
+    else:
+        # Built before letters stored a style fingerprint
+        stored.row.digest = {"excerpt": "이전 발췌"}
+
+    await refresh_digest(stored.db, stored.document)
+
+    stored.build.assert_awaited_once()
+    assert stored.row.digest == {"excerpt": "새 발췌"}
+    assert stored.row.content_hash == content_hash(stored.document.markdown_content)
+    assert stored.row.category == stored.document.category
+
+
+async def test_documents_without_a_current_digest_are_digested_on_the_spot(monkeypatch):
+    current = DocumentDigest(category="cover_letter", digest={"excerpt": "현재", "style": {}})
+    stale = DocumentDigest(category="resume", digest={"summary": "이전 분류"})
+    doc = document("cover_letter", LETTER)
+    results = [
+        FakeResult(rows=[(uuid4(), "cover_letter", current), (uuid4(), "cover_letter", stale), (doc.id, "cover_letter", None)]),
+        FakeResult(scalar=doc),
+        FakeResult(scalar=doc),
+    ]
+    refreshed = DocumentDigest(category="cover_letter", digest={"excerpt": "새로 생성"})
+    refresh = AsyncMock(return_value=refreshed)
+    monkeypatch.setattr(document_digest, "refresh_digest", refresh)
+    db = FakeDB(on_execute=lambda statement: results.pop(0))
+
+    digests = await load_digests(db, doc.user_id, ["cover_letter"])
+
+    assert digests == [current, refreshed, refreshed]
+    assert refresh.await_count == 2
+
+
+async def test_style_profile_is_built_from_stored_fingerprints_and_cached(monkeypatch):
+    first, second = uuid4(), uuid4()
+    other = LETTER.replace("했습니다", "했어요")
+    queries = []
+    db = FakeDB(on_execute=lambda statement: queries.append(statement) or FakeResult(rows=[
+        (second, {"style": style_fingerprint(other)}), (first, {"style": style_fingerprint(LETTER)}),
+    ]))
+    monkeypatch.setattr(document_digest, "async_session_maker", session_maker(db))
+    ids = [str(first), str(second)]
+
+    profile = await load_style_profile("user-1", ids)
+
+    expected = style_profile([LETTER, other])
+    assert profile.baseline == pytest.approx(expected.baseline)
+    assert style_similarity(LETTER, profile) == pytest.approx(style_similarity(LETTER, expected))
+    assert await load_style_profile("user-1", ids) is profile
+    assert len(queries) == 1
+    assert await load_style_profile("user-1", []) is None
@@ -0,0 +1,39 @@
+import pytest
+
+from app.graphs import registry
+
+
+@pytest.fixture(autouse=True)
+def empty_registry(monkeypatch):
+    monkeypatch.setattr(registry, "_compiled", {})
+    monkeypatch.setattr(registry, "_checkpointer", None)
+
+
+def test_compile_graphs_builds_every_graph_once():
+    timings = registry.compile_graphs()
+
+    assert set(timings) == {"cover_letter", "proposal", "travel", "weekly_report"}
+    assert set(registry.get_runners()) == set(timings)
+    graph = registry.get_graph("proposal")
+    assert registry.get_graph("proposal") is graph
+
+
+def test_get_graph_compiles_lazily_with_the_registered_checkpointer(monkeypatch):
+    calls = []
+
+    def factory(checkpointer=None):
+        calls.append(checkpointer)
+        return object()
+
+    monkeypatch.setattr(registry, "_factories", lambda: {"travel": factory})
+    monkeypatch.setattr(registry, "_checkpointer", "saver")
+
+    graph = registry.get_graph("travel")
+
+    assert registry.get_graph("travel") is graph
+    assert calls == ["saver"]
+
+
+def test_unknown_graph_is_rejected():
+    with pytest.raises(KeyError):
+        registry.get_graph("horoscope")
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+import app.services.llm as llm
+from app.services.llm import LatencyTracker, ManagedChatModel, hedge_budget_available
+
+
+class SlowModel:
+    def __init__(self, delay: float, content: str, error: Exception = None):
+        self.delay = delay
+        self.content = content
+        self.error = error
+        self.cancelled = False
+
+    async def ainvoke(self, messages, config=None, **kwargs):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        return AIMessage(content=self.content)
+
+
+@pytest.fixture
+def hedging(override_settings, monkeypatch):
+    override_settings(
+        LLM_GOVERNOR_ENABLED=False,
+        LLM_HEDGE_MIN_SAMPLES=5,
+        LLM_HEDGE_MIN_DELAY=0.01,
+        LLM_HEDGE_PERCENTILE=95.0,
+        LLM_HEDGE_MAX_RATE=1.0,
+    )
+    monkeypatch.setattr(llm, "_latency_trackers", {})
+    monkeypatch.setattr(llm, "_hedge_stats", {})
+
+    def setup(primary: SlowModel, backup: SlowModel):
+        tracker = llm.get_latency_tracker("claude-sonnet-4-5")
+        for _ in range(5):
+            tracker.record(0.01)
+        backup_model = ManagedChatModel(backup, "gpt-5", 0.7, alias="gpt-5")
+        monkeypatch.setattr(llm, "get_hedge_backup", lambda alias, temperature: backup_model)
+        return ManagedChatModel(primary, "claude-sonnet-4-5", 0.7, alias="claude-sonnet-4.5", hedge=True)
+
+    return setup
+
+
+def test_hedge_delay_waits_for_warm_up(override_settings):
+    override_settings(LLM_HEDGE_MIN_SAMPLES=3, LLM_HEDGE_MIN_DELAY=0.5, LLM_HEDGE_PERCENTILE=50.0)
+    tracker = LatencyTracker()
+    tracker.record(2.0)
+    assert tracker.hedge_delay() is None
+
+    tracker.record(1.0)
+    tracker.record(3.0)
+    assert tracker.hedge_delay() == 2.0
+
+
+def test_hedge_budget_caps_the_share_of_hedged_calls(override_settings):
+    override_settings(LLM_HEDGE_MAX_RATE=0.1)
+    assert hedge_budget_available({"calls": 20, "hedged": 1})
+    assert not hedge_budget_available({"calls": 20, "hedged": 2})
+
+
+async def test_fast_primary_is_not_hedged(hedging):
+    primary, backup = SlowModel(0.0, "primary"), SlowModel(0.0, "backup")
+    model = hedging(primary, backup)
+
+    response = await model._hedged_call([HumanMessage(content="hi")])
+
+    assert response.content == "primary"
+    assert llm.get_hedge_stats("claude-sonnet-4.5")["hedged"] == 0
+
+
+async def test_slow_primary_loses_to_backup_and_is_cancelled(hedging):
+    primary, backup = SlowModel(1.0, "primary"), SlowModel(0.0, "backup")
+    model = hedging(primary, backup)
+
+    response = await model._hedged_call([HumanMessage(content="hi")])
+
+    assert response.content == "backup"
+    stats = llm.get_hedge_stats("claude-sonnet-4.5")
+    assert stats["hedged"] == 1 and stats["backup_wins"] == 1
+    await asyncio.sleep(0)
+    assert primary.cancelled
+
+
+async def test_failed_backup_falls_back_to_primary(hedging):
+    primary = SlowModel(0.05, "primary")
+    backup = SlowModel(0.0, "backup", error=RuntimeError("backup down"))
+    model = hedging(primary, backup)
+
+    response = await model._hedged_call([HumanMessage(content="hi")])
+
+    assert response.content == "primary"
+    assert llm.get_hedge_stats("claude-sonnet-4.5")["primary_wins"] == 1
@@ -0,0 +1,169 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.ai_job import AIJob
+from app.services import job_queue
+from app.services.job_queue import Job, LocalJobQueue, PostgresJobQueue
+from tests.fakes import FakeDB, FakeResult, session_maker
+
+
+def ai_job(ai_type: str = "proposal", status: str = "queued", attempts: int = 0, **values) -> AIJob:
+    return AIJob(
+        id=uuid4(), session_id=uuid4(), user_id=uuid4(), ai_type=ai_type, input_data={},
+        status=status, attempts=attempts, max_attempts=3, **values,
+    )
+
+
+def job(attempts: int = 1, max_attempts: int = 3) -> Job:
+    return Job(
+        id=str(uuid4()), session_id=str(uuid4()), user_id=str(uuid4()), ai_type="proposal",
+        input_data={}, attempts=attempts, max_attempts=max_attempts,
+    )
+
+
+def compiled(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+@pytest.fixture
+def queue_db(monkeypatch):
+    """FakeDB answering the queue's queries in order from ``results``."""
+    db = FakeDB()
+    db.results = []
+    db.statements = []
+
+    def on_execute(statement):
+        db.statements.append(statement)
+        return db.results.pop(0) if db.results else FakeResult()
+
+    db.on_execute = on_execute
+    monkeypatch.setattr(job_queue, "async_session_maker", session_maker(db))
+    monkeypatch.setattr(job_queue, "discard_checkpoint", AsyncMock())
+    return db
+
+
+async def test_claim_locks_runnable_jobs_for_the_worker(queue_db, override_settings):
+    override_settings(ADMISSION_TYPE_MAX_ACTIVE={}, JOB_VISIBILITY_TIMEOUT=60)
+    queued = ai_job()
+    queue_db.results = [FakeResult(rows=[]), FakeResult(rows=[queued])]
+
+    [claimed] = await PostgresJobQueue().claim("worker-1", limit=5)
+
+    assert claimed.id == str(queued.id) and claimed.attempts == 1
+    assert queued.status == "running" and queued.locked_by == "worker-1"
+    assert 55 < (queued.locked_until - datetime.utcnow()).total_seconds() <= 60
+    assert "FOR UPDATE SKIP LOCKED" in compiled(queue_db.statements[1])
+    assert queue_db.commits == 1
+
+
+async def test_claim_respects_the_type_cap(queue_db, override_settings):
+    override_settings(ADMISSION_TYPE_MAX_ACTIVE={"proposal": 2})
+    jobs = [ai_job(), ai_job(), ai_job()]
+    queue_db.results = [FakeResult(rows=[("proposal", 1)]), FakeResult(rows=jobs)]
+
+    claimed = await PostgresJobQueue().claim("worker-1", limit=5)
+
+    assert [c.id for c in claimed] == [str(jobs[0].id)]
+    assert [j.status for j in jobs] == ["running", "queued", "queued"]
+
+
+async def test_claim_fails_abandoned_jobs_out_of_attempts(queue_db, override_settings):
+    override_settings(ADMISSION_TYPE_MAX_ACTIVE={})
+    abandoned = ai_job(status="running", attempts=3, locked_by="dead-worker")
+    queue_db.results = [FakeResult(rows=[]), FakeResult(rows=[abandoned])]
+
+    assert await PostgresJobQueue().claim("worker-1", limit=5) == []
+
+    assert abandoned.status == "failed" and abandoned.last_error == "worker lost"
+    session_update = compiled(queue_db.statements[2])
+    assert "'failed'" in session_update and "ai_sessions.status != 'cancelled'" in session_update
+    job_queue.discard_checkpoint.assert_awaited_once_with("proposal", str(abandoned.session_id))
+
+
+@pytest.mark.parametrize("rowcount", [1, 0])
+async def test_cancelled_session_is_not_marked_processing(queue_db, rowcount):
+    queue_db.results = [FakeResult(rowcount=rowcount)]
+
+    assert await job_queue.mark_session_processing(str(uuid4())) is bool(rowcount)
+    sql = compiled(queue_db.statements[0])
+    assert "SET status='processing'" in sql and "ai_sessions.status != 'cancelled'" in sql
+
+
+async def test_heartbeat_only_extends_the_workers_own_lock(queue_db):
+    claimed = job()
+
+    await PostgresJobQueue().heartbeat(claimed, "worker-1")
+
+    sql = compiled(queue_db.statements[0])
+    assert "locked_until" in sql and "'worker-1'" in sql
+    assert queue_db.commits == 1
+
+
+async def test_failed_attempt_is_requeued_with_backoff(queue_db, monkeypatch, override_settings):
+    override_settings(JOB_RETRY_BACKOFF=30)
+    retrying = AsyncMock()
+    monkeypatch.setattr(job_queue, "mark_session_retrying", retrying)
+    attempt = job(attempts=2)
+
+    await PostgresJobQueue().finish(attempt, "provider error")
+
+    sql = compiled(queue_db.statements[0])
+    assert "status='queued'" in sql and "run_after" in sql
+    assert job_queue.retry_delay(2) == 60
+    retrying.assert_awaited_once_with(attempt.session_id)
+    job_queue.discard_checkpoint.assert_not_awaited()
+
+
+async def test_last_failed_attempt_is_final(queue_db, monkeypatch):
+    retrying = AsyncMock()
+    monkeypatch.setattr(job_queue, "mark_session_retrying", retrying)
+    attempt = job(attempts=3)
+
+    await PostgresJobQueue().finish(attempt, "provider error")
+
+    assert "status='failed'" in compiled(queue_db.statements[0])
+    retrying.assert_not_awaited()
+    job_queue.discard_checkpoint.assert_awaited_once_with("proposal", attempt.session_id)
+
+
+async def test_graph_is_told_whether_a_retry_remains(queue_db, monkeypatch):
+    calls = []
+
+    async def run(**kwargs):
+        calls.append(kwargs)
+        return "provider error"
+
+    monkeypatch.setattr("app.graphs.registry.get_runners", lambda: {"proposal": run})
+
+    assert await job_queue.execute_job(job(attempts=1)) == "provider error"
+    assert await job_queue.execute_job(job(attempts=3)) == "provider error"
+
+    assert [(c["resume"], c["retry"]) for c in calls] == [(False, True), (True, False)]
+
+
+async def test_local_queue_retries_until_the_run_succeeds(monkeypatch, override_settings):
+    override_settings(JOB_RETRY_BACKOFF=0, JOB_MAX_ATTEMPTS=3, ADMISSION_TYPE_MAX_ACTIVE={})
+    outcomes = ["provider error", "provider error", None]
+    attempts = []
+
+    async def execute(job):
+        attempts.append((job.attempts, job.max_attempts))
+        return outcomes.pop(0)
+
+    monkeypatch.setattr(job_queue, "execute_job", execute)
+    monkeypatch.setattr(job_queue, "mark_session_retrying", AsyncMock())
+    monkeypatch.setattr(job_queue, "mark_session_failed", AsyncMock())
+    queue = LocalJobQueue(concurrency=1)
+
+    await queue.enqueue(SimpleNamespace(id=uuid4(), user_id=uuid4(), ai_type="proposal", input_data={}))
+    await asyncio.gather(*queue._tasks)
+
+    assert attempts == [(1, 3), (2, 3), (3, 3)]
+    assert job_queue.mark_session_retrying.await_count == 2
+    job_queue.mark_session_failed.assert_not_awaited()
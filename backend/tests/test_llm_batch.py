@@ -0,0 +1,110 @@
+import pytest
+
+from app.services.job_queue import JobQueue
+from app.services.llm_batch import BatchBackend, BatchResult, LLMBatch, _ai_message
+
+
+class StubBackend(BatchBackend):
+    """Answers the requests listed in ``answers``; the rest get no result."""
+
+    def __init__(self, name: str, answers=None, finishes=True, fails=False):
+        super().__init__("gpt-5-mini", 0.0, 100)
+        self.name = name
+        self.answers = answers
+        self.finishes = finishes
+        self.fails = fails
+        self.submitted: list[str] = []
+        self.cancelled = False
+
+    async def submit(self, requests) -> str:
+        if self.fails:
+            raise RuntimeError("provider unavailable")
+        self.submitted = [request.custom_id for request in requests]
+        return f"{self.name}-job"
+
+    async def poll(self, job_id: str) -> bool:
+        return self.finishes
+
+    async def results(self, job_id, requests) -> dict[str, BatchResult]:
+        results = {}
+        for request in requests:
+            if self.answers is None or request.custom_id in self.answers:
+                message = _ai_message(f"{self.name}:{request.custom_id}", 10, 5, self.model_id)
+                if self.name == "local":
+                    message.response_metadata.pop("batch")
+                results[request.custom_id] = BatchResult(request.custom_id, message=message)
+        return results
+
+    async def cancel(self, job_id: str):
+        self.cancelled = True
+
+
+@pytest.fixture
+def batch(monkeypatch, override_settings):
+    override_settings(LLM_BATCH_TIMEOUT=0, LLM_BATCH_POLL_INTERVAL=0)
+    batch = LLMBatch("gpt-5-mini", temperature=0.0)
+    for prompt in ("first", "second", "third"):
+        batch.add(prompt)
+    batch.local = StubBackend("local")
+    monkeypatch.setattr(batch, "_local_backend", lambda: batch.local)
+    return batch
+
+
+def use_backend(monkeypatch, batch, backend):
+    monkeypatch.setattr(batch, "_backend", lambda: backend)
+
+
+def test_interfaces_are_abstract():
+    with pytest.raises(TypeError):
+        BatchBackend("gpt-5-mini", 0.0, 100)
+    with pytest.raises(TypeError):
+        JobQueue()
+
+
+async def test_unanswered_requests_fall_back_to_regular_calls(monkeypatch, batch):
+    use_backend(monkeypatch, batch, StubBackend("openai", answers={"req-0", "req-2"}))
+
+    results = await batch.run()
+
+    assert [r.message.content for r in results] == ["openai:req-0", "local:req-1", "openai:req-2"]
+    assert batch.local.submitted == ["req-1"]
+
+
+async def test_timed_out_batch_is_cancelled_and_run_locally(monkeypatch, batch):
+    provider = StubBackend("openai", finishes=False)
+    use_backend(monkeypatch, batch, provider)
+
+    results = await batch.run()
+
+    assert provider.cancelled
+    assert [r.message.content for r in results] == ["local:req-0", "local:req-1", "local:req-2"]
+
+
+async def test_failed_submission_runs_everything_locally(monkeypatch, batch):
+    use_backend(monkeypatch, batch, StubBackend("anthropic", fails=True))
+
+    results = await batch.run()
+
+    assert all(result.ok for result in results)
+    assert batch.local.submitted == ["req-0", "req-1", "req-2"]
+
+
+async def test_local_runs_are_not_retried(monkeypatch, batch):
+    batch.local.answers = {"req-0"}
+    use_backend(monkeypatch, batch, batch.local)
+
+    results = await batch.run()
+
+    assert [result.ok for result in results] == [True, False, False]
+    assert results[1].error == "no result"
+
+
+def test_provider_backend_needs_live_mode_and_a_key(override_settings):
+    override_settings(LLM_BATCH_MODE="provider", LLM_PROVIDER_MODE="live", OPENAI_API_KEY="sk-test")
+    assert LLMBatch("gpt-5-mini")._backend().name == "openai"
+
+    override_settings(LLM_PROVIDER_MODE="fake")
+    assert LLMBatch("gpt-5-mini")._backend().name == "local"
+
+    override_settings(LLM_PROVIDER_MODE="live", OPENAI_API_KEY="")
+    assert LLMBatch("gpt-5-mini")._backend().name == "local"
@@ -0,0 +1,94 @@
+import json
+from unittest.mock import AsyncMock
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from app.graphs import cover_letter
+from app.services import llm
+from app.services.llm import ManagedChatModel
+from app.services.llm_cache import LLMResponseCache, LRUCache, make_cache_key
+
+
+def test_cache_key_is_stable_for_identical_calls():
+    messages = [SystemMessage(content="system"), HumanMessage(content="hello")]
+    assert make_cache_key("gpt-5-mini", 0.0, messages) == make_cache_key("gpt-5-mini", 0.0, list(messages))
+
+
+def test_cache_key_keeps_meaningful_whitespace():
+    code = HumanMessage(content="```python\ndef f():\n    return 1\n```")
+    flattened = HumanMessage(content="```python\ndef f():\nreturn 1\n```")
+    assert make_cache_key("gpt-5-mini", 0.0, [code]) != make_cache_key("gpt-5-mini", 0.0, [flattened])
+
+
+def test_cache_key_depends_on_model_temperature_and_params():
+    messages = [HumanMessage(content="hello")]
+    base = make_cache_key("gpt-5-mini", 0.0, messages)
+    assert base != make_cache_key("gpt-5", 0.0, messages)
+    assert base != make_cache_key("gpt-5-mini", 0.7, messages)
+    assert base != make_cache_key("gpt-5-mini", 0.0, messages, max_tokens=10)
+
+
+def test_only_deterministic_calls_are_cacheable_by_default(override_settings):
+    override_settings(LLM_CACHE_ENABLED=True, LLM_CACHE_MAX_TEMPERATURE=0.0)
+    assert ManagedChatModel(None, "gpt-5-mini", 0.0).cacheable()
+    assert not ManagedChatModel(None, "gpt-5-mini", 0.7).cacheable()
+    assert not ManagedChatModel(None, "gpt-5-mini", 0.0).cacheable(use_cache=False)
+
+    override_settings(LLM_CACHE_MAX_TEMPERATURE=1.0)
+    assert ManagedChatModel(None, "gpt-5-mini", 0.7).cacheable()
+
+    override_settings(LLM_CACHE_ENABLED=False)
+    assert not ManagedChatModel(None, "gpt-5-mini", 0.0).cacheable()
+
+
+def test_lru_evicts_oldest_and_expires(monkeypatch):
+    cache = LRUCache(max_entries=2)
+    cache.set("a", "1", ttl=60)
+    cache.set("b", "2", ttl=60)
+    assert cache.get("a") == "1"  # a is now most recent
+    cache.set("c", "3", ttl=60)
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+
+    cache.set("d", "4", ttl=-1)
+    assert cache.get("d") is None
+
+
+async def test_response_cache_round_trip_without_redis():
+    cache = LLMResponseCache(redis_url=None)
+    assert await cache.get("key") is None
+
+    await cache.set("key", AIMessage(content="cached answer"))
+    cached = await cache.get("key")
+
+    assert cached.content == "cached answer"
+    assert cache.get_stats()["hits"] == 1
+    assert cache.get_stats()["misses"] == 1
+
+
+async def test_repeated_job_analysis_is_served_from_the_cache(monkeypatch, override_settings):
+    override_settings(
+        LLM_CACHE_ENABLED=True,
+        LLM_CACHE_MAX_TEMPERATURE=0.0,
+        LLM_GOVERNOR_ENABLED=False,
+        LLM_HEDGING_ENABLED=False,
+    )
+    cache = LLMResponseCache(redis_url=None)
+    monkeypatch.setattr(llm, "get_response_cache", lambda: cache)
+    calls = []
+
+    class Provider:
+        async def ainvoke(self, messages, config=None, **kwargs):
+            calls.append(messages)
+            return AIMessage(content=json.dumps({"position": "백엔드", "questions": ["지원동기"]}))
+
+    monkeypatch.setattr(llm, "resolve_model", lambda alias, temperature=0.7: Provider())
+    monkeypatch.setattr(cover_letter, "update_branch_progress", AsyncMock())
+    state = {"session_id": "session-1", "job_posting": "백엔드 개발자 채용"}
+
+    first = await cover_letter.analyze_job_posting(state)
+    second = await cover_letter.analyze_job_posting({**state, "session_id": "session-2"})
+
+    assert len(calls) == 1
+    assert first == second
+    assert cache.get_stats()["hits"] == 1
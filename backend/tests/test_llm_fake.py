@@ -0,0 +1,99 @@
+import json
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.services import llm_fake
+from app.services.llm import ManagedChatModel
+from app.services.llm_fake import FakeChatModel, ReplayStore, prompt_hash
+
+
+@pytest.fixture
+def replay_store(tmp_path, monkeypatch):
+    store = ReplayStore(str(tmp_path / "recordings.jsonl"))
+    monkeypatch.setattr(llm_fake, "_replay_store", store)
+    return store
+
+
+def read_lines(path) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_fake_responses_are_never_cacheable(override_settings):
+    override_settings(LLM_CACHE_ENABLED=True, LLM_CACHE_MAX_TEMPERATURE=1.0)
+    model = ManagedChatModel(None, "gpt-5-mini", 0.0)
+    assert model.cacheable()
+
+    override_settings(LLM_PROVIDER_MODE="fake")
+    assert not model.cacheable()
+
+
+def test_put_appends_without_rewriting(replay_store):
+    replay_store.put("a", "first")
+    replay_store.put("b", "second")
+    replay_store.put("b", "second")  # unchanged: not written again
+
+    assert read_lines(replay_store.path) == [
+        {"key": "a", "content": "first"},
+        {"key": "b", "content": "second"},
+    ]
+    assert ReplayStore(replay_store.path).get("b") == "second"
+
+
+async def test_put_inside_the_event_loop_is_buffered(replay_store):
+    replay_store.put("a", "first")
+    replay_store.put("b", "second")
+    assert replay_store.get("a") == "first"
+
+    await replay_store.aclose()
+
+    assert [entry["key"] for entry in read_lines(replay_store.path)] == ["a", "b"]
+
+
+def test_legacy_json_file_is_converted_once(tmp_path):
+    path = tmp_path / "recordings.json"
+    path.write_text(json.dumps({"old": "recorded"}), encoding="utf-8")
+
+    store = ReplayStore(str(path))
+    assert store.get("old") == "recorded"
+    store.put("new", "fresh")
+
+    assert read_lines(path) == [
+        {"key": "old", "content": "recorded"},
+        {"key": "new", "content": "fresh"},
+    ]
+
+
+def test_torn_last_line_is_skipped(tmp_path):
+    path = tmp_path / "recordings.jsonl"
+    path.write_text('{"key": "a", "content": "ok"}\n{"key": "b", "con', encoding="utf-8")
+
+    store = ReplayStore(str(path))
+    assert store.get("a") == "ok"
+    assert store.get("b") is None
+
+
+async def test_streamed_responses_are_recorded(replay_store, override_settings):
+    override_settings(LLM_PROVIDER_MODE="record", LLM_CACHE_ENABLED=False, LLM_GOVERNOR_ENABLED=False)
+    inner = FakeChatModel(model_id="gpt-5-mini", temperature=0.0, latency_median=0.001, tokens_per_second=0)
+    model = ManagedChatModel(inner, "gpt-5-mini", 0.0)
+    messages = [HumanMessage(content="hello")]
+
+    chunks = [chunk.content async for chunk in model.astream(messages)]
+
+    key = prompt_hash("gpt-5-mini", 0.0, messages)
+    assert replay_store.get(key) == "".join(chunks)
+    await replay_store.aclose()
+    assert read_lines(replay_store.path) == [{"key": key, "content": "".join(chunks)}]
+
+
+async def test_recorded_response_is_replayed_in_fake_mode(replay_store):
+    messages = [HumanMessage(content="hello")]
+    llm_fake.record_response("gpt-5-mini", 0.0, messages, AIMessage(content="recorded answer"))
+
+    fake = FakeChatModel(model_id="gpt-5-mini", temperature=0.0, latency_median=0.001, tokens_per_second=0)
+    response = await fake.ainvoke(messages)
+
+    assert response.content == "recorded answer"
+    await replay_store.aclose()
@@ -0,0 +1,108 @@
+from uuid import uuid4
+
+import pytest
+from langchain_core.messages import AIMessage
+from sqlalchemy.dialects import postgresql
+
+from app.services.llm_telemetry import (
+    LatencyHistogram,
+    LLMCallRecord,
+    TelemetryCollector,
+    estimate_cost,
+    llm_session,
+    note_retry,
+    save_session_telemetry,
+    track_llm_call,
+)
+import app.services.llm_telemetry as llm_telemetry
+from tests.fakes import FakeDB, FakeResult, session_maker
+
+
+@pytest.fixture
+def collector(monkeypatch):
+    collector = TelemetryCollector()
+    monkeypatch.setattr(llm_telemetry, "_collector", collector)
+    return collector
+
+
+def response(input_tokens=1000, output_tokens=100, cache_read=0):
+    return AIMessage(content="ok", usage_metadata={
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+        "input_token_details": {"cache_read": cache_read},
+    })
+
+
+def test_cost_discounts_prompt_cache_reads():
+    full = estimate_cost("gpt-5-mini", 1_000_000, 0)
+    cached = estimate_cost("gpt-5-mini", 1_000_000, 0, cache_read_tokens=1_000_000)
+    assert full == pytest.approx(0.25)
+    assert cached == pytest.approx(0.025)
+    assert estimate_cost("unknown-model", 1000, 1000) == 0.0
+
+
+def test_cache_hits_are_free_and_batch_calls_half_price():
+    record = LLMCallRecord("openai", "gpt-5-mini", None, None)
+    record.set_response(response())
+    base = record.cost
+
+    record.source = "batch"
+    assert record.cost == pytest.approx(base / 2)
+    record.source = "cache"
+    assert record.cost == 0.0
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = LatencyHistogram()
+    for latency in (0.05, 0.3, 3.0, 500.0):
+        histogram.observe(latency)
+    buckets = histogram.to_dict()["buckets"]
+    assert buckets["0.1"] == 1
+    assert buckets["0.5"] == 2
+    assert buckets["5"] == 3
+    assert buckets["+Inf"] == 4
+
+
+def test_calls_are_attributed_to_the_session(collector):
+    with llm_session("session-1"):
+        with track_llm_call("openai", "gpt-5-mini") as record:
+            note_retry()
+            record.set_response(response())
+    with track_llm_call("openai", "gpt-5-mini"):
+        pass
+
+    breakdown = collector.pop_session("session-1")
+    assert breakdown["totals"]["calls"] == 1
+    assert breakdown["totals"]["retries"] == 1
+    assert breakdown["totals"]["input_tokens"] == 1000
+    assert collector.snapshot()["openai:gpt-5-mini:-"]["calls"] == 2
+
+
+def test_failed_calls_are_counted_but_not_timed(collector):
+    with pytest.raises(RuntimeError):
+        with track_llm_call("anthropic", "claude-haiku-4-5-20251001"):
+            raise RuntimeError("boom")
+
+    stats = collector.snapshot()["anthropic:claude-haiku-4-5-20251001:-"]
+    assert stats["errors"] == 1
+    assert stats["latency"]["count"] == 0
+
+
+async def test_session_telemetry_is_merged_into_output_data(collector, monkeypatch):
+    statements = []
+    db = FakeDB(on_execute=lambda statement: statements.append(statement) or FakeResult())
+    monkeypatch.setattr(llm_telemetry, "async_session_maker", session_maker(db))
+    session_id = str(uuid4())
+    with llm_session(session_id):
+        with track_llm_call("openai", "gpt-5-mini") as record:
+            record.set_response(response())
+
+    await save_session_telemetry(session_id)
+
+    [statement] = statements
+    compiled = statement.compile(dialect=postgresql.dialect())
+    assert str(compiled).startswith("UPDATE ai_sessions SET output_data=")
+    assert "||" in str(compiled)
+    assert "telemetry" in compiled.params["param_2"]
+    assert db.commits == 1
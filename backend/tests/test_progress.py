@@ -0,0 +1,84 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services import progress as progress_module
+from app.services.progress import ProgressBroker
+from tests.fakes import FakeDB, FakeResult, session_maker
+
+
+async def next_event(events):
+    return await asyncio.wait_for(events.__anext__(), timeout=1)
+
+
+async def subscribe(broker, session_id):
+    """Subscribe and wait until the subscription is registered."""
+    events = broker.subscribe(session_id)
+    first = asyncio.ensure_future(next_event(events))
+    while session_id not in broker._subscribers:
+        await asyncio.sleep(0)
+    return events, first
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    db = FakeDB(on_execute=lambda statement: FakeResult(scalar="failed"))
+    monkeypatch.setattr(progress_module, "async_session_maker", session_maker(db))
+    broker = ProgressBroker(redis_url=None)
+    broker.db = db
+    return broker
+
+
+async def test_retried_attempt_is_announced_as_retrying(broker):
+    session_id = str(uuid4())
+    events, subscribed = await subscribe(broker, session_id)
+
+    await broker.publish(session_id, {"message": "working"})
+    assert (await subscribed)["status"] == "processing"
+    await broker.finish(session_id, retrying=True)
+
+    assert await next_event(events) == {"status": "retrying"}
+    assert broker.db.commits == 0
+    await events.aclose()
+
+
+async def test_finished_run_announces_its_final_status(broker):
+    session_id = str(uuid4())
+    events, subscribed = await subscribe(broker, session_id)
+
+    await broker.publish(session_id, {"message": "working"})
+    await subscribed
+    await broker.finish(session_id)
+
+    assert await next_event(events) == {"status": "failed"}
+    await events.aclose()
+
+
+async def test_progress_is_merged_into_output_data_in_one_update(broker):
+    statements = []
+    broker.db.on_execute = lambda statement: statements.append(statement) or FakeResult()
+
+    await broker._write(str(uuid4()), {"message": "working"})
+
+    [statement] = statements
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE ai_sessions SET")
+    assert "||" in sql
+    assert "ai_sessions.status != " in sql
+    assert broker.db.commits == 1
+
+
+async def test_published_progress_is_flushed_after_the_interval(broker, override_settings):
+    override_settings(PROGRESS_FLUSH_INTERVAL=0)
+    written = []
+    broker.db.on_execute = lambda statement: written.append(statement.compile().params) or FakeResult()
+    session_id = str(uuid4())
+
+    await broker.publish(session_id, {"message": "first"})
+    await broker.publish(session_id, {"message": "second"})
+    await broker._flush_tasks[session_id]
+
+    assert len(written) == 1
+    assert {"progress": {"message": "second"}} in written[0].values()
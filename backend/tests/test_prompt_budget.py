@@ -0,0 +1,70 @@
+import pytest
+
+import app.services.prompt_budget as prompt_budget
+from app.services.prompt_budget import PromptBudget, count_tokens, get_model_family, trim_to_tokens
+
+# Estimated families make counts deterministic without the tiktoken encoding
+MODEL = "claude-sonnet-4-5"
+
+PARAGRAPHS = "\n\n".join(
+    f"문단 {i}입니다. 첫 번째 문장입니다. 두 번째 문장입니다." for i in range(20)
+)
+
+
+def test_model_families():
+    assert get_model_family("claude-haiku-4-5") == "anthropic"
+    assert get_model_family("gemini-3-pro") == "google"
+    assert get_model_family("gpt-5-mini") == "openai"
+
+
+def test_hangul_costs_more_than_latin():
+    assert count_tokens("가" * 100, MODEL) > count_tokens("a" * 100, MODEL)
+    assert count_tokens("", MODEL) == 0
+
+
+def test_openai_falls_back_to_estimates_without_an_encoder(monkeypatch):
+    monkeypatch.setattr(prompt_budget, "_get_encoder", lambda: None)
+    assert count_tokens("hello world", "gpt-5-mini") > 0
+
+
+def test_trim_keeps_short_text_unchanged():
+    assert trim_to_tokens("짧은 문장입니다.", 100, MODEL) == "짧은 문장입니다."
+    assert trim_to_tokens("anything", 0, MODEL) == ""
+
+
+@pytest.mark.parametrize("budget", [20, 60, 150])
+def test_trim_stays_within_budget_at_boundaries(budget):
+    trimmed = trim_to_tokens(PARAGRAPHS, budget, MODEL)
+
+    assert 0 < count_tokens(trimmed, MODEL) <= budget
+    assert PARAGRAPHS.startswith(trimmed.split("\n\n")[0])
+    # Cuts land on a paragraph or sentence end
+    assert trimmed.endswith("입니다.")
+
+
+def test_trim_cuts_a_single_huge_sentence_by_characters():
+    text = "가" * 1000
+    trimmed = trim_to_tokens(text, 50, MODEL)
+    assert 0 < len(trimmed) < len(text)
+
+
+def test_allocate_fills_higher_priority_sections_first():
+    budget = PromptBudget(MODEL, total_tokens=200)
+    budget.add("resume", PARAGRAPHS, priority=3, max_tokens=150)
+    budget.add("portfolio", PARAGRAPHS, priority=2)
+    budget.add("letters", PARAGRAPHS, priority=1)
+    sections = budget.allocate()
+
+    used = {name: count_tokens(text, MODEL) for name, text in sections.items()}
+    assert used["resume"] <= 150
+    assert used["resume"] > used["portfolio"]
+    assert sum(used.values()) <= 200
+    assert sections["letters"] == "" or used["letters"] <= 200 - used["resume"] - used["portfolio"]
+    assert budget.report["used"] == sum(s["tokens"] for s in budget.report["sections"].values())
+
+
+def test_allocate_keeps_everything_when_it_fits():
+    budget = PromptBudget(MODEL, total_tokens=10_000)
+    budget.add("a", "짧은 내용", priority=2)
+    budget.add("b", None, priority=1)
+    assert budget.allocate() == {"a": "짧은 내용", "b": ""}
@@ -0,0 +1,46 @@
+from langchain_core.messages import HumanMessage
+
+from app.services.llm import PROMPT_CACHE_MARK, apply_prompt_cache, cached_prefix
+
+
+def prompt(prefix: str = "shared context", question: str = "question"):
+    return [cached_prefix(prefix), HumanMessage(content=question)]
+
+
+def test_unmarked_prompts_are_sent_unchanged():
+    messages = [HumanMessage(content="hello")]
+    assert apply_prompt_cache(messages, "openai") == (messages, {})
+
+
+def test_anthropic_prefix_gets_a_cache_breakpoint():
+    prepared, options = apply_prompt_cache(prompt(), "anthropic")
+
+    assert options == {}
+    assert prepared[0].content == [
+        {"type": "text", "text": "shared context", "cache_control": {"type": "ephemeral"}}
+    ]
+    assert PROMPT_CACHE_MARK not in prepared[0].additional_kwargs
+    assert prepared[1].content == "question"
+
+
+def test_openai_prompt_cache_key_follows_the_prefix_only():
+    _, options = apply_prompt_cache(prompt(question="first"), "openai")
+    _, same_prefix = apply_prompt_cache(prompt(question="second"), "openai")
+    _, other_prefix = apply_prompt_cache(prompt(prefix="other context"), "openai")
+
+    assert options["prompt_cache_key"] == same_prefix["prompt_cache_key"]
+    assert options["prompt_cache_key"] != other_prefix["prompt_cache_key"]
+
+
+def test_google_relies_on_implicit_caching():
+    prepared, options = apply_prompt_cache(prompt(), "google")
+
+    assert options == {}
+    assert prepared[0].content == "shared context"
+    assert PROMPT_CACHE_MARK not in prepared[0].additional_kwargs
+
+
+def test_fake_mode_keeps_recorded_prompts_intact(override_settings):
+    override_settings(LLM_PROVIDER_MODE="fake")
+    messages = prompt()
+    assert apply_prompt_cache(messages, "anthropic") == (messages, {})
@@ -0,0 +1,169 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from app.graphs import proposal
+from app.services import cancellation
+
+
+PLAN = {
+    "title": "AI 가계부",
+    "questions": [
+        {"category": "market", "question": "시장 규모는?"},
+        {"category": "legal", "question": "개인정보 규제는?"},
+        {"category": "tech", "question": "OCR 정확도는?"},
+    ],
+}
+
+
+class ScriptedModel:
+    """Answers each node's prompt by a marker it contains."""
+
+    def __init__(self, calls: list, prompts: dict, failing: tuple = ()):
+        self.calls = calls
+        self.prompts = prompts
+        self.failing = failing
+
+    async def ainvoke(self, messages, **kwargs):
+        prompt = messages[-1].content
+        if any(marker in prompt for marker in self.failing):
+            raise RuntimeError("provider error")
+        if "완전한 기획서" in prompt:
+            self.calls.append("write")
+            return AIMessage(content=prompt)
+        if "리서치 계획" in prompt:
+            self.calls.append("plan")
+            return AIMessage(content=json.dumps(PLAN, ensure_ascii=False))
+        for question in PLAN["questions"]:
+            if f"## 질문\n    {question['question']}" in prompt:
+                self.calls.append(f"answer:{question['question']}")
+                return AIMessage(content=f"답변: {question['question']}")
+        for branch, marker in (("market", "시장 조사 결과를 정리"), ("legal", "법률 및 규제 조사 결과를 정리"), ("tech", "기술 조사 결과를 정리")):
+            if marker in prompt:
+                self.calls.append(f"branch:{branch}")
+                self.prompts[branch] = prompt
+                return AIMessage(content=f"{branch} 종합")
+        raise AssertionError(f"Unexpected prompt: {prompt}")
+
+
+@pytest.fixture
+def run_graph(monkeypatch):
+    """Run the compiled proposal graph with scripted models and no database."""
+    progress = {}
+    branch_updates = []
+    saved = {}
+
+    async def publish(session_id, value):
+        progress[session_id] = value
+        if "branches" in value:
+            branch_updates.append(value["branches"])
+
+    async def save(state):
+        saved.update(state)
+        return {}
+
+    monkeypatch.setattr(proposal, "publish_progress", publish)
+    monkeypatch.setattr(proposal, "current_progress", lambda session_id: progress.get(session_id, {}))
+    monkeypatch.setattr(proposal, "save_proposal", save)
+
+    async def run(failing: tuple = ()):
+        calls, prompts = [], {}
+        monkeypatch.setattr(
+            proposal, "get_model", lambda *args, **kwargs: ScriptedModel(calls, prompts, failing)
+        )
+        graph = proposal.create_proposal_graph()
+        state = proposal.ProposalState(
+            session_id="session-1",
+            user_id="user-1",
+            idea="영수증을 찍으면 자동으로 정리되는 가계부",
+            target_market=None,
+            budget_range=None,
+            special_requirements=None,
+            research_plan=[],
+            research_answers=[],
+            market_research="",
+            legal_research="",
+            tech_research="",
+            research_errors={},
+            proposal_title="",
+            proposal_content="",
+            research_data={},
+            error=None,
+        )
+        await graph.ainvoke(state)
+        return calls, prompts, saved, branch_updates
+
+    return run
+
+
+async def test_research_branches_all_run_before_writing(run_graph):
+    calls, _, saved, branch_updates = await run_graph()
+
+    assert sorted(calls[-4:-1]) == ["branch:legal", "branch:market", "branch:tech"]
+    assert calls[-1] == "write"
+    assert saved["research_data"]["errors"] == {}
+    assert branch_updates[-1] == {"market": "completed", "legal": "completed", "tech": "completed"}
+
+
+async def test_failed_branch_is_reported_without_failing_the_run(run_graph):
+    calls, _, saved, branch_updates = await run_graph(failing=("법률 및 규제 조사 결과를 정리",))
+
+    assert set(saved["research_data"]["errors"]) == {"legal"}
+    assert "조사 실패" in saved["proposal_content"]
+    assert branch_updates[-1]["legal"] == "failed"
+    assert calls[-1] == "write"
+
+
+async def test_run_fails_when_every_branch_fails(run_graph):
+    with pytest.raises(RuntimeError, match="All research branches failed"):
+        await run_graph(failing=("시장 조사 결과를 정리", "법률 및 규제 조사 결과를 정리", "기술 조사 결과를 정리"))
+
+
+async def test_every_planned_question_is_answered_once(run_graph):
+    calls, _, saved, _ = await run_graph()
+
+    answered = sorted(call for call in calls if call.startswith("answer:"))
+    assert answered == sorted(f"answer:{q['question']}" for q in PLAN["questions"])
+    assert calls.index("plan") == 0
+    assert all(q["answered"] for q in saved["research_data"]["questions"])
+
+
+async def test_each_branch_reduces_only_its_own_answers(run_graph):
+    _, prompts, _, _ = await run_graph()
+
+    assert "답변: 시장 규모는?" in prompts["market"]
+    assert "답변: 개인정보 규제는?" not in prompts["market"]
+    assert "답변: 개인정보 규제는?" in prompts["legal"]
+    assert "답변: OCR 정확도는?" in prompts["tech"]
+
+
+async def test_failed_question_is_left_out_of_the_findings(run_graph):
+    _, prompts, saved, _ = await run_graph(failing=("## 질문\n    OCR 정확도는?",))
+
+    assert "없음" in prompts["tech"]
+    answered = {q["question"]: q["answered"] for q in saved["research_data"]["questions"]}
+    assert answered == {"시장 규모는?": True, "개인정보 규제는?": True, "OCR 정확도는?": False}
+
+
+async def test_run_marks_the_session_processing_before_the_graph_starts(monkeypatch):
+    events = []
+
+    async def mark_processing(session_id):
+        events.append("processing")
+        return True
+
+    async def ainvoke(state, config):
+        events.append("graph")
+
+    monkeypatch.setattr(proposal, "mark_session_processing", mark_processing)
+    monkeypatch.setattr(proposal, "get_graph", lambda name: SimpleNamespace(ainvoke=ainvoke, checkpointer=None))
+    monkeypatch.setattr(proposal, "save_session_telemetry", AsyncMock())
+    monkeypatch.setattr(proposal, "finish_progress", AsyncMock())
+    monkeypatch.setattr(cancellation, "_watch_cancellations", AsyncMock())
+
+    assert await proposal.run_proposal_graph(str(uuid4()), str(uuid4()), {"idea": "가계부"}) is None
+    assert events == ["processing", "graph"]
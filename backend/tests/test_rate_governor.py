@@ -0,0 +1,94 @@
+import asyncio
+
+from langchain_core.messages import AIMessage
+
+from app.services.llm import AdaptiveLimiter, RateGovernor, TokenBucket, is_rate_limit_error
+
+
+async def test_token_bucket_serves_within_budget_without_waiting():
+    bucket = TokenBucket(per_minute=600)
+    assert await bucket.acquire(100) == 0.0
+    assert bucket.available() <= 500
+
+
+async def test_token_bucket_waits_for_refill(monkeypatch):
+    slept = []
+
+    async def fake_sleep(delay):
+        slept.append(delay)
+        bucket.updated_at -= delay  # time passes
+
+    bucket = TokenBucket(per_minute=60)  # 1 per second
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    await bucket.acquire(60)
+    waited = await bucket.acquire(2)
+
+    assert waited > 0
+    assert sum(slept) >= 1.9
+
+
+async def test_token_bucket_caps_oversized_requests():
+    bucket = TokenBucket(per_minute=10)
+    # Larger than the whole budget: takes a full bucket instead of waiting forever
+    assert await bucket.acquire(1000) == 0.0
+
+
+def test_token_bucket_adjust_refunds_unused_reservation():
+    bucket = TokenBucket(per_minute=1000)
+    bucket.tokens = 0
+    bucket.adjust(300)
+    assert 300 <= bucket.available() <= 1000
+
+
+def test_limiter_grows_additively_and_halves_on_throttle():
+    limiter = AdaptiveLimiter(max_limit=8)
+    limiter.limit = 4.0
+    limiter.on_success(1.0)
+    limiter.on_success(1.0)
+    assert 4.0 < limiter.limit < 5.0
+
+    limiter.on_throttle()
+    assert limiter.limit < 2.6
+    # A burst of throttles counts once
+    before = limiter.limit
+    limiter.on_throttle()
+    assert limiter.limit == before
+
+
+def test_limiter_backs_off_on_latency_spike(override_settings):
+    override_settings(LLM_GOVERNOR_LATENCY_SPIKE_FACTOR=3.0)
+    limiter = AdaptiveLimiter(max_limit=8)
+    limiter.on_success(1.0)
+    limiter.on_success(10.0)
+    assert limiter.limit == 4.0
+
+
+async def test_governor_caps_concurrency():
+    governor = RateGovernor(rpm=1000, tpm=1_000_000, concurrency=2)
+    running = peak = 0
+
+    async def call():
+        nonlocal running, peak
+        async with governor.slot(10) as slot:
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            slot.completed(AIMessage(content="ok", usage_metadata={
+                "input_tokens": 5, "output_tokens": 5, "total_tokens": 10,
+            }))
+
+    await asyncio.gather(*[call() for _ in range(6)])
+
+    assert peak == 2
+    assert governor.stats["requests"] == 6
+    assert governor.stats["tokens"] == 60
+
+
+def test_rate_limit_errors_are_recognised():
+    class Status429(Exception):
+        status_code = 429
+
+    assert is_rate_limit_error(Status429())
+    assert is_rate_limit_error(Exception("RESOURCE_EXHAUSTED: quota"))
+    assert not is_rate_limit_error(ValueError("bad request"))
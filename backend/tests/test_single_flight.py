@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from app.services.llm import SingleFlight
+
+
+async def test_concurrent_calls_share_one_flight():
+    flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return AIMessage(content="answer")
+
+    waiters = [asyncio.create_task(flight.do("key", call)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert calls == 1
+    assert [r.content for r in results] == ["answer"] * 3
+    assert flight.get_stats()["coalesced"] == 2
+    assert flight.get_stats()["in_flight"] == 0
+
+
+async def test_followers_get_independent_copies():
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def call():
+        await release.wait()
+        return AIMessage(content="answer")
+
+    leader = asyncio.create_task(flight.do("key", call))
+    follower = asyncio.create_task(flight.do("key", call))
+    await asyncio.sleep(0)
+    release.set()
+    first, second = await asyncio.gather(leader, follower)
+
+    assert first is not second
+    second.content = "changed"
+    assert first.content == "answer"
+
+
+async def test_errors_reach_every_waiter_and_clear_the_key():
+    flight = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0)
+        raise RuntimeError("provider down")
+
+    results = await asyncio.gather(
+        flight.do("key", call), flight.do("key", call), return_exceptions=True
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flight.get_stats()["in_flight"] == 0
+
+
+async def test_call_survives_until_the_last_waiter_leaves():
+    flight = SingleFlight()
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def call():
+        started.set()
+        await release.wait()
+        return AIMessage(content="answer")
+
+    first = asyncio.create_task(flight.do("key", call))
+    second = asyncio.create_task(flight.do("key", call))
+    await started.wait()
+
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    release.set()
+    assert (await second).content == "answer"
+
+
+async def test_call_is_cancelled_when_every_waiter_leaves():
+    flight = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def call():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiter = asyncio.create_task(flight.do("key", call))
+    await started.wait()
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
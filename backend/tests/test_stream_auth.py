@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.api.deps import get_stream_user
+from app.core.security import create_access_token, create_stream_token
+from tests.fakes import FakeDB, FakeResult
+
+
+@pytest.fixture
+def user():
+    return SimpleNamespace(id=uuid4(), is_active=True)
+
+
+@pytest.fixture
+def db(user):
+    return FakeDB(on_execute=lambda statement: FakeResult(scalar=user))
+
+
+async def test_stream_token_authenticates_its_own_session(db, user):
+    session_id = uuid4()
+    token = create_stream_token(str(user.id), str(session_id))
+
+    assert await get_stream_user(session_id, token=token, credentials=None, db=db) is user
+
+
+async def test_stream_token_of_another_session_is_rejected(db, user):
+    token = create_stream_token(str(user.id), str(uuid4()))
+
+    with pytest.raises(HTTPException) as error:
+        await get_stream_user(uuid4(), token=token, credentials=None, db=db)
+    assert error.value.status_code == 401
+
+
+async def test_access_token_is_not_accepted_in_the_query(db, user):
+    token = create_access_token({"sub": str(user.id)})
+
+    with pytest.raises(HTTPException):
+        await get_stream_user(uuid4(), token=token, credentials=None, db=db)
+    with pytest.raises(HTTPException):
+        await get_stream_user(uuid4(), token=None, credentials=None, db=db)
+
+
+async def test_bearer_header_still_works(db, user):
+    credentials = HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=create_access_token({"sub": str(user.id)})
+    )
+
+    assert await get_stream_user(uuid4(), token=None, credentials=credentials, db=db) is user
+
+
+async def test_expired_stream_token_is_rejected(db, user, override_settings):
+    override_settings(STREAM_TOKEN_EXPIRE_SECONDS=-1)
+    session_id = uuid4()
+    token = create_stream_token(str(user.id), str(session_id))
+
+    with pytest.raises(HTTPException):
+        await get_stream_user(session_id, token=token, credentials=None, db=db)
@@ -0,0 +1,86 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.graphs.cover_letter import STYLE_ACCEPT_RATIO, STYLE_REJECT_RATIO
+from app.services.stylometry import (
+    profile_from_fingerprints,
+    rank_by_profile,
+    relative_similarity,
+    style_fingerprint,
+    style_profile,
+    style_similarity,
+)
+
+REFERENCES = [
+    "저는 대학 시절부터 백엔드 개발에 관심을 가져 왔습니다. 동아리에서 학사 관리 서비스를 만들며 "
+    "데이터베이스 설계를 처음 경험했습니다. 그 과정에서 작은 설계 차이가 성능을 크게 바꾼다는 점을 "
+    "배웠습니다. 이후 저는 문제를 끝까지 파고드는 습관을 갖게 되었습니다.",
+    "저는 첫 직장에서 결제 시스템을 운영하며 장애 대응을 맡았습니다. 새벽에 발생한 장애를 해결하면서 "
+    "모니터링의 중요성을 깨달았습니다. 그래서 저는 팀과 함께 알림 체계를 다시 설계했습니다. 그 결과 "
+    "장애 복구 시간이 절반으로 줄었습니다.",
+    "저는 협업에서 기록의 힘을 믿습니다. 프로젝트를 진행할 때마다 회의 내용을 문서로 정리하고 "
+    "공유했습니다. 덕분에 팀원들이 같은 목표를 바라볼 수 있었습니다. 귀사에서도 이러한 태도로 꾸준히 "
+    "성장하겠습니다.",
+]
+SAME_STYLE = (
+    "저는 귀사의 서비스를 사용하며 안정적인 플랫폼의 가치를 느꼈습니다. 이전 회사에서 주문 시스템을 "
+    "개선하며 처리 속도를 두 배로 높였습니다. 그 과정에서 저는 작은 지표도 놓치지 않는 습관을 "
+    "길렀습니다. 입사 후에도 이러한 경험을 바탕으로 팀에 기여하겠습니다."
+)
+FOREIGN_STYLES = [
+    "ok so basically i like coding lol!!! backend is cool, frontend too, whatever works!! hire me?? pls :)",
+    "- Python\n- Django\n- AWS\n- Docker\n- Kubernetes\n- PostgreSQL\n- Redis",
+]
+
+
+@pytest.fixture(scope="module")
+def profile():
+    return style_profile(REFERENCES)
+
+
+def test_baseline_is_the_leave_one_out_similarity_of_the_references(profile):
+    # Each reference scored against the profile of the other two
+    held_out = [
+        style_similarity(text, style_profile(REFERENCES[:i] + REFERENCES[i + 1:]))
+        for i, text in enumerate(REFERENCES)
+    ]
+    assert profile.baseline == pytest.approx(np.mean(held_out))
+
+
+def test_single_reference_is_calibrated_against_its_own_halves():
+    profile = style_profile(REFERENCES[:1])
+    assert 0 < profile.baseline < 1
+    assert relative_similarity(SAME_STYLE, profile) >= STYLE_ACCEPT_RATIO
+
+
+@pytest.mark.parametrize("references", [REFERENCES, REFERENCES[:1]])
+def test_profile_from_stored_fingerprints_matches_the_texts(references):
+    # Fingerprints are stored as JSON with each letter's digest
+    stored = [json.loads(json.dumps(style_fingerprint(text))) for text in references]
+    expected, profile = style_profile(references), profile_from_fingerprints(stored)
+
+    assert profile.baseline == pytest.approx(expected.baseline)
+    assert relative_similarity(SAME_STYLE, profile) == pytest.approx(relative_similarity(SAME_STYLE, expected))
+
+
+def test_held_out_letters_clear_the_accept_ratio():
+    for i, text in enumerate(REFERENCES):
+        others = style_profile(REFERENCES[:i] + REFERENCES[i + 1:])
+        assert relative_similarity(text, others) >= STYLE_ACCEPT_RATIO
+
+
+def test_new_letter_in_the_users_style_is_accepted(profile):
+    assert relative_similarity(SAME_STYLE, profile) >= STYLE_ACCEPT_RATIO
+
+
+@pytest.mark.parametrize("text", FOREIGN_STYLES)
+def test_foreign_style_is_rejected(profile, text):
+    assert relative_similarity(text, profile) <= STYLE_REJECT_RATIO
+
+
+def test_candidates_are_ranked_most_similar_first(profile):
+    ranking = rank_by_profile([FOREIGN_STYLES[0], SAME_STYLE, FOREIGN_STYLES[1]], profile)
+    assert ranking[0][0] == 1
+    assert [score for _, score in ranking] == sorted((score for _, score in ranking), reverse=True)
@@ -0,0 +1,86 @@
+import asyncio
+import uuid
+
+import pytest
+
+import app.api.v1.ai.translate as translate
+from app.models.ai_session import AISession
+from tests.fakes import FakeDB, session_maker
+
+
+@pytest.fixture
+def session(monkeypatch):
+    session = AISession(id=uuid.uuid4(), ai_type="translate", status="processing")
+    db = FakeDB({session.id: session})
+    monkeypatch.setattr(translate, "async_session_maker", session_maker(db))
+    return session
+
+
+def events(session_id, chunks):
+    return translate.stream_and_save(
+        session_id, chunks, {"source_language": "ko", "target_language": "en"}, "translated", "Translation failed"
+    )
+
+
+async def slow_chunks(closed: list):
+    try:
+        for text in ["Hello", " world"]:
+            yield text
+        await asyncio.sleep(10)
+    finally:
+        closed.append(True)
+
+
+async def test_completed_stream_saves_the_translation(session):
+    async def chunks():
+        yield "Hello"
+        yield " world"
+
+    received = [event async for event in events(session.id, chunks())]
+
+    assert received[-1].startswith("event: done")
+    assert session.status == "completed"
+    assert session.output_data == {"translated": "Hello world"}
+
+
+async def test_provider_error_fails_the_session(session):
+    async def chunks():
+        yield "Hello"
+        raise RuntimeError("provider down")
+
+    received = [event async for event in events(session.id, chunks())]
+
+    assert received[-1].startswith("event: error")
+    assert session.status == "failed"
+    assert session.error_message == "provider down"
+
+
+async def test_client_closing_the_stream_cancels_the_session(session):
+    closed = []
+    stream = events(session.id, slow_chunks(closed))
+    await anext(stream)  # session
+    await anext(stream)  # first delta
+
+    with pytest.raises(GeneratorExit):
+        await stream.athrow(GeneratorExit)
+
+    assert session.status == "cancelled"
+    assert session.completed_at is not None
+    assert closed == [True]
+
+
+async def test_cancelled_response_task_cancels_the_session(session):
+    closed = []
+
+    async def consume():
+        async for _ in events(session.id, slow_chunks(closed)):
+            pass
+
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert session.status == "cancelled"
+    assert closed == [True]
@@ -0,0 +1,154 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+from uuid import uuid4
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from app.graphs import travel
+from app.models.travel import TravelPlan
+from app.services import cancellation
+from tests.fakes import FakeDB, FakeResult, session_maker
+
+
+PLACES = {"restaurants": [{"name": "국밥집"}], "cafes": [], "attractions": [], "accommodations": []}
+TIMELINE = {"days": [{"date": "2026-05-01", "day_title": "Day 1", "schedule": []}]}
+BUDGET = {"total": 120000, "per_person": 60000}
+
+
+class ScriptedModel:
+    def __init__(self, respond):
+        self.respond = respond
+
+    async def ainvoke(self, messages, **kwargs):
+        return AIMessage(content=await self.respond(messages[-1].content))
+
+
+async def default_respond(prompt: str) -> str:
+    if "장소를 추천" in prompt:
+        return json.dumps(PLACES, ensure_ascii=False)
+    if "최적의 일정" in prompt:
+        return json.dumps(TIMELINE, ensure_ascii=False)
+    if "예상 비용" in prompt:
+        return json.dumps(BUDGET)
+    if "체크리스트" in prompt:
+        return '체크리스트입니다: ["신분증", "우산"]'
+    raise AssertionError(f"Unexpected prompt: {prompt}")
+
+
+@pytest.fixture
+def travel_run(monkeypatch):
+    """Run the compiled travel graph against scripted models and a fake session row."""
+    session = SimpleNamespace(id=uuid4(), status="processing", completed_at=None, output_data=None)
+    db = FakeDB(on_execute=lambda statement: FakeResult(scalar=session))
+    run = SimpleNamespace(db=db, session=session, respond=default_respond)
+
+    monkeypatch.setattr(travel, "async_session_maker", session_maker(db))
+    monkeypatch.setattr(travel, "get_model", lambda *args, **kwargs: ScriptedModel(lambda p: run.respond(p)))
+
+    async def invoke():
+        graph = travel.create_travel_graph()
+        return await graph.ainvoke(travel.TravelState(
+            session_id=str(session.id),
+            user_id=str(uuid4()),
+            travel_type="travel",
+            start_date="2026-05-01",
+            end_date="2026-05-02",
+            departure="서울",
+            destination="부산",
+            interests=["맛집"],
+            budget_range=None,
+            companions="2인",
+            special_requests=None,
+            places=[],
+            timeline=[],
+            budget={},
+            checklist=[],
+            content={},
+            error=None,
+        ))
+
+    run.invoke = invoke
+    return run
+
+
+async def test_checklist_is_generated_alongside_place_search(travel_run):
+    places_started, checklist_started = asyncio.Event(), asyncio.Event()
+
+    async def respond(prompt):
+        # Each call waits for the other: a sequential run would time out
+        if "장소를 추천" in prompt:
+            places_started.set()
+            await asyncio.wait_for(checklist_started.wait(), timeout=2)
+        elif "체크리스트" in prompt:
+            checklist_started.set()
+            await asyncio.wait_for(places_started.wait(), timeout=2)
+        return await default_respond(prompt)
+
+    travel_run.respond = respond
+
+    state = await travel_run.invoke()
+
+    assert state["content"] == {
+        "places": PLACES,
+        "timeline": TIMELINE["days"],
+        "budget": BUDGET,
+        "checklist": ["신분증", "우산"],
+    }
+    [plan] = travel_run.db.added
+    assert isinstance(plan, TravelPlan) and plan.content == state["content"]
+    assert travel_run.session.status == "completed"
+
+
+async def test_unreadable_checklist_falls_back_to_defaults(travel_run):
+    async def respond(prompt):
+        if "체크리스트" in prompt:
+            return "준비물은 상황에 따라 다릅니다"
+        return await default_respond(prompt)
+
+    travel_run.respond = respond
+
+    state = await travel_run.invoke()
+
+    assert "신분증" in state["checklist"]
+    assert state["budget"] == BUDGET
+
+
+@pytest.mark.parametrize("retry", [True, False])
+async def test_failed_run_is_left_pending_while_a_retry_remains(travel_run, monkeypatch, retry):
+    async def respond(prompt):
+        raise RuntimeError("provider down")
+
+    travel_run.respond = respond
+    retrying, finish = AsyncMock(), AsyncMock()
+    monkeypatch.setattr(travel, "get_graph", lambda name: travel.create_travel_graph())
+    monkeypatch.setattr(travel, "mark_session_processing", AsyncMock(return_value=True))
+    monkeypatch.setattr(travel, "mark_session_retrying", retrying)
+    monkeypatch.setattr(travel, "finish_progress", finish)
+    monkeypatch.setattr(travel, "save_session_telemetry", AsyncMock())
+    monkeypatch.setattr(cancellation, "_watch_cancellations", AsyncMock())
+    session_id = str(travel_run.session.id)
+
+    error = await travel.run_travel_graph(session_id, str(uuid4()), {
+        "travel_type": "travel", "start_date": "2026-05-01", "end_date": "2026-05-02",
+        "departure": "서울", "destination": "부산",
+    }, retry=retry)
+
+    assert error == "provider down"
+    assert (travel_run.session.status == "failed") is not retry
+    assert retrying.await_count == retry
+    finish.assert_awaited_once_with(session_id, retrying=retry)
+
+
+async def test_session_cancelled_before_the_run_starts_is_left_alone(travel_run, monkeypatch):
+    get_graph = Mock()
+    monkeypatch.setattr(travel, "get_graph", get_graph)
+    monkeypatch.setattr(travel, "mark_session_processing", AsyncMock(return_value=False))
+    travel_run.session.status = "cancelled"
+
+    assert await travel.run_travel_graph(str(travel_run.session.id), str(uuid4()), {}) is None
+
+    get_graph.assert_not_called()
+    assert travel_run.session.status == "cancelled"